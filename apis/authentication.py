@@ -8,7 +8,7 @@ import os
 import re
 import uuid
 from datetime import timezone
-from typing import Any, Union
+from typing import Any, Optional, Union
 
 import jwt
 from email_validator import EmailNotValidError, validate_email
@@ -17,6 +17,9 @@ from flask_restx import Namespace, Resource, fields
 from jsonschema import FormatChecker, ValidationError, validate
 
 import model
+from core.authorization import get_authorization_context
+from modules.tokens import token_revocations
+from modules.users import user_principals
 
 api = Namespace("Authentication", description="Authentication paths", path="/")
 
@@ -282,11 +285,19 @@ def authentication():
         decoded = jwt.decode(token, config.FAIRHUB_SECRET, algorithms=["HS256"])
     except jwt.ExpiredSignatureError:
         return
-    token_blacklist = model.TokenBlacklist.query.get(decoded["jti"])
-    if token_blacklist:
+    if token_revocations.is_revoked(decoded["jti"], decoded.get("exp")):
         return
-    user = model.User.query.get(decoded["user"])
-    g.user = user
+    g.user = user_principals.get(decoded["user"])
+
+
+def get_current_user() -> Optional["model.User"]:
+    """
+    The User of the current request. g.user is a read-only
+    UserPrincipal; handlers that change the user load it here.
+    """
+    if g.get("user") is None:
+        return None
+    return model.db.session.get(model.User, g.user.id)
 
 
 def authorization():
@@ -312,80 +323,7 @@ def authorization():
 
 def is_granted(permission: str, study=None):
     """filters users and checks whether current permission equal to passed permission"""
-    contributor = model.StudyContributor.query.filter(
-        model.StudyContributor.user == g.user, model.StudyContributor.study == study
-    ).first()
-    if not contributor:
-        return False
-    role = {
-        "owner": [
-            "owner",
-            "view",
-            "permission",
-            "delete_contributor",
-            "invite_contributor",
-            "add_study",
-            "update_study",
-            "delete_study",
-            "add_dataset",
-            "update_dataset",
-            "delete_dataset",
-            "version",
-            "publish_version",
-            "delete_version",
-            "participant",
-            "study_metadata",
-            "dataset_metadata",
-            "add_redcap",
-            "update_redcap",
-            "delete_redcap",
-            "add_dashboard",
-            "update_dashboard",
-            "delete_dashboard",
-            "make_owner",
-        ],
-        "admin": [
-            "admin",
-            "view",
-            "permission",
-            "delete_contributor",
-            "invite_contributor",
-            "add_study",
-            "update_study",
-            "add_dataset",
-            "update_dataset",
-            "delete_dataset",
-            "version",
-            "publish_version",
-            "delete_version",
-            "participant",
-            "study_metadata",
-            "dataset_metadata",
-            "add_redcap",
-            "update_redcap",
-            "delete_redcap",
-            "add_dashboard",
-            "update_dashboard",
-            "delete_delete",
-        ],
-        "editor": [
-            "editor",
-            "view",
-            "add_study",
-            "update_study",
-            "add_dataset",
-            "update_dataset",
-            "delete_dataset",
-            "participant",
-            "study_metadata",
-            "version",
-            "dataset_metadata",
-            "update_dashboard",
-        ],
-        "viewer": ["viewer", "view"],
-    }
-
-    return permission in role[contributor.permission]
+    return get_authorization_context().is_granted(permission, study)
 
 
 @api.route("/auth/logout")
@@ -424,7 +362,7 @@ class UserPasswordEndpoint(Resource):
         def validate_current_password(instance):
             received_password = instance
 
-            if not g.user.check_password(received_password):
+            if not get_current_user().check_password(received_password):
                 raise ValidationError("Current password is incorrect")
 
             return True
@@ -471,7 +409,7 @@ class UserPasswordEndpoint(Resource):
             return e.message, 400
 
         data: Union[Any, dict] = request.json
-        user = model.User.query.get(g.user.id)
+        user = get_current_user()
         user.set_password(data["new_password"])
         model.db.session.commit()
         return "Password updated successfully", 200
@@ -5,6 +5,7 @@ from flask import Response, g, request
 from flask_restx import Namespace, Resource, fields
 
 import model
+from core.authorization import get_authorization_context
 
 from .authentication import is_granted
 
@@ -86,9 +87,7 @@ class ContributorResource(Resource):
         grantee = model.StudyContributor.query.filter(
             model.StudyContributor.user == user, model.StudyContributor.study == study
         ).first()
-        granter = model.StudyContributor.query.filter(
-            model.StudyContributor.user == g.user, model.StudyContributor.study == study
-        ).first()
+        granter_role = get_authorization_context().role(study)
         # Order should go from the least privileged to the most privileged
         grants: Dict[str, List[str]] = OrderedDict()
         grants["viewer"] = []
@@ -96,15 +95,15 @@ class ContributorResource(Resource):
         grants["admin"] = ["viewer", "editor", "admin"]
         grants["owner"] = ["editor", "viewer", "admin"]
 
-        can_grant = permission in grants[granter.permission]
+        can_grant = permission in grants[granter_role]
         if not can_grant:
             return f"User cannot grant {permission}", 403
 
         # TODO: Owners downgrading themselves
-        if user != g.user:
+        if user.id != g.user.id:
             grantee_level = list(grants.keys()).index(grantee.permission)  # 1
             new_level: int = list(grants.keys()).index(str(permission))  # 2
-            granter_level = list(grants.keys()).index(granter.permission)  # 2
+            granter_level = list(grants.keys()).index(granter_role)  # 2
             if granter_level <= grantee_level and new_level <= grantee_level:
                 return (
                     f"User cannot downgrade from {grantee.permission} to {permission}",
@@ -121,10 +120,8 @@ class ContributorResource(Resource):
         study = model.Study.query.get(study_id)
         if not study:
             return "study is not found", 404
-        granter = model.StudyContributor.query.filter(
-            model.StudyContributor.user == g.user, model.StudyContributor.study == study
-        ).first()
-        if not granter:
+        granter_role = get_authorization_context().role(study)
+        if not granter_role:
             return "you are not contributor of this study", 403
         grants: Dict[str, List[str]] = OrderedDict()
         grants["viewer"] = []
@@ -145,7 +142,7 @@ class ContributorResource(Resource):
             invited_grants["owner"] = ["editor", "viewer", "admin"]
 
             can_delete = (
-                invited_grantee.permission in invited_grants[granter.permission]
+                invited_grantee.permission in invited_grants[granter_role]
             )
 
             if not can_delete:
@@ -172,8 +169,8 @@ class ContributorResource(Resource):
 
         if len(contributors) <= 1:
             return "the study must have at least one contributor", 422
-        if grantee.user == granter.user:
-            if granter.permission == "owner":
+        if user.id == g.user.id:
+            if granter_role == "owner":
                 return "you must transfer ownership before removing yourself", 422
             model.db.session.delete(grantee)
             model.db.session.commit()
@@ -183,7 +180,7 @@ class ContributorResource(Resource):
                 "Access denied, you are not authorized to change this permission",
                 403,
             )
-        can_delete = grantee.permission in grants[granter.permission]
+        can_delete = grantee.permission in grants[granter_role]
         if not can_delete:
             return f"User cannot delete {grantee.permission}", 403
         model.db.session.delete(grantee)
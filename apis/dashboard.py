@@ -6,13 +6,12 @@ from flask import request
 from flask_restx import Namespace, Resource, fields
 from jsonschema import ValidationError, validate
 
-import caching
 import model
-from modules.etl import ModuleTransform, RedcapLiveTransform, RedcapReleaseTransform
-from modules.etl.config import (
-    moduleTransformConfigs,
-    redcapLiveTransformConfig,
-    redcapReleaseTransformConfig,
+from modules.dashboard import (
+    DashboardBuildPending,
+    dashboard_cache,
+    dashboard_refresh_worker,
+    dashboard_results,
 )
 
 from .authentication import is_granted
@@ -210,6 +209,55 @@ redcap_project_dashboard_connector_model = api.model(
     },
 )
 
+dashboard_cache_stats_model = api.model(
+    "DashboardCacheStats",
+    {
+        "hits": fields.Integer(required=True, readonly=True, description="Cache hits"),
+        "stale_hits": fields.Integer(
+            required=True,
+            readonly=True,
+            description="Cache hits served stale while revalidating",
+        ),
+        "misses": fields.Integer(required=True, readonly=True, description="Misses"),
+        "recomputes": fields.Integer(
+            required=True, readonly=True, description="Dashboard rebuilds"
+        ),
+        "version": fields.Integer(
+            required=False, readonly=True, description="Latest result version"
+        ),
+        "built_at": fields.Float(
+            required=False, readonly=True, description="Latest result build time"
+        ),
+        "age": fields.Float(
+            required=False,
+            readonly=True,
+            description="Seconds since the latest result was built",
+        ),
+        "stale": fields.Boolean(
+            required=True, readonly=True, description="Latest result is stale"
+        ),
+    },
+)
+
+redcap_project_dashboard_cache_model = api.model(
+    "RedcapProjectDashboardCache",
+    {
+        "private": fields.Nested(
+            dashboard_cache_stats_model,
+            required=True,
+            readonly=True,
+            description="Private dashboard cache statistics",
+        ),
+        "public": fields.Nested(
+            dashboard_cache_stats_model,
+            required=False,
+            readonly=True,
+            allow_null=True,
+            description="Public dashboard cache statistics",
+        ),
+    },
+)
+
 
 @api.route("/study/<study_id>/dashboard")
 class RedcapProjectDashboards(Resource):
@@ -374,6 +422,36 @@ class RedcapProjectDashboardConnector(Resource):
         return redcap_project_dashboard_connector, 201
 
 
+@api.route("/study/<study_id>/dashboard/<dashboard_id>/cache")
+class RedcapProjectDashboardCache(Resource):
+    @api.doc("Get the cache statistics of a study dashboard")
+    @api.response(200, "Success")
+    @api.response(400, "Validation Error")
+    @api.marshal_with(redcap_project_dashboard_cache_model)
+    def get(self, study_id: str, dashboard_id: str):
+        """Get REDCap project dashboard cache statistics"""
+        study = model.db.session.query(model.Study).get(study_id)
+        if not is_granted("view", study):
+            return "Access denied, you can not view this dashboard", 403
+
+        redcap_project_dashboard_query: Any = model.db.session.query(
+            model.StudyDashboard
+        ).get(dashboard_id)
+        if redcap_project_dashboard_query is None:
+            return "Dashboard not found", 404
+
+        redcap_project_dashboard_cache: Dict[str, Any] = {
+            "private": dashboard_cache.get_stats(study_id, dashboard_id),
+            "public": (
+                dashboard_cache.get_stats(study_id, dashboard_id, public=True)
+                if redcap_project_dashboard_query.public
+                else None
+            ),
+        }
+
+        return redcap_project_dashboard_cache, 201
+
+
 @api.route("/study/<study_id>/dashboard/<dashboard_id>")
 class RedcapProjectDashboard(Resource):
     @api.doc("Get a study dashboard")
@@ -387,97 +465,26 @@ class RedcapProjectDashboard(Resource):
         if not is_granted("view", study):
             return "Access denied, you can not view this dashboard", 403
 
-        # Retrieve Dashboard Redis Cache if Available
-        # cached_redcap_project_dashboard = caching.cache.get(
-        #     f"$study_id#{study_id}$dashboard_id#{dashboard_id}"
-        # )
-        # if cached_redcap_project_dashboard is not None:
-        #     return cached_redcap_project_dashboard, 201
-
-        # Get Base Transform Config for ETL - Live
-        transformConfig = redcapLiveTransformConfig
-
         # Query Project Dashboard by ID
         redcap_project_dashboard_query: Any = model.db.session.query(
             model.StudyDashboard
         ).get(dashboard_id)
-        redcap_project_dashboard: Dict[
-            str, Any
-        ] = redcap_project_dashboard_query.to_dict()
-
-        # Get REDCap Project
-        redcap_id = redcap_project_dashboard["redcap_id"]
-        redcap_project_view_query: Any = model.db.session.query(model.StudyRedcap).get(
-            redcap_id
-        )
-        redcap_project_view: Dict[str, Any] = redcap_project_view_query.to_dict()
-
-        # Set report_ids for ETL
-        report_keys = []
-        for report in redcap_project_dashboard["reports"]:
-            for i, report_config in enumerate(transformConfig["reports"]):
-                if (
-                    len(report["report_id"]) > 0
-                    and report["report_key"] == report_config["key"]
-                ):
-                    report_keys.append(report["report_key"])
-                    transformConfig["reports"][i]["kwdargs"]["report_id"] = report[
-                        "report_id"
-                    ]
-
-        # Remove Unused Reports
-        transformConfig["reports"] = [
-            report
-            for report in redcapLiveTransformConfig["reports"]
-            if report["key"] in report_keys
-        ]
+        if redcap_project_dashboard_query is None:
+            return "Dashboard not found", 404
 
-        # Set Post Transform Merge
-        index_columns, post_transform_merges = transformConfig["post_transform_merge"]
-        transformConfig["post_transform_merge"] = (
-            index_columns,
-            [
-                (report_key, transform_kwdargs)
-                for report_key, transform_kwdargs in post_transform_merges
-                if report_key in report_keys
-            ],
-        )
+        # Read the Materialized Dashboard, Built Now Only If Never Built
+        try:
+            materialized_dashboard: Any = dashboard_cache.get(
+                study_id, dashboard_id, redcap_project_dashboard_query.updated_on
+            )
+        except DashboardBuildPending:
+            return "Dashboard is being built, try again later", 503
+        if materialized_dashboard is None:
+            return "Dashboard not found", 404
 
-        # Set REDCap API Config
-        transformConfig["redcap_api_url"] = redcap_project_view["api_url"]
-        transformConfig["redcap_api_key"] = redcap_project_view["api_key"]
-
-        # Finalize ETL Config
-        redcap_etl_config = transformConfig
-
-        redcapTransform = RedcapLiveTransform(redcap_etl_config)
-
-        # Execute Dashboard Module Transforms
-        for dashboard_module in redcap_project_dashboard["modules"]:
-            if dashboard_module["selected"]:
-                mergedTransform = redcapTransform.merged
-                transform, module_etl_config = moduleTransformConfigs[
-                    dashboard_module["id"]
-                ]
-                moduleTransform = ModuleTransform(module_etl_config)
-                transformed = getattr(moduleTransform, transform)(
-                    mergedTransform
-                ).transformed
-                dashboard_module["visualizations"] = {
-                    "id": dashboard_module["id"],
-                    "data": transformed,
-                }
-            else:
-                dashboard_module["visualizations"] = {
-                    "id": dashboard_module["id"],
-                    "data": [],
-                }
-
-        # Create Dashboard Redis Cache
-        caching.cache.set(
-            f"$study_id#{study_id}$dashboard_id#{dashboard_id}",
-            redcap_project_dashboard,
-        )
+        redcap_project_dashboard: Dict[str, Any] = materialized_dashboard[
+            "dashboard"
+        ]
 
         return redcap_project_dashboard, 201
 
@@ -605,8 +612,13 @@ class RedcapProjectDashboard(Resource):
             str, Any
         ] = redcap_project_dashboard_query.to_dict()
 
-        # Clear Dashboard from Redis Cache
-        caching.cache.delete(f"$study_id#{study_id}$dashboard_id#{dashboard_id}")
+        # Clear Materialized Dashboard and Rebuild in the Background
+        dashboard_results.delete(study_id, dashboard_id)
+        dashboard_refresh_worker.request_refresh(study_id, dashboard_id)
+        if update_redcap_project_dashboard["public"]:
+            dashboard_refresh_worker.request_refresh(
+                study_id, dashboard_id, public=True
+            )
 
         return update_redcap_project_dashboard, 201
 
@@ -623,6 +635,9 @@ class RedcapProjectDashboard(Resource):
         model.StudyDashboard.query.filter_by(id=dashboard_id).delete()
         model.db.session.commit()
 
+        # Clear Materialized Dashboard
+        dashboard_results.delete(study_id, dashboard_id)
+
         return 204
 
 
@@ -657,82 +672,19 @@ class RedcapProjectDashboardPublic(Resource):
         # Public Dashboard ID
         dashboard_id = redcap_project_dashboard["id"]
 
-        # Retrieve Dashboard Redis Cache if Available
-        # cached_redcap_project_dashboard = caching.cache.get(
-        #     f"$study_id#{study_id}$dashboard_id#{dashboard_id}#public"
-        # )
-        # if cached_redcap_project_dashboard is not None:
-        #     return cached_redcap_project_dashboard, 201
-
-        #
-        # No Cache, Do ETL
-        #
-
-        # Get Base Transform Config for ETL - Release
-        transformConfig = redcapReleaseTransformConfig
-
-        # Set report_ids for ETL
-        report_keys = []
-        for report in redcap_project_dashboard["reports"]:
-            for i, report_config in enumerate(transformConfig["reports"]):
-                if (
-                    len(report["report_id"]) > 0
-                    and report["report_key"] == report_config["key"]
-                ):
-                    report_keys.append(report["report_key"])
-                    transformConfig["reports"][i]["kwdargs"]["report_id"] = report[
-                        "report_id"
-                    ]
-
-        # Remove Unused Reports
-        transformConfig["reports"] = [
-            report
-            for report in redcapLiveTransformConfig["reports"]
-            if report["key"] in report_keys
-        ]
-
-        # Set Post Transform Merge
-        index_columns, post_transform_merges = transformConfig["post_transform_merge"]
-        transformConfig["post_transform_merge"] = (
-            index_columns,
-            [
-                (report_key, transform_kwdargs)
-                for report_key, transform_kwdargs in post_transform_merges
-                if report_key in report_keys
-            ],
-        )
+        # Read the Materialized Dashboard, Built Now Only If Never Built
+        try:
+            materialized_dashboard: Any = dashboard_cache.get(
+                study_id,
+                dashboard_id,
+                redcap_project_dashboard["updated_on"],
+                public=True,
+            )
+        except DashboardBuildPending:
+            return "Dashboard is being built, try again later", 503
+        if materialized_dashboard is None:
+            return "No public dashboard found", 404
 
-        # Finalize ETL Config
-        redcap_etl_config = transformConfig
-
-        # Execute REDCap Release ETL
-        redcapTransform = RedcapReleaseTransform(redcap_etl_config)
-
-        # Execute Dashboard Module Transforms
-        for dashboard_module in redcap_project_dashboard["modules"]:
-            if dashboard_module["selected"]:
-                mergedTransform = redcapTransform.merged
-                transform, module_etl_config = moduleTransformConfigs[
-                    dashboard_module["id"]
-                ]
-                moduleTransform = ModuleTransform(module_etl_config)
-                transformed = getattr(moduleTransform, transform)(
-                    mergedTransform
-                ).transformed
-                dashboard_module["visualizations"] = {
-                    "id": dashboard_module["id"],
-                    "data": transformed,
-                }
-            else:
-                dashboard_module["visualizations"] = {
-                    "id": dashboard_module["id"],
-                    "data": [],
-                }
-
-        # Create Dashboard Redis Cache
-        caching.cache.set(
-            f"$study_id#{study_id}$dashboard_id#{dashboard_id}#public",
-            redcap_project_dashboard,
-        )
+        redcap_project_dashboard = materialized_dashboard["dashboard"]
 
         return redcap_project_dashboard, 201
@@ -6,8 +6,9 @@ from flask_restx import Namespace, Resource, fields, reqparse
 from jsonschema import ValidationError, validate
 
 import model
+from core.authorization import get_authorization_context
 
-from .authentication import is_granted
+from .authentication import get_current_user, is_granted
 
 api = Namespace("Study", description="Study operations", path="/")
 
@@ -43,11 +44,8 @@ class Studies(Resource):
     # @api.marshal_with(study_model)
     def get(self):
         """Return a list of all studies"""
-        study_contributors = model.StudyContributor.query.filter(
-            model.StudyContributor.user_id == g.user.id
-        ).all()  # Filter contributors where user_id matches the user's id
-
-        study_ids = [contributor.study_id for contributor in study_contributors]
+        # Studies the user contributes to, from the request's memberships
+        study_ids = get_authorization_context().study_ids()
 
         studies = model.Study.query.filter(model.Study.id.in_(study_ids)).all()
 
@@ -84,7 +82,9 @@ class Studies(Resource):
         study_id = add_study.id
         study_ = model.Study.query.get(study_id)
 
-        study_contributor = model.StudyContributor.from_data(study_, g.user, "owner")
+        study_contributor = model.StudyContributor.from_data(
+            study_, get_current_user(), "owner"
+        )
         model.db.session.add(study_contributor)
 
         model.db.session.commit()
@@ -7,6 +7,8 @@ from jsonschema import FormatChecker, ValidationError, validate
 
 import model
 
+from .authentication import get_current_user
+
 api = Namespace("User", description="User tables", path="/")
 
 
@@ -36,12 +38,8 @@ class UserDetailsEndpoint(Resource):
     @api.response(400, "Validation Error")
     def get(self):
         """Returns user details"""
-        user = model.User.query.get(g.user.id)
-        user_details = user.user_details
-        user_information = user.to_dict()
-        # combine user and user_details to return a single object
-        user_information.update(user_details.to_dict())
-        return user_information, 200
+        # combines user and user_details, read from the cached principal
+        return g.user.profile(), 200
 
     @api.expect(study_model)
     @api.response(200, "Success")
@@ -103,7 +101,7 @@ class UserDetailsEndpoint(Resource):
             return e.message, 400
 
         data: Union[Any, dict] = request.json
-        user = model.User.query.get(g.user.id)
+        user = get_current_user()
         # user.update(data) # don't update the username and email_address for now
         user_details = user.user_details
         user_details.update(data)
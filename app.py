@@ -11,7 +11,6 @@ import jwt
 from flask import Flask, g, request
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
-from growthbook import GrowthBook
 from sqlalchemy import MetaData, inspect
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.schema import DropTable
@@ -23,6 +22,14 @@ import model
 from apis import api
 from apis.authentication import UnauthenticatedException, authentication, authorization
 from apis.exception import ValidationException
+from modules.dashboard import (
+    dashboard_cache,
+    dashboard_refresh_worker,
+    publish_release_snapshots,
+)
+from modules.features import feature_flags
+from modules.tokens import token_revocations
+from modules.users import user_principals
 
 # from pyfairdatatools import __version__
 
@@ -75,6 +82,10 @@ def create_app(config_module=None, loglevel="INFO"):
     api.init_app(app)
     bcrypt.init_app(app)
     caching.cache.init_app(app)
+    dashboard_cache.init_app(app)
+    feature_flags.init_app(app)
+    token_revocations.init_app(app)
+    user_principals.init_app(app)
 
     cors_origins = [
         "https://brave-ground-.*-.*.centralus.2.azurestaticapps.net",  # noqa E501 # pylint: disable=line-too-long # pylint: disable=anomalous-backslash-in-string
@@ -150,6 +161,16 @@ def create_app(config_module=None, loglevel="INFO"):
                 model.db.drop_all()
                 model.db.create_all()
 
+    @app.cli.command("refresh-dashboards")
+    def refresh_dashboards():
+        """Rebuild the materialized results of every dashboard."""
+        dashboard_refresh_worker.refresh_all()
+
+    @app.cli.command("publish-release-snapshots")
+    def publish_release_snapshot_files():
+        """Publish the Arrow snapshots of the release REDCap reports."""
+        publish_release_snapshots()
+
     @app.cli.command("list-schemas")
     def list_schemas():
         engine = model.db.session.get_bind()
@@ -191,14 +212,8 @@ def create_app(config_module=None, loglevel="INFO"):
 
             authorization()
 
-            # create growthbook instance
-            g.gb = GrowthBook(
-                api_host="https://cdn.growthbook.io",
-                client_key=config.FAIRHUB_GROWTHBOOK_CLIENT_KEY,
-            )
-
-            # load feature flags
-            g.gb.load_features()
+            # evaluate feature flags from the in-memory features
+            g.gb = feature_flags.growthbook()
 
         except UnauthenticatedException:
             return "Authentication is required", 401
@@ -250,8 +265,7 @@ def create_app(config_module=None, loglevel="INFO"):
                 expires=datetime.datetime.now(timezone.utc),
             )
             return resp
-        token_blacklist = model.TokenBlacklist.query.get(decoded["jti"])
-        if token_blacklist:
+        if token_revocations.is_revoked(decoded["jti"], decoded.get("exp")):
             resp.delete_cookie("token")
             return resp
         expired_in = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
@@ -24,3 +24,14 @@ FAIRHUB_AZURE_STORAGE_ACCOUNT_NAME = get_env("FAIRHUB_AZURE_STORAGE_ACCOUNT_NAME
 FAIRHUB_BLOB_STORAGE_REDCAP_ETL_SAS_CONNECTION = get_env("FAIRHUB_TEMP_BLOB_STORAGE_REDCAP_ETL_SAS_CONNECTION")
 FAIRHUB_BLOB_STORAGE_REDCAP_ETL_CONTAINER = get_env("FAIRHUB_TEMP_BLOB_STORAGE_REDCAP_ETL_CONTAINER")
 FAIRHUB_GROWTHBOOK_CLIENT_KEY = get_env("FAIRHUB_GROWTHBOOK_CLIENT_KEY")
+FAIRHUB_GROWTHBOOK_FEATURES_FILE = get_env("FAIRHUB_GROWTHBOOK_FEATURES_FILE")
+FAIRHUB_GROWTHBOOK_REFRESH_INTERVAL = get_env("FAIRHUB_GROWTHBOOK_REFRESH_INTERVAL")
+FAIRHUB_CACHE_TYPE = get_env("FAIRHUB_CACHE_TYPE")
+FAIRHUB_CACHE_URL = get_env("FAIRHUB_CACHE_URL")
+FAIRHUB_DASHBOARD_REFRESH_INTERVAL = get_env("FAIRHUB_DASHBOARD_REFRESH_INTERVAL")
+FAIRHUB_DASHBOARD_MAX_AGE = get_env("FAIRHUB_DASHBOARD_MAX_AGE")
+FAIRHUB_DASHBOARD_MODULE_PROCESSES = get_env("FAIRHUB_DASHBOARD_MODULE_PROCESSES")
+FAIRHUB_DASHBOARD_BUILD_WAIT = get_env("FAIRHUB_DASHBOARD_BUILD_WAIT")
+FAIRHUB_ETL_DEBUG_SNAPSHOTS_PATH = get_env("FAIRHUB_ETL_DEBUG_SNAPSHOTS_PATH")
+FAIRHUB_ETL_DEBUG_SNAPSHOTS_DASHBOARDS = get_env("FAIRHUB_ETL_DEBUG_SNAPSHOTS_DASHBOARDS")
+FAIRHUB_ETL_DEBUG_SNAPSHOTS_MAX_FILES = get_env("FAIRHUB_ETL_DEBUG_SNAPSHOTS_MAX_FILES")
@@ -0,0 +1,158 @@
+"""Study permissions of the current user, loaded once per request"""
+
+from itertools import chain
+from typing import Dict, FrozenSet, List, Optional
+
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import model
+
+# Permissions of Each Contributor Role
+ROLE_PERMISSIONS: Dict[str, FrozenSet[str]] = {
+    "owner": frozenset(
+        {
+            "owner",
+            "view",
+            "permission",
+            "delete_contributor",
+            "invite_contributor",
+            "add_study",
+            "update_study",
+            "delete_study",
+            "add_dataset",
+            "update_dataset",
+            "delete_dataset",
+            "version",
+            "publish_version",
+            "delete_version",
+            "participant",
+            "study_metadata",
+            "dataset_metadata",
+            "add_redcap",
+            "update_redcap",
+            "delete_redcap",
+            "add_dashboard",
+            "update_dashboard",
+            "delete_dashboard",
+            "make_owner",
+        }
+    ),
+    "admin": frozenset(
+        {
+            "admin",
+            "view",
+            "permission",
+            "delete_contributor",
+            "invite_contributor",
+            "add_study",
+            "update_study",
+            "add_dataset",
+            "update_dataset",
+            "delete_dataset",
+            "version",
+            "publish_version",
+            "delete_version",
+            "participant",
+            "study_metadata",
+            "dataset_metadata",
+            "add_redcap",
+            "update_redcap",
+            "delete_redcap",
+            "add_dashboard",
+            "update_dashboard",
+            "delete_delete",
+        }
+    ),
+    "editor": frozenset(
+        {
+            "editor",
+            "view",
+            "add_study",
+            "update_study",
+            "add_dataset",
+            "update_dataset",
+            "delete_dataset",
+            "participant",
+            "study_metadata",
+            "version",
+            "dataset_metadata",
+            "update_dashboard",
+        }
+    ),
+    "viewer": frozenset({"viewer", "view"}),
+}
+
+
+class AuthorizationContext:
+    """
+    Study memberships of a user for the current request. The
+    roles of every study the user contributes to are loaded with
+    one query on first use; permission checks are then lookups
+    in ROLE_PERMISSIONS. Flushes that change StudyContributor
+    rows invalidate the loaded roles.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._roles: Optional[Dict[str, str]] = None
+
+    @property
+    def roles(self) -> Dict[str, str]:
+        """Role of the user in each of their studies, by study id"""
+        if self._roles is None:
+            if self.user is None:
+                self._roles = {}
+            else:
+                self._roles = dict(
+                    model.db.session.query(
+                        model.StudyContributor.study_id,
+                        model.StudyContributor.permission,
+                    )
+                    .filter(model.StudyContributor.user_id == self.user.id)
+                    .all()
+                )
+        return self._roles
+
+    def study_ids(self) -> List[str]:
+        """Ids of the studies the user contributes to"""
+        return list(self.roles)
+
+    def role(self, study) -> Optional[str]:
+        """Role of the user in a study (or study id), None if not a contributor"""
+        if study is None:
+            return None
+        study_id = study.id if isinstance(study, model.Study) else study
+        return self.roles.get(study_id)
+
+    def is_granted(self, permission: str, study) -> bool:
+        role = self.role(study)
+        if role is None:
+            return False
+        return permission in ROLE_PERMISSIONS.get(role, frozenset())
+
+    def invalidate(self) -> None:
+        self._roles = None
+
+
+def get_authorization_context() -> AuthorizationContext:
+    """The authorization context of the current request and user"""
+    context = g.get("authorization")
+    user = g.get("user")
+    if context is None or context.user is not user:
+        context = AuthorizationContext(user)
+        g.authorization = context
+    return context
+
+
+@event.listens_for(Session, "after_flush")
+def invalidate_authorization_context(session, flush_context):
+    """Reload memberships after contributors are added, changed or removed"""
+    if not has_app_context() or g.get("authorization") is None:
+        return
+    if any(
+        isinstance(instance, model.StudyContributor)
+        for instance in chain(session.new, session.dirty, session.deleted)
+    ):
+        g.authorization.invalidate()
@@ -1,10 +1,9 @@
 import datetime
 import uuid
 
-from flask import g
-
 import model
 from apis import exception
+from core import authorization
 
 from .db import db
 
@@ -163,9 +162,6 @@ class Study(db.Model):  # type: ignore
         owner = self.study_contributors.filter(
             model.StudyContributor.permission == "owner"
         ).first()
-        contributor_permission = self.study_contributors.filter(
-            model.StudyContributor.user_id == g.user.id
-        ).first()
 
         return {
             "id": self.id,
@@ -179,7 +175,7 @@ class Study(db.Model):  # type: ignore
                 self.study_description.brief_summary if self.study_description else None
             ),
             "owner": owner.to_dict()["id"] if owner else None,
-            "role": contributor_permission.to_dict()["role"],
+            "role": authorization.get_authorization_context().role(self),
         }
 
     def to_dict_study_metadata(self):
@@ -1,3 +1,7 @@
+from sqlalchemy import event
+
+from modules.tokens import token_revocations
+
 from .db import db
 
 
@@ -24,3 +28,15 @@ class TokenBlacklist(db.Model):  # type: ignore
     def update(self, data: dict):
         self.jti = data["jti"]
         self.exp = data["exp"]
+
+
+# Keep the Revocation Cache Current with Blacklist Writes
+@event.listens_for(TokenBlacklist, "after_insert")
+@event.listens_for(TokenBlacklist, "after_update")
+def on_token_blacklisted(mapper, connection, target):  # pylint: disable=unused-argument
+    token_revocations.revoke(target.jti, target.exp)
+
+
+@event.listens_for(TokenBlacklist, "after_delete")
+def on_token_unblacklisted(mapper, connection, target):  # pylint: disable=unused-argument
+    token_revocations.forget(target.jti)
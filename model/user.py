@@ -1,8 +1,12 @@
 import datetime
 import uuid
 
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
 import app
 import model
+from modules.users import user_principals
 
 from .db import db
 
@@ -66,3 +70,11 @@ class User(db.Model):  # type: ignore
         app.bcrypt.generate_password_hash(password).decode("utf-8")
         is_valid = app.bcrypt.check_password_hash(self.hash, password)
         return is_valid
+
+
+# Keep Cached User Principals Current with User Writes
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def on_user_changed(mapper, connection, target):  # pylint: disable=unused-argument
+    user_principals.invalidate_on_commit(object_session(target), target.id)
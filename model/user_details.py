@@ -1,6 +1,10 @@
 import uuid
 
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
 import model
+from modules.users import user_principals
 
 from .db import db
 
@@ -56,3 +60,13 @@ class UserDetails(db.Model):  # type: ignore
         self.location = data["location"]
         self.timezone = data["timezone"]
         self.profile_image = data["profile_image"] if "profile_image" in data else ""
+
+
+# Keep Cached User Principals Current with UserDetails Writes
+@event.listens_for(UserDetails, "after_insert")
+@event.listens_for(UserDetails, "after_update")
+@event.listens_for(UserDetails, "after_delete")
+def on_user_details_changed(
+    mapper, connection, target
+):  # pylint: disable=unused-argument
+    user_principals.invalidate_on_commit(object_session(target), target.user_id)
@@ -0,0 +1,27 @@
+"""Materialized REDCap project dashboards"""
+
+import caching
+
+from .builder import (
+    build_live_dashboard,
+    build_release_dashboard,
+    module_transform_pool,
+    publish_release_snapshots,
+    redcap_etl_plans,
+)
+from .cache import DashboardCache
+from .lock import DashboardLock
+from .plan import RedcapEtlPlan, RedcapEtlPlanCache, compile_etl_plan
+from .refresh import DashboardBuildPending, DashboardRefreshWorker
+from .results import DashboardResultStore
+from .stats import DashboardCacheStats
+
+dashboard_results = DashboardResultStore(caching.cache)
+dashboard_lock = DashboardLock()
+dashboard_stats = DashboardCacheStats()
+dashboard_refresh_worker = DashboardRefreshWorker(
+    dashboard_results, dashboard_lock, dashboard_stats
+)
+dashboard_cache = DashboardCache(
+    dashboard_results, dashboard_refresh_worker, dashboard_lock, dashboard_stats
+)
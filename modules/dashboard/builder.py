@@ -0,0 +1,93 @@
+"""Builds REDCap project dashboards by running the ETL and module transforms"""
+
+from typing import Any, Dict, List, Optional
+
+from modules.etl import (
+    DimensionCube,
+    ModuleTransformPool,
+    RedcapLiveTransform,
+    RedcapReleaseTransform,
+    get_release_source,
+    redcapReleaseTransformConfig,
+)
+
+from .plan import RedcapEtlPlanCache
+
+redcap_etl_plans = RedcapEtlPlanCache()
+
+# Module Transform Execution (Processes Set by DashboardCache.init_app)
+module_transform_pool = ModuleTransformPool()
+
+
+def build_live_dashboard(
+    redcap_project_dashboard: Dict[str, Any], redcap_project_view: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Run the live REDCap ETL and attach module visualizations to the dashboard"""
+    # Compile (or Reuse) the Dashboard's ETL Plan - Live
+    plan = redcap_etl_plans.get_live_plan(
+        redcap_project_dashboard, redcap_project_view
+    )
+
+    # Execute REDCap Live ETL
+    redcapTransform = RedcapLiveTransform(plan.config)
+
+    return execute_module_transforms(
+        redcap_project_dashboard, redcapTransform.merged, redcapTransform.cube
+    )
+
+
+def build_release_dashboard(redcap_project_dashboard: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the release REDCap ETL and attach module visualizations to the dashboard"""
+    # Compile (or Reuse) the Dashboard's ETL Plan - Release
+    plan = redcap_etl_plans.get_release_plan(redcap_project_dashboard)
+
+    # Execute REDCap Release ETL
+    redcapTransform = RedcapReleaseTransform(plan.config)
+
+    return execute_module_transforms(
+        redcap_project_dashboard, redcapTransform.merged, redcapTransform.cube
+    )
+
+
+def publish_release_snapshots() -> None:
+    """Publish the columnar snapshot of every release report next to its CSV blob"""
+    get_release_source(redcapReleaseTransformConfig).publish_report_snapshots(
+        redcapReleaseTransformConfig["reports"]
+    )
+
+
+def execute_module_transforms(
+    redcap_project_dashboard: Dict[str, Any],
+    mergedTransform: Any,
+    cube: Optional[DimensionCube] = None,
+) -> Dict[str, Any]:
+    """
+    Attach the visualizations of every selected dashboard module.
+    The modules run as one batch on module_transform_pool: on
+    this thread with group-bys shared between modules (and
+    counts rolled up from the ETL's dimension cube), or fanned
+    out to worker processes when the pool is configured.
+    """
+    dashboard_modules: List[Dict[str, Any]] = redcap_project_dashboard["modules"]
+
+    transformed = module_transform_pool.run(
+        [
+            dashboard_module["id"]
+            for dashboard_module in dashboard_modules
+            if dashboard_module["selected"]
+        ],
+        mergedTransform,
+        cube,
+    )
+
+    for dashboard_module in dashboard_modules:
+        dashboard_module["visualizations"] = {
+            "id": dashboard_module["id"],
+            "data": (
+                transformed[dashboard_module["id"]]
+                if dashboard_module["selected"]
+                else []
+            ),
+        }
+
+    return redcap_project_dashboard
@@ -0,0 +1,134 @@
+"""Stale-while-revalidate reads of materialized dashboards"""
+
+import time
+from typing import Any, Dict, Optional
+
+import redis
+
+from .builder import module_transform_pool, redcap_etl_plans
+from .lock import DashboardLock
+from .refresh import DashboardRefreshWorker
+from .results import DashboardResultStore
+from .stats import DashboardCacheStats
+
+
+class DashboardCache:
+    """
+    Read path of materialized dashboards. A stored result is
+    always served right away: when it is older than
+    FAIRHUB_DASHBOARD_MAX_AGE (seconds), or was built from an
+    outdated dashboard config, a single background rebuild is
+    requested for it. Only the first build of a dashboard, when
+    no result is stored yet, runs the ETL in the request (and so
+    depends on REDCap); concurrent first requests wait on the
+    same build lock, for up to FAIRHUB_DASHBOARD_BUILD_WAIT
+    seconds (the lock timeout by default), and share its result.
+    Requests still waiting then raise DashboardBuildPending
+    rather than build the dashboard again.
+    """
+
+    def __init__(
+        self,
+        results: DashboardResultStore,
+        worker: DashboardRefreshWorker,
+        lock: DashboardLock,
+        stats: DashboardCacheStats,
+    ):
+        self.results = results
+        self.worker = worker
+        self.lock = lock
+        self.stats = stats
+        self.max_age: Optional[float] = None
+        self.build_wait: Optional[float] = None
+
+    def init_app(self, app: Any) -> None:
+        """
+        Read the max age, build wait, module process count and
+        ETL debug snapshot settings, share the build lock and counters
+        through Redis when the app cache is a RedisCache, and
+        start the refresh worker
+        """
+        max_age = app.config.get("FAIRHUB_DASHBOARD_MAX_AGE")
+        self.max_age = float(max_age) if max_age else None
+        build_wait = app.config.get("FAIRHUB_DASHBOARD_BUILD_WAIT")
+        self.build_wait = float(build_wait) if build_wait else None
+        module_processes = app.config.get("FAIRHUB_DASHBOARD_MODULE_PROCESSES")
+        module_transform_pool.processes = (
+            int(module_processes) if module_processes else None
+        )
+        debug_snapshots_path = app.config.get("FAIRHUB_ETL_DEBUG_SNAPSHOTS_PATH")
+        debug_snapshots_dashboards = app.config.get(
+            "FAIRHUB_ETL_DEBUG_SNAPSHOTS_DASHBOARDS"
+        )
+        if debug_snapshots_path and debug_snapshots_dashboards:
+            max_files = app.config.get("FAIRHUB_ETL_DEBUG_SNAPSHOTS_MAX_FILES")
+            redcap_etl_plans.set_debug_snapshots(
+                {
+                    "path": debug_snapshots_path,
+                    **({"max_files": int(max_files)} if max_files else {}),
+                },
+                [
+                    dashboard_id.strip()
+                    for dashboard_id in debug_snapshots_dashboards.split(",")
+                    if dashboard_id.strip()
+                ],
+            )
+        if app.config.get("FAIRHUB_CACHE_TYPE") == "RedisCache" and app.config.get(
+            "FAIRHUB_CACHE_URL"
+        ):
+            client = redis.Redis.from_url(app.config["FAIRHUB_CACHE_URL"])
+            self.lock.client = client
+            self.stats.client = client
+        self.worker.init_app(app)
+
+    def get(
+        self,
+        study_id: str,
+        dashboard_id: str,
+        updated_on: Any,
+        public: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the latest materialized dashboard, refreshed in the
+        background if it is stale or was not built from the
+        dashboard config last updated at updated_on. Returns None
+        if the dashboard no longer exists.
+        """
+        name = self.results.key(study_id, dashboard_id, public)
+        result = self.results.get(study_id, dashboard_id, public)
+        if result is not None:
+            if result["updated_on"] != updated_on or (
+                self.max_age is not None and self.age(result) > self.max_age
+            ):
+                self.stats.record(name, "stale_hits")
+                self.worker.request_refresh(study_id, dashboard_id, public)
+            else:
+                self.stats.record(name, "hits")
+            return result
+
+        self.stats.record(name, "misses")
+        return self.worker.refresh_dashboard(
+            study_id, dashboard_id, public, wait_timeout=self.build_wait
+        )
+
+    def get_stats(
+        self, study_id: str, dashboard_id: str, public: bool = False
+    ) -> Dict[str, Any]:
+        """Counters and age of the latest result of a dashboard"""
+        name = self.results.key(study_id, dashboard_id, public)
+        result = self.results.get(study_id, dashboard_id, public)
+        age = self.age(result) if result is not None else None
+        return {
+            **self.stats.get(name),
+            "version": result["version"] if result is not None else None,
+            "built_at": result["built_at"] if result is not None else None,
+            "age": age,
+            "stale": (
+                age is not None and self.max_age is not None and age > self.max_age
+            ),
+        }
+
+    @staticmethod
+    def age(result: Dict[str, Any]) -> float:
+        """Seconds since a result was built"""
+        return time.time() - result["built_at"]
@@ -0,0 +1,85 @@
+"""Locks that serialize dashboard builds across threads and API hosts"""
+
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# Deletes the lock only if it is still held by the releasing owner
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+else
+    return 0
+end
+"""
+
+
+class DashboardLock:
+    """
+    Named build locks. Within a process a thread lock per name is
+    always taken; when a Redis client is set, a Redis lock
+    (SET NX with an expiry, released only by its owner) is also
+    taken so that a single API host builds a dashboard at a time.
+    The expiry (timeout, seconds) bounds how long a crashed owner
+    can hold the lock.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        timeout: float = 600,
+        poll_interval: float = 0.2,
+        prefix: str = "dashboard-lock",
+    ):
+        self.client = client
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _local_lock(self, name: str) -> threading.Lock:
+        with self._guard:
+            if name not in self._locks:
+                self._locks[name] = threading.Lock()
+            return self._locks[name]
+
+    @contextmanager
+    def hold(
+        self, name: str, blocking: bool = True, wait_timeout: Optional[float] = None
+    ) -> Iterator[bool]:
+        """
+        Acquire the lock for name and yield whether it was acquired.
+        Non-blocking attempts yield False right away if the lock is
+        held; blocking attempts wait up to wait_timeout seconds
+        (the lock timeout by default).
+        """
+        wait_timeout = self.timeout if wait_timeout is None else wait_timeout
+        deadline = time.monotonic() + wait_timeout
+        local_lock = self._local_lock(name)
+        acquired = (
+            local_lock.acquire(timeout=wait_timeout)
+            if blocking
+            else local_lock.acquire(blocking=False)
+        )
+
+        token = uuid.uuid4().hex
+        key = f"{self.prefix}:{name}"
+        while acquired and self.client is not None:
+            if self.client.set(key, token, nx=True, px=int(self.timeout * 1000)):
+                break
+            if not blocking or time.monotonic() >= deadline:
+                local_lock.release()
+                acquired = False
+                break
+            time.sleep(self.poll_interval)
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                if self.client is not None:
+                    self.client.eval(RELEASE_SCRIPT, 1, key, token)
+                local_lock.release()
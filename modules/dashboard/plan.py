@@ -0,0 +1,256 @@
+"""Per-dashboard REDCap ETL plans compiled from the shared base configs"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from modules.etl.config import (
+    moduleTransformConfigs,
+    redcapLiveTransformConfig,
+    redcapReleaseTransformConfig,
+)
+from modules.etl.transforms import compile_module_transform
+
+
+@dataclass(frozen=True)
+class RedcapEtlPlan:
+    """
+    Read-only ETL config of one dashboard. The base config is
+    never modified: the plan holds its own report entries (with
+    the dashboard's report ids) and shares every other value of
+    the base config, so plans can be reused across threads.
+    """
+
+    source: str
+    dashboard_id: str
+    updated_on: Any
+    report_keys: Tuple[str, ...]
+    config: Mapping[str, Any]
+
+
+def compile_etl_plan(
+    base_config: Mapping[str, Any],
+    source: str,
+    redcap_project_dashboard: Dict[str, Any],
+    overrides: Optional[Dict[str, Any]] = None,
+) -> RedcapEtlPlan:
+    """
+    Select the base config reports the dashboard has a report id
+    for, set their report ids, and drop merges of unused reports
+    """
+    report_ids = {
+        report["report_key"]: report["report_id"]
+        for report in redcap_project_dashboard["reports"]
+        if len(report["report_id"]) > 0
+    }
+
+    reports = tuple(
+        MappingProxyType(
+            {
+                **report_config,
+                "kwdargs": MappingProxyType(
+                    {
+                        **report_config["kwdargs"],
+                        "report_id": report_ids[report_config["key"]],
+                    }
+                ),
+            }
+        )
+        for report_config in base_config["reports"]
+        if report_config["key"] in report_ids
+    )
+    report_keys = tuple(report["key"] for report in reports)
+
+    index_columns, post_transform_merges = base_config["post_transform_merge"]
+    post_transform_merge = (
+        index_columns,
+        tuple(
+            (report_key, transform_kwdargs)
+            for report_key, transform_kwdargs in post_transform_merges
+            if report_key in report_keys
+        ),
+    )
+
+    merged_columns = get_merged_columns(base_config, redcap_project_dashboard)
+
+    config = MappingProxyType(
+        {
+            **base_config,
+            **(overrides or {}),
+            "reports": reports,
+            "post_transform_merge": post_transform_merge,
+            **({"merged_columns": merged_columns} if merged_columns else {}),
+        }
+    )
+
+    return RedcapEtlPlan(
+        source=source,
+        dashboard_id=redcap_project_dashboard["id"],
+        updated_on=redcap_project_dashboard["updated_on"],
+        report_keys=report_keys,
+        config=config,
+    )
+
+
+def get_merged_columns(
+    base_config: Mapping[str, Any], redcap_project_dashboard: Dict[str, Any]
+) -> Optional[Tuple[str, ...]]:
+    """
+    Columns of the merged reports read by the dashboard's
+    selected modules, its dimension cube and the post-merge
+    transforms. None, keeping every column, if the dashboard
+    has no module list or selects a module without a config.
+    """
+    if "modules" not in redcap_project_dashboard:
+        return None
+
+    columns: Dict[str, None] = dict.fromkeys(
+        base_config["index_columns"] if "index_columns" in base_config else ["record_id"]
+    )
+    for dashboard_module in redcap_project_dashboard["modules"]:
+        if not dashboard_module["selected"]:
+            continue
+        if dashboard_module["id"] not in moduleTransformConfigs:
+            return None
+        _, module_config = moduleTransformConfigs[dashboard_module["id"]]
+        for transform in compile_module_transform(module_config).transforms:
+            columns.update(dict.fromkeys(transform.fields))
+
+    if "cube" in base_config:
+        columns.update(dict.fromkeys(base_config["cube"]["dimensions"]))
+        columns.update(dict.fromkeys(base_config["cube"]["measures"]))
+
+    post_merge_transforms = (
+        base_config["post_merge_transforms"]
+        if "post_merge_transforms" in base_config
+        else []
+    )
+    for _, transform_kwdargs in post_merge_transforms:
+        if "column" in transform_kwdargs:
+            columns[transform_kwdargs["column"]] = None
+        if "columns" in transform_kwdargs:
+            columns.update(dict.fromkeys(transform_kwdargs["columns"]))
+        if "column_name_map" in transform_kwdargs:
+            columns.update(dict.fromkeys(transform_kwdargs["column_name_map"]))
+
+    return tuple(columns)
+
+
+class RedcapEtlPlanCache:
+    """
+    Memoizes compiled plans by (source, dashboard id, updated_on),
+    keeping the maxsize most recently used plans. Updating a
+    dashboard changes its updated_on, so stale plans are never
+    returned and age out of the cache.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._plans: "OrderedDict[Hashable, RedcapEtlPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Debug Snapshots (Off Unless Enabled for Dashboards)
+        self.debug_snapshots: Optional[Dict[str, Any]] = None
+        self.debug_snapshot_dashboards: FrozenSet[str] = frozenset()
+
+    def set_debug_snapshots(
+        self,
+        snapshot_config: Optional[Dict[str, Any]],
+        dashboard_ids: Iterable[str] = (),
+    ) -> None:
+        """
+        Write debug snapshots of the raw reports of the given
+        dashboards ("*" for every dashboard) with snapshot_config,
+        e.g. {"path": ".cache/redcap-debug", "max_files": 100}.
+        None turns debug snapshots off.
+        """
+        with self._lock:
+            self.debug_snapshots = snapshot_config
+            self.debug_snapshot_dashboards = frozenset(dashboard_ids)
+            self._plans.clear()
+
+    def _get_debug_overrides(
+        self, redcap_project_dashboard: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if self.debug_snapshots is not None and (
+            "*" in self.debug_snapshot_dashboards
+            or redcap_project_dashboard["id"] in self.debug_snapshot_dashboards
+        ):
+            return {"debug_snapshots": self.debug_snapshots}
+        return {}
+
+    def get_live_plan(
+        self,
+        redcap_project_dashboard: Dict[str, Any],
+        redcap_project_view: Dict[str, Any],
+    ) -> RedcapEtlPlan:
+        """Plan of the live ETL, reading from the dashboard's REDCap project"""
+        overrides = {
+            "redcap_api_url": redcap_project_view["api_url"],
+            "redcap_api_key": redcap_project_view["api_key"],
+            **self._get_debug_overrides(redcap_project_dashboard),
+        }
+        key = (
+            "live",
+            redcap_project_dashboard["id"],
+            redcap_project_dashboard["updated_on"],
+            # The REDCap project can be updated independently of the dashboard
+            overrides["redcap_api_url"],
+            overrides["redcap_api_key"],
+        )
+        return self._get(
+            key,
+            lambda: compile_etl_plan(
+                redcapLiveTransformConfig, "live", redcap_project_dashboard, overrides
+            ),
+        )
+
+    def get_release_plan(
+        self, redcap_project_dashboard: Dict[str, Any]
+    ) -> RedcapEtlPlan:
+        """Plan of the release ETL, reading from the released REDCap exports"""
+        key = (
+            "release",
+            redcap_project_dashboard["id"],
+            redcap_project_dashboard["updated_on"],
+        )
+        return self._get(
+            key,
+            lambda: compile_etl_plan(
+                redcapReleaseTransformConfig,
+                "release",
+                redcap_project_dashboard,
+                self._get_debug_overrides(redcap_project_dashboard),
+            ),
+        )
+
+    def clear(self) -> None:
+        """Drop every memoized plan"""
+        with self._lock:
+            self._plans.clear()
+
+    def _get(
+        self, key: Hashable, compile_plan: Callable[[], RedcapEtlPlan]
+    ) -> RedcapEtlPlan:
+        with self._lock:
+            if key in self._plans:
+                self._plans.move_to_end(key)
+                return self._plans[key]
+        plan = compile_plan()
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+        return plan
@@ -0,0 +1,211 @@
+"""Background rebuilding of materialized dashboard results"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import model
+
+from .builder import build_live_dashboard, build_release_dashboard
+from .lock import DashboardLock
+from .results import DashboardResultStore
+from .stats import DashboardCacheStats
+
+logger = logging.getLogger("DashboardRefresh")
+
+
+class DashboardBuildPending(Exception):
+    """Another build of the dashboard is running and nothing is stored yet"""
+
+
+class DashboardRefreshWorker:
+    """
+    Rebuilds dashboards outside of the request cycle and stores
+    them in a DashboardResultStore. Refreshes are requested on
+    demand (e.g. after a dashboard is updated) and, when an
+    interval is configured with FAIRHUB_DASHBOARD_REFRESH_INTERVAL
+    (seconds), every dashboard is also rebuilt on that schedule.
+    Builds of the same dashboard are serialized by a DashboardLock,
+    and a build is skipped when a result newer than the request
+    was stored while waiting for the lock.
+    """
+
+    def __init__(
+        self,
+        results: DashboardResultStore,
+        lock: Optional[DashboardLock] = None,
+        stats: Optional[DashboardCacheStats] = None,
+    ):
+        self.results = results
+        self.lock = lock or DashboardLock()
+        self.stats = stats or DashboardCacheStats()
+        self.app: Any = None
+        self.interval: Optional[float] = None
+        self._queue: "queue.Queue[Tuple[str, str, bool]]" = queue.Queue()
+        # Pending jobs and the time they were first requested
+        self._pending: Dict[Tuple[str, str, bool], float] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def init_app(self, app: Any) -> None:
+        """Bind the worker to the app and start the schedule if configured"""
+        self.app = app
+        interval = app.config.get("FAIRHUB_DASHBOARD_REFRESH_INTERVAL")
+        self.interval = float(interval) if interval else None
+        if self.interval and not app.config.get("TESTING"):
+            self.start()
+
+    def start(self) -> None:
+        """Start the worker thread if it is not already running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="dashboard-refresh", daemon=True
+                )
+                self._thread.start()
+
+    def request_refresh(
+        self, study_id: str, dashboard_id: str, public: bool = False
+    ) -> None:
+        """Queue a dashboard rebuild; duplicate pending requests are dropped"""
+        job = (study_id, dashboard_id, public)
+        with self._lock:
+            if job in self._pending:
+                return
+            self._pending[job] = time.time()
+        self._queue.put(job)
+        if self.app is not None and not self.app.config.get("TESTING"):
+            self.start()
+
+    def refresh_dashboard(
+        self,
+        study_id: str,
+        dashboard_id: str,
+        public: bool = False,
+        wait: bool = True,
+        requested_at: Optional[float] = None,
+        wait_timeout: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build a dashboard now and store it as the latest version.
+        Must run inside an app context. Returns the stored result,
+        or None if the dashboard no longer exists.
+
+        Concurrent callers share one build, and nothing is built
+        without the build lock: with wait, a caller blocks on the
+        lock (up to wait_timeout seconds) and reuses the result
+        stored by the build it waited on; without wait, it returns
+        the latest stored result at once if another build is
+        running. A caller that gets neither the lock nor a stored
+        result returns None without wait, and raises
+        DashboardBuildPending with wait.
+        """
+        requested_at = time.time() if requested_at is None else requested_at
+        name = self.results.key(study_id, dashboard_id, public)
+        with self.lock.hold(
+            name, blocking=wait, wait_timeout=wait_timeout
+        ) as acquired:
+            latest = self.results.get(study_id, dashboard_id, public)
+            if not acquired:
+                if wait and latest is None:
+                    raise DashboardBuildPending(name)
+                return latest
+
+            redcap_project_dashboard_query: Any = model.db.session.query(
+                model.StudyDashboard
+            ).get(dashboard_id)
+            if redcap_project_dashboard_query is None:
+                self.results.delete(study_id, dashboard_id)
+                return None
+
+            # Built from the current dashboard after this request, reuse it
+            if (
+                latest is not None
+                and latest["built_at"] >= requested_at
+                and latest["updated_on"] == redcap_project_dashboard_query.updated_on
+            ):
+                return latest
+
+            self.stats.record(name, "recomputes")
+            return self._build(
+                study_id, dashboard_id, redcap_project_dashboard_query, public
+            )
+
+    def _build(
+        self,
+        study_id: str,
+        dashboard_id: str,
+        redcap_project_dashboard_query: Any,
+        public: bool,
+    ) -> Dict[str, Any]:
+        """Run the ETL for a dashboard and store the result"""
+        # Detach the payload from the ORM's mutable JSON columns
+        redcap_project_dashboard: Dict[str, Any] = json.loads(
+            json.dumps(redcap_project_dashboard_query.to_dict())
+        )
+
+        if public:
+            dashboard = build_release_dashboard(redcap_project_dashboard)
+        else:
+            redcap_project_view_query: Any = model.db.session.query(
+                model.StudyRedcap
+            ).get(redcap_project_dashboard["redcap_id"])
+            dashboard = build_live_dashboard(
+                redcap_project_dashboard, redcap_project_view_query.to_dict()
+            )
+
+        return self.results.put(study_id, dashboard_id, dashboard, public)
+
+    def refresh_all(self) -> None:
+        """Rebuild every dashboard, and the public build of public ones"""
+        for redcap_project_dashboard in model.StudyDashboard.query.all():
+            jobs = [False, True] if redcap_project_dashboard.public else [False]
+            for public in jobs:
+                try:
+                    self.refresh_dashboard(
+                        redcap_project_dashboard.study_id,
+                        redcap_project_dashboard.id,
+                        public,
+                        wait=False,
+                    )
+                except Exception:  # pylint: disable=broad-exception-caught
+                    # Keep serving the last good version when a build fails
+                    logger.exception(
+                        "Dashboard %s refresh failed", redcap_project_dashboard.id
+                    )
+
+    def _run(self) -> None:
+        next_refresh = time.monotonic() + self.interval if self.interval else None
+        while True:
+            timeout = (
+                max(0.0, next_refresh - time.monotonic())
+                if next_refresh is not None
+                else None
+            )
+            try:
+                job: Optional[Tuple[str, str, bool]] = self._queue.get(
+                    timeout=timeout
+                )
+            except queue.Empty:
+                job = None
+
+            with self.app.app_context():
+                try:
+                    if job is None:
+                        self.refresh_all()
+                    else:
+                        with self._lock:
+                            requested_at = self._pending.pop(job, None)
+                        self.refresh_dashboard(
+                            *job, wait=False, requested_at=requested_at
+                        )
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logger.exception("Dashboard refresh %s failed", job)
+                finally:
+                    model.db.session.remove()
+
+            if job is None and self.interval:
+                next_refresh = time.monotonic() + self.interval
@@ -0,0 +1,64 @@
+"""Versioned storage of materialized dashboard results"""
+
+import time
+from typing import Any, Dict, Optional
+
+
+class DashboardResultStore:
+    """
+    Keeps the latest materialized build of each dashboard in the
+    application cache, plus a short history of previous builds.
+    Each result records its version (build time in milliseconds),
+    the dashboard updated_on it was built from, and the payload.
+    """
+
+    def __init__(self, cache: Any, history_timeout: Optional[int] = None):
+        self.cache = cache
+        # Timeout of previous versions, None uses the cache default
+        self.history_timeout = history_timeout
+
+    @staticmethod
+    def key(study_id: str, dashboard_id: str, public: bool = False) -> str:
+        """Cache key of the latest result of a dashboard"""
+        key = f"$study_id#{study_id}$dashboard_id#{dashboard_id}"
+        return f"{key}#public" if public else key
+
+    def get(
+        self, study_id: str, dashboard_id: str, public: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Return the latest result, or None if the dashboard was never built"""
+        return self.cache.get(self.key(study_id, dashboard_id, public))
+
+    def get_version(
+        self, study_id: str, dashboard_id: str, version: int, public: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Return a previous result by version, if it is still retained"""
+        key = self.key(study_id, dashboard_id, public)
+        return self.cache.get(f"{key}$version#{version}")
+
+    def put(
+        self,
+        study_id: str,
+        dashboard_id: str,
+        dashboard: Dict[str, Any],
+        public: bool = False,
+    ) -> Dict[str, Any]:
+        """Store a newly built dashboard as the latest version"""
+        key = self.key(study_id, dashboard_id, public)
+        result = {
+            "version": int(time.time() * 1000),
+            "built_at": time.time(),
+            "updated_on": dashboard["updated_on"],
+            "dashboard": dashboard,
+        }
+        # The latest version never expires so readers never fall back to the ETL
+        self.cache.set(key, result, timeout=0)
+        self.cache.set(
+            f"{key}$version#{result['version']}", result, timeout=self.history_timeout
+        )
+        return result
+
+    def delete(self, study_id: str, dashboard_id: str) -> None:
+        """Drop the latest results (private and public) of a dashboard"""
+        self.cache.delete(self.key(study_id, dashboard_id))
+        self.cache.delete(self.key(study_id, dashboard_id, public=True))
@@ -0,0 +1,42 @@
+"""Per-dashboard cache counters"""
+
+import threading
+from collections import Counter
+from typing import Any, Dict
+
+FIELDS = ["hits", "stale_hits", "misses", "recomputes"]
+
+
+class DashboardCacheStats:
+    """
+    Counts cache hits, stale hits, misses and recomputes of each
+    dashboard result. Counters live in a Redis hash per dashboard
+    when a client is set, so they cover every API host, and in
+    process memory otherwise.
+    """
+
+    def __init__(self, client: Any = None, prefix: str = "dashboard-cache-stats"):
+        self.client = client
+        self.prefix = prefix
+        self._counts: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, field: str) -> None:
+        """Increment one counter of a dashboard result"""
+        if self.client is not None:
+            self.client.hincrby(f"{self.prefix}:{name}", field, 1)
+            return
+        with self._lock:
+            self._counts.setdefault(name, Counter())[field] += 1
+
+    def get(self, name: str) -> Dict[str, int]:
+        """Return all counters of a dashboard result"""
+        if self.client is not None:
+            counts = {
+                (key.decode() if isinstance(key, bytes) else key): int(value)
+                for key, value in self.client.hgetall(f"{self.prefix}:{name}").items()
+            }
+        else:
+            with self._lock:
+                counts = dict(self._counts.get(name, Counter()))
+        return {field: counts.get(field, 0) for field in FIELDS}
@@ -1,3 +1,4 @@
 from .config import *
+from .sources import *
 from .transforms import *
 from .vtypes import *
@@ -1,6 +1,5 @@
 from typing import Any, Dict, List, Tuple
 import numpy as np
-from datetime import datetime
 
 # Load API metadata from .env
 # dotenv.load_dotenv()
@@ -169,6 +168,10 @@ redcapLiveTransformConfig: Dict[str, Any] = {
     },
     "redcap_api_url": "",
     "redcap_api_key": "",
+    # IANA timezone of the REDCap server (None: this host's timezone)
+    "redcap_timezone": None,
+    # Clock skew allowed when asking REDCap for changes, in seconds
+    "redcap_change_margin": 300,
     "reports": [  # Dict[str, Dict[str, str | Dict[str, Any] | List[Tuple[str, Dict[str, Any]]]]]
         {
             "key": "participant-list",
@@ -198,32 +201,16 @@ redcapLiveTransformConfig: Dict[str, Any] = {
                 ("remap_values_by_columns", {"columns": data_columns}),
                 ("map_missing_values_by_columns", {"columns": data_columns}),
                 (
-                    "transform_values_by_column",
+                    "new_columns_from_date_column",
                     {
                         "column": "dricmpdat",
-                        "new_column_name": "visitweek",
-                        # ISO 8601 string format token for front-end: %V
-                        "transform": lambda x: datetime.strptime(x, "%Y-%m-%d").isocalendar().week,
-                        "missing_value": missing_value_generic,
-                    },
-                ),
-                (
-                    "transform_values_by_column",
-                    {
-                        "column": "dricmpdat",
-                        "new_column_name": "visityear",
-                        # ISO 8601 string format token for front-end: %Y
-                        "transform": lambda x: datetime.strptime(x, "%Y-%m-%d").isocalendar().year,
-                        "missing_value": missing_value_generic,
-                    },
-                ),
-                (
-                    "transform_values_by_column",
-                    {
-                        "column": "dricmpdat",
-                        "new_column_name": "visitdate",
-                        # ISO 8601 string format token for front-end: %Y
-                        "transform": lambda x: datetime.strptime(x, "%Y-%m-%d"),
+                        # ISO 8601 string format tokens for front-end: %V, %Y
+                        "new_column_names": {
+                            "week": "visitweek",
+                            "year": "visityear",
+                            "date": "visitdate",
+                        },
+                        "date_format": "%Y-%m-%d",
                         "missing_value": missing_value_generic,
                     },
                 ),
@@ -307,6 +294,23 @@ redcapLiveTransformConfig: Dict[str, Any] = {
     ],
     "index_columns": ["record_id"],
     "missing_value_generic": missing_value_generic,
+    "max_concurrent_requests": 4,
+    "incremental": True,
+    "categorical_columns": True,
+    "memoize_transforms": True,
+    "cube": {
+        "dimensions": ["siteid", "scrsex", "race", "phenotypes", "visitdate"],
+        "measures": ["record_id"],
+    },
+    "source_cache": {
+        "store": "disk",
+        "path": ".cache/redcap-etl",
+        "max_bytes": 512 * 1024 * 1024,
+    },
+    "annotation_cache": {
+        "store": "disk",
+        "path": ".cache/redcap-etl",
+    },
 }
 
 #
@@ -350,32 +354,16 @@ redcapReleaseTransformConfig: Dict[str, Any] = {
                 ("remap_values_by_columns", {"columns": data_columns}),
                 ("map_missing_values_by_columns", {"columns": data_columns}),
                 (
-                    "transform_values_by_column",
+                    "new_columns_from_date_column",
                     {
                         "column": "dricmpdat",
-                        "new_column_name": "visitweek",
-                        # ISO 8601 string format token for front-end: %V
-                        "transform": lambda x: datetime.strptime(x, "%Y-%m-%d").isocalendar().week,
-                        "missing_value": missing_value_generic,
-                    },
-                ),
-                (
-                    "transform_values_by_column",
-                    {
-                        "column": "dricmpdat",
-                        "new_column_name": "visityear",
-                        # ISO 8601 string format token for front-end: %Y
-                        "transform": lambda x: datetime.strptime(x, "%Y-%m-%d").isocalendar().year,
-                        "missing_value": missing_value_generic,
-                    },
-                ),
-                (
-                    "transform_values_by_column",
-                    {
-                        "column": "dricmpdat",
-                        "new_column_name": "visitdate",
-                        # ISO 8601 string format token for front-end: %Y
-                        "transform": lambda x: datetime.strptime(x, "%Y-%m-%d"),
+                        # ISO 8601 string format tokens for front-end: %V, %Y
+                        "new_column_names": {
+                            "week": "visitweek",
+                            "year": "visityear",
+                            "date": "visitdate",
+                        },
+                        "date_format": "%Y-%m-%d",
                         "missing_value": missing_value_generic,
                     },
                 ),
@@ -459,6 +447,23 @@ redcapReleaseTransformConfig: Dict[str, Any] = {
     ],
     "index_columns": ["record_id"],
     "missing_value_generic": missing_value_generic,
+    "max_concurrent_requests": 4,
+    "categorical_columns": True,
+    "memoize_transforms": True,
+    "cube": {
+        "dimensions": ["siteid", "scrsex", "race", "phenotypes", "visitdate"],
+        "measures": ["record_id"],
+    },
+    # Release Reports Are Read from Their Arrow Snapshots (Published by the
+    # publish-release-snapshots CLI Command), Falling Back to the CSV Reports
+    "release_snapshot": {
+        "format": "arrow",
+        "path": ".cache/redcap-release",
+    },
+    "annotation_cache": {
+        "store": "disk",
+        "path": ".cache/redcap-etl",
+    },
 }
 
 
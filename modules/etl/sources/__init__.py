@@ -0,0 +1,16 @@
+from .redcap_source import RedcapSource
+from .redcap_columnar import (
+    columnar_available,
+    read_columnar_snapshot,
+    write_columnar_snapshot,
+)
+from .redcap_live_source import RedcapLiveSource
+from .redcap_release_source import RedcapReleaseSource
+from .redcap_local_source import RedcapLocalSource
+from .redcap_cached_source import RedcapCachedSource
+from .redcap_snapshot_store import (
+    RedcapSnapshotStore,
+    RedcapDiskSnapshotStore,
+    RedcapRedisSnapshotStore,
+    get_snapshot_store,
+)
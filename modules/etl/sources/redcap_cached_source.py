@@ -0,0 +1,247 @@
+# Library Modules
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from datetime import datetime, timezone
+import gzip, hashlib, json, logging, threading
+
+# Third Party Modules
+import pandas as pd
+import numpy as np
+
+from .redcap_source import RedcapSource
+from .redcap_columnar import (
+    columnar_available,
+    read_columnar_snapshot,
+    write_columnar_snapshot,
+)
+from .redcap_snapshot_store import RedcapSnapshotStore
+
+
+class RedcapCachedSource(RedcapSource):
+    """
+    Wraps a RedcapSource with a persistent cache of its raw
+    exports. Each export is stored as a gzip-compressed
+    snapshot addressed by the hash of its content, and indexed
+    by the wrapped source's source_id and the export's
+    identity: the project metadata as JSON, and each report
+    as an Arrow IPC file with dictionary-encoded str columns,
+    or as JSON rows when pyarrow is not installed (the
+    report's index is not kept). Snapshots are only ever
+    decoded as data, never unpickled, as a shared store may be
+    writable by other hosts. A cached snapshot is served only
+    when the wrapped source reports that the export has not
+    changed since the snapshot was fetched; otherwise the
+    export is fetched and the snapshot replaced.
+
+    When the wrapped source answers for the whole project
+    (project_wide_changes, e.g. a REDCap log check), its
+    answers are kept for the lifetime of this source, i.e. one
+    run: prepare_fetch checks once since the oldest cached
+    snapshot of the run, and every export reuses that answer
+    (a change refetches them all), as does an empty
+    get_changed_records result.
+    """
+
+    def __init__(
+        self,
+        source: RedcapSource,
+        store: RedcapSnapshotStore,
+        compression_level: int = 1,
+    ) -> None:
+        self.source = source
+        self.store = store
+        self.compression_level = compression_level
+        self.logger = logging.getLogger("RedcapTransform")
+        # (since, changed) Answers of the Wrapped Source for the Whole Project
+        self._changes: List[Tuple[datetime, bool]] = []
+        self._changes_lock = threading.Lock()
+
+    @property
+    def name(self) -> str:  # type: ignore[override]
+        return self.source.name
+
+    @property
+    def source_id(self) -> str:
+        return self.source.source_id
+
+    def get_metadata(self) -> List[Dict[str, Any]]:
+        return self._get_snapshot(
+            "metadata",
+            None,
+            self.source.get_metadata,
+            lambda metadata: json.dumps(metadata).encode("utf-8"),
+            lambda data: json.loads(data.decode("utf-8")),
+        )
+
+    def get_report(self, report_config: Dict[str, Any]) -> pd.DataFrame:
+        export_name = self._get_report_export_name(report_config)
+        if columnar_available():
+            return self._get_snapshot(
+                export_name,
+                report_config,
+                lambda: self.source.get_report(report_config),
+                lambda df: write_columnar_snapshot(df, "arrow"),
+                lambda data: read_columnar_snapshot(data, "arrow"),
+            )
+        return self._get_snapshot(
+            export_name,
+            report_config,
+            lambda: self.source.get_report(report_config),
+            self._dump_report,
+            self._load_report,
+        )
+
+    def prepare_fetch(self, report_configs: List[Dict[str, Any]]) -> None:
+        """
+        Checks once whether the project changed since the oldest
+        cached snapshot of the metadata and reports, when the
+        wrapped source answers for the whole project.
+        """
+        self.source.prepare_fetch(report_configs)
+        if not self.source.project_wide_changes:
+            return
+        entries = [
+            self.store.get_index(self._get_index_name(export_name))
+            for export_name in [
+                "metadata",
+                *(self._get_report_export_name(rc) for rc in report_configs),
+            ]
+        ]
+        fetched_ats = [
+            datetime.fromisoformat(entry["fetched_at"])
+            for entry in entries
+            if entry is not None
+        ]
+        if len(fetched_ats) > 0 and self.has_changed_since(min(fetched_ats)):
+            # Refetch Every Export of the Run Rather than Check Each Again
+            self._set_known_change(datetime.max.replace(tzinfo=timezone.utc), True)
+
+    def has_changed_since(
+        self, since: datetime, report_config: Optional[Dict[str, Any]] = None
+    ) -> Optional[bool]:
+        if not self.source.project_wide_changes:
+            return self.source.has_changed_since(since, report_config)
+        changed = self._get_known_change(since)
+        if changed is None:
+            changed = self.source.has_changed_since(since)
+            self._set_known_change(since, changed)
+        return changed
+
+    def get_changed_records(self, since: datetime) -> Optional[List[str]]:
+        changed_records = self.source.get_changed_records(since)
+        if self.source.project_wide_changes and changed_records is not None:
+            self._set_known_change(since, len(changed_records) > 0)
+        return changed_records
+
+    def _get_known_change(self, since: datetime) -> Optional[bool]:
+        """
+        Internal method. Answers from an earlier project-wide
+        check: no change since an earlier time means no change
+        since, and a change since a later time means a change
+        since. Returns None if no earlier check answers.
+        """
+        with self._changes_lock:
+            for checked_since, changed in self._changes:
+                if not changed and checked_since <= since:
+                    return False
+                if changed and checked_since >= since:
+                    return True
+        return None
+
+    def _set_known_change(self, since: datetime, changed: Optional[bool]) -> None:
+        if changed is not None:
+            with self._changes_lock:
+                self._changes.append((since, changed))
+
+    def _get_report_export_name(self, report_config: Dict[str, Any]) -> str:
+        export_name = json.dumps(
+            {
+                key: report_config.get(key)
+                for key in ["key", "kwdargs", "filepath", "filename"]
+            },
+            sort_keys=True,
+            # Read-only report configs hold their kwdargs as mappings
+            default=lambda value: (
+                dict(value) if isinstance(value, Mapping) else str(value)
+            ),
+        )
+        if columnar_available():
+            return f"report.arrow:{export_name}"
+        return f"report.json:{export_name}"
+
+    def _get_index_name(self, export_name: str) -> str:
+        return hashlib.sha256(
+            f"{self.source_id}|{export_name}".encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def _dump_report(df: pd.DataFrame) -> bytes:
+        """
+        Internal method. Serializes a report of str values as
+        JSON rows, with null for missing values.
+        """
+        rows = df.astype(object).where(df.notna(), None).values.tolist()
+        return json.dumps(
+            {"columns": [str(column) for column in df.columns], "data": rows}
+        ).encode("utf-8")
+
+    @staticmethod
+    def _load_report(data: bytes) -> pd.DataFrame:
+        """
+        Internal method. Reads a report serialized by
+        _dump_report, with NaN for missing values.
+        """
+        report = json.loads(data.decode("utf-8"))
+        df = pd.DataFrame(report["data"], columns=report["columns"], dtype=object)
+        return df.where(df.notna(), np.nan)
+
+    def _get_snapshot(
+        self,
+        export_name: str,
+        report_config: Optional[Dict[str, Any]],
+        fetch: Callable[[], Any],
+        serialize: Callable[[Any], bytes],
+        deserialize: Callable[[bytes], Any],
+    ) -> Any:
+        """
+        Internal method. Returns the cached export if it is
+        still current, otherwise fetches and caches it.
+        """
+        index_name = self._get_index_name(export_name)
+
+        entry = self.store.get_index(index_name)
+        if entry is not None:
+            fetched_at = datetime.fromisoformat(entry["fetched_at"])
+            if self.has_changed_since(fetched_at, report_config) is False:
+                data = self.store.get_object(entry["content_hash"])
+                if data is not None:
+                    try:
+                        value = deserialize(gzip.decompress(data))
+                    except Exception as error:
+                        self.logger.warning(
+                            f"Unreadable REDCap snapshot {export_name}: {error}"
+                        )
+                    else:
+                        self.logger.info(f"Using cached REDCap snapshot {export_name}")
+                        return value
+
+        # Timestamp Before Fetching so Concurrent Upstream Changes Invalidate
+        fetched_at = datetime.now(timezone.utc)
+        value = fetch()
+        serialized = serialize(value)
+        content_hash = hashlib.sha256(serialized).hexdigest()
+        self.store.put_object(
+            content_hash,
+            gzip.compress(serialized, compresslevel=self.compression_level, mtime=0),
+        )
+        self.store.set_index(
+            index_name,
+            {"content_hash": content_hash, "fetched_at": fetched_at.isoformat()},
+        )
+
+        return value
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
@@ -0,0 +1,110 @@
+# Library Modules
+from typing import Any, Dict, Optional, Union
+import io, os, uuid
+
+# Third Party Modules
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+# Columnar Snapshot Formats and Their File Extensions
+columnar_formats: Dict[str, str] = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def columnar_available() -> bool:
+    """
+    Whether pyarrow is installed, i.e. whether columnar
+    snapshots can be written and read
+    """
+    return pa is not None
+
+
+def get_columnar_filename(filename: str, snapshot_format: str) -> str:
+    """
+    Returns the filename of the columnar snapshot published
+    next to a CSV report, e.g. report.csv -> report.arrow
+    """
+    return f"{os.path.splitext(filename)[0]}{columnar_formats[snapshot_format]}"
+
+
+def write_columnar_snapshot(df: pd.DataFrame, snapshot_format: str) -> bytes:
+    """
+    Serializes a report of str values as a Parquet file or
+    an Arrow IPC file. Every column is dictionary-encoded,
+    as REDCap report columns repeat a small set of codes.
+    """
+    table = pa.Table.from_arrays(
+        [
+            pa.array(df[column].astype(object), type=pa.string()).dictionary_encode()
+            for column in df.columns
+        ],
+        names=[str(column) for column in df.columns],
+    )
+    sink = io.BytesIO()
+    if snapshot_format == "parquet":
+        pa.parquet.write_table(table, sink, use_dictionary=True)
+    elif snapshot_format == "arrow":
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown columnar snapshot format {snapshot_format}")
+    return sink.getvalue()
+
+
+def read_columnar_snapshot(
+    source: Union[str, bytes], snapshot_format: str
+) -> pd.DataFrame:
+    """
+    Reads a columnar snapshot from a local file, through a
+    memory map, or from the bytes of a snapshot.
+    Dictionary-encoded columns are decoded to object columns
+    sharing one str object per distinct value, with NaN for
+    missing values, matching the frames read from the CSV
+    reports.
+    """
+    if snapshot_format == "parquet":
+        table = pa.parquet.read_table(
+            pa.BufferReader(source) if isinstance(source, bytes) else source,
+            memory_map=not isinstance(source, bytes),
+        )
+    elif snapshot_format == "arrow":
+        if isinstance(source, bytes):
+            table = pa.ipc.open_file(pa.BufferReader(source)).read_all()
+        else:
+            with pa.memory_map(source, "r") as memory_map:
+                table = pa.ipc.open_file(memory_map).read_all()
+    else:
+        raise ValueError(f"Unknown columnar snapshot format {snapshot_format}")
+
+    df = table.to_pandas()
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(object)
+    return df
+
+
+def write_local_file(filepath: str, data: Any) -> None:
+    """
+    Writes data (bytes, or a stream with readinto) to filepath
+    through a temporary file and os.replace, so that
+    concurrent readers never map a partial snapshot
+    """
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    temp_filepath = f"{filepath}.{uuid.uuid4().hex}.tmp"
+    with open(temp_filepath, "wb") as file:
+        if isinstance(data, (bytes, bytearray)):
+            file.write(data)
+        else:
+            data.readinto(file)
+    os.replace(temp_filepath, filepath)
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
@@ -0,0 +1,128 @@
+# Library Modules
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import hashlib
+
+# Third Party Modules
+from redcap import Project, RedcapError
+import pandas as pd
+
+from .redcap_source import RedcapSource
+
+
+class RedcapLiveSource(RedcapSource):
+    """
+    Reads metadata and reports from the REDCap API via PyCap.
+    The REDCap API reads log and record date filters in the
+    REDCap server's timezone, given as an IANA name in
+    redcap_timezone (e.g. "America/Los_Angeles"); if None,
+    the server is assumed to share this host's timezone.
+    Change checks look change_margin further back than asked,
+    to allow for clock skew between the hosts.
+    """
+
+    name: str = "live"
+    project_wide_changes: bool = True
+
+    # Internal Defaults
+    # - Key Assumptions for Transform Functions
+    # – Only Update if REDCap API and/or PyCap Update
+    default_report_kwdargs: Dict[str, Any] = {
+        "raw_or_label": "raw",
+        "raw_or_label_headers": "raw",
+        "export_checkbox_labels": False,
+        "csv_delimiter": "",
+    }
+
+    def __init__(
+        self,
+        redcap_api_url: str,
+        redcap_api_key: str,
+        redcap_timezone: Optional[str] = None,
+        change_margin: timedelta = timedelta(minutes=5),
+    ) -> None:
+        self.redcap_api_url = redcap_api_url
+        self.redcap_api_key = redcap_api_key
+        self.redcap_timezone = (
+            ZoneInfo(redcap_timezone) if redcap_timezone is not None else None
+        )
+        self.change_margin = change_margin
+        self.project = Project(self.redcap_api_url, self.redcap_api_key)
+
+    @property
+    def source_id(self) -> str:
+        token = hashlib.sha256(
+            f"{self.redcap_api_url}|{self.redcap_api_key}".encode("utf-8")
+        ).hexdigest()
+        return f"{self.name}-{token[:16]}"
+
+    def get_metadata(self) -> List[Dict[str, Any]]:
+        return self.project.export_metadata()
+
+    def get_report(self, report_config: Dict[str, Any]) -> pd.DataFrame:
+        report_kwdargs = report_config["kwdargs"] | self.default_report_kwdargs
+        report = self.project.export_report(**report_kwdargs)
+        return pd.DataFrame(report, dtype=str)
+
+    def has_changed_since(
+        self, since: datetime, report_config: Optional[Dict[str, Any]] = None
+    ) -> Optional[bool]:
+        """
+        Checks the REDCap project log for record changes or
+        project design changes (which include report edits)
+        since the given time. Returns None if the log cannot be
+        read, e.g. when the API token lacks logging rights.
+        """
+        begin_time = self._get_server_time(since)
+        try:
+            for log_type in ["record", "manage"]:
+                events = self.project.export_logging(
+                    log_type=log_type, begin_time=begin_time
+                )
+                if len(events) > 0:
+                    return True
+        except RedcapError:
+            return None
+        return False
+
+    def get_changed_records(self, since: datetime) -> Optional[List[str]]:
+        """
+        Exports the record id field of the records created or
+        modified since the given time (the REDCap dateRangeBegin
+        filter). Record deletions and project design changes
+        are only visible in the project log, so any such event
+        returns None.
+        """
+        begin_time = self._get_server_time(since)
+        try:
+            for log_type in ["record_delete", "manage"]:
+                events = self.project.export_logging(
+                    log_type=log_type, begin_time=begin_time
+                )
+                if len(events) > 0:
+                    return None
+            record_id_field = self.project.def_field
+            records = self.project.export_records(
+                fields=[record_id_field], date_begin=begin_time
+            )
+        except RedcapError:
+            return None
+        return sorted(set(str(record[record_id_field]) for record in records))
+
+    def _get_server_time(self, since: datetime) -> datetime:
+        """
+        Internal method. Returns since, less change_margin, as a
+        naive datetime in the REDCap server's timezone.
+        """
+        return (
+            (since - self.change_margin)
+            .astimezone(self.redcap_timezone)
+            .replace(tzinfo=None)
+        )
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
@@ -0,0 +1,88 @@
+# Library Modules
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import json, os
+
+# Third Party Modules
+import pandas as pd
+
+from .redcap_columnar import (
+    columnar_available,
+    columnar_formats,
+    get_columnar_filename,
+    read_columnar_snapshot,
+)
+from .redcap_source import RedcapSource
+
+
+class RedcapLocalSource(RedcapSource):
+    """
+    Reads metadata and reports from a local directory laid
+    out like the release blob container, i.e. reports at
+    {data_dir}/{filepath}/{filename}. Useful for offline
+    development and benchmarking. With snapshot_format set to
+    "parquet" or "arrow", reports are memory-mapped from the
+    columnar snapshot next to each CSV file, when present.
+    """
+
+    name: str = "local"
+
+    def __init__(
+        self,
+        data_dir: str,
+        project_metadata: Dict[str, str],
+        snapshot_format: str = "csv",
+    ) -> None:
+        self.data_dir = data_dir
+        self.project_metadata = project_metadata
+        self.snapshot_format = (
+            snapshot_format
+            if snapshot_format in columnar_formats and columnar_available()
+            else "csv"
+        )
+
+    @property
+    def source_id(self) -> str:
+        return f"{self.name}-{os.path.abspath(self.data_dir)}"
+
+    def get_metadata(self) -> List[Dict[str, Any]]:
+        filepath = self._get_filepath(self.project_metadata)
+        with open(filepath, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def get_report(self, report_config: Dict[str, Any]) -> pd.DataFrame:
+        filepath = self._get_filepath(report_config)
+        if self.snapshot_format in columnar_formats:
+            columnar_filepath = self._get_columnar_filepath(report_config)
+            if os.path.exists(columnar_filepath):
+                return read_columnar_snapshot(columnar_filepath, self.snapshot_format)
+        return pd.read_csv(filepath, dtype=str)
+
+    def has_changed_since(
+        self, since: datetime, report_config: Optional[Dict[str, Any]] = None
+    ) -> Optional[bool]:
+        path_config = self.project_metadata if report_config is None else report_config
+        filepath = self._get_filepath(path_config)
+        if report_config is not None and self.snapshot_format in columnar_formats:
+            columnar_filepath = self._get_columnar_filepath(report_config)
+            if os.path.exists(columnar_filepath):
+                filepath = columnar_filepath
+        return os.path.getmtime(filepath) > since.timestamp()
+
+    def _get_filepath(self, path_config: Dict[str, Any]) -> str:
+        return os.path.join(
+            self.data_dir, path_config["filepath"], path_config["filename"]
+        )
+
+    def _get_columnar_filepath(self, report_config: Dict[str, Any]) -> str:
+        return os.path.join(
+            self.data_dir,
+            report_config["filepath"],
+            get_columnar_filename(report_config["filename"], self.snapshot_format),
+        )
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
@@ -0,0 +1,215 @@
+# Library Modules
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import glob, hashlib, json, logging, os
+
+# Third Party Modules
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobServiceClient
+import pandas as pd
+
+from .redcap_columnar import (
+    columnar_available,
+    columnar_formats,
+    get_columnar_filename,
+    read_columnar_snapshot,
+    write_columnar_snapshot,
+    write_local_file,
+)
+from .redcap_source import RedcapSource
+
+
+class RedcapReleaseSource(RedcapSource):
+    """
+    Reads metadata and reports from the release snapshots
+    stored in Azure Blob Storage. Reports are CSV blobs and
+    the project metadata is a JSON blob.
+
+    With snapshot_format set to "parquet" or "arrow" (and
+    pyarrow installed), reports are read from the columnar
+    snapshot published next to each CSV blob instead. The
+    snapshot is downloaded once per blob version (etag) into
+    cache_path and read through a memory map; reports with
+    no columnar snapshot fall back to the CSV blob.
+    """
+
+    name: str = "release"
+
+    def __init__(
+        self,
+        connection_string: str,
+        container_name: str,
+        project_metadata: Dict[str, str],
+        snapshot_format: str = "csv",
+        cache_path: str = ".cache/redcap-release",
+    ) -> None:
+        self.connection_string = connection_string
+        self.container_name = container_name
+        self.project_metadata = project_metadata
+        self.cache_path = cache_path
+        self.logger = logging.getLogger("RedcapTransform")
+
+        if snapshot_format != "csv" and snapshot_format not in columnar_formats:
+            raise ValueError(f"Unknown release snapshot format {snapshot_format}")
+        if snapshot_format != "csv" and not columnar_available():
+            self.logger.warning(
+                f"pyarrow is not installed, reading {snapshot_format} release snapshots as CSV"
+            )
+            snapshot_format = "csv"
+        self.snapshot_format = snapshot_format
+
+    @property
+    def source_id(self) -> str:
+        token = hashlib.sha256(
+            f"{self.connection_string}|{self.container_name}".encode("utf-8")
+        ).hexdigest()
+        return f"{self.name}-{token[:16]}"
+
+    def get_metadata(self) -> List[Dict[str, Any]]:
+        return self.get_stored_project_metadata(
+            self.connection_string,
+            self.container_name,
+            f"{self.project_metadata['filepath']}/{self.project_metadata['filename']}",
+        )
+
+    def get_report(self, report_config: Dict[str, Any]) -> pd.DataFrame:
+        if self.snapshot_format in columnar_formats:
+            try:
+                return self.get_stored_columnar_report(
+                    self.connection_string,
+                    self.container_name,
+                    self._get_columnar_blob_path(report_config),
+                )
+            except ResourceNotFoundError:
+                self.logger.warning(
+                    f"No {self.snapshot_format} snapshot of {report_config['filename']}, reading CSV"
+                )
+        return self.get_stored_report(
+            self.connection_string,
+            self.container_name,
+            f"{report_config['filepath']}/{report_config['filename']}",
+        )
+
+    def has_changed_since(
+        self, since: datetime, report_config: Optional[Dict[str, Any]] = None
+    ) -> Optional[bool]:
+        """
+        Compares the blob last-modified time with since. This
+        only reads blob properties, not the blob itself.
+        """
+        path_config = self.project_metadata if report_config is None else report_config
+        blob_path = f"{path_config['filepath']}/{path_config['filename']}"
+        blob_service_client = BlobServiceClient.from_connection_string(
+            self.connection_string
+        )
+        container_client = blob_service_client.get_container_client(
+            self.container_name
+        )
+        if report_config is not None and self.snapshot_format in columnar_formats:
+            try:
+                blob_client = container_client.get_blob_client(
+                    self._get_columnar_blob_path(report_config)
+                )
+                return blob_client.get_blob_properties().last_modified > since
+            except ResourceNotFoundError:
+                pass
+        blob_client = container_client.get_blob_client(blob_path)
+        return blob_client.get_blob_properties().last_modified > since
+
+    def publish_report_snapshots(self, report_configs: List[Dict[str, Any]]) -> None:
+        """
+        Converts the CSV blob of each report into a columnar
+        snapshot in snapshot_format, uploaded next to the CSV
+        blob. Run after the release CSVs are published.
+        """
+        if self.snapshot_format not in columnar_formats:
+            raise ValueError("Release snapshot format must be parquet or arrow")
+        blob_service_client = BlobServiceClient.from_connection_string(
+            self.connection_string
+        )
+        container_client = blob_service_client.get_container_client(
+            self.container_name
+        )
+        for report_config in report_configs:
+            df = self.get_stored_report(
+                self.connection_string,
+                self.container_name,
+                f"{report_config['filepath']}/{report_config['filename']}",
+            )
+            blob_client = container_client.get_blob_client(
+                self._get_columnar_blob_path(report_config)
+            )
+            blob_client.upload_blob(
+                write_columnar_snapshot(df, self.snapshot_format), overwrite=True
+            )
+
+    def get_stored_project_metadata(
+        self, connection_string: str, container_name: str, blob_path: str
+    ) -> List[Dict[str, Any]]:
+        # Connect to Azure Blog Storage
+        blob_service_client = BlobServiceClient.from_connection_string(
+            connection_string
+        )
+        container_client = blob_service_client.get_container_client(container_name)
+        blob_client = container_client.get_blob_client(blob_path)
+
+        # Get Blob
+        download_stream = blob_client.download_blob()
+
+        return json.loads(download_stream.readall())
+
+    def get_stored_report(
+        self, connection_string: str, container_name: str, blob_path: str
+    ) -> pd.DataFrame:
+        # Connect to Azure Blog Storage
+        blob_service_client = BlobServiceClient.from_connection_string(
+            connection_string
+        )
+        container_client = blob_service_client.get_container_client(container_name)
+        blob_client = container_client.get_blob_client(blob_path)
+
+        # Get Blob
+        df = pd.read_csv(blob_client.download_blob(), dtype=str)
+        return df
+
+    def get_stored_columnar_report(
+        self, connection_string: str, container_name: str, blob_path: str
+    ) -> pd.DataFrame:
+        # Connect to Azure Blog Storage
+        blob_service_client = BlobServiceClient.from_connection_string(
+            connection_string
+        )
+        container_client = blob_service_client.get_container_client(container_name)
+        blob_client = container_client.get_blob_client(blob_path)
+
+        # Download Each Blob Version Once into the Local Cache
+        etag = blob_client.get_blob_properties().etag.strip('"')
+        blob_key = hashlib.sha256(
+            f"{container_name}|{blob_path}".encode("utf-8")
+        ).hexdigest()[:32]
+        extension = columnar_formats[self.snapshot_format]
+        filepath = os.path.join(self.cache_path, f"{blob_key}-{etag}{extension}")
+        if not os.path.exists(filepath):
+            write_local_file(filepath, blob_client.download_blob())
+            for stale_filepath in glob.glob(
+                os.path.join(self.cache_path, f"{blob_key}-*{extension}")
+            ):
+                if stale_filepath != filepath:
+                    try:
+                        os.remove(stale_filepath)
+                    except FileNotFoundError:
+                        pass
+
+        return read_columnar_snapshot(filepath, self.snapshot_format)
+
+    def _get_columnar_blob_path(self, report_config: Dict[str, Any]) -> str:
+        filename = get_columnar_filename(
+            report_config["filename"], self.snapshot_format
+        )
+        return f"{report_config['filepath']}/{filename}"
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
@@ -0,0 +1,204 @@
+# Library Modules
+from typing import Any, Dict, Optional
+import json, os, threading, time, uuid
+
+# Third Party Modules
+import redis
+
+
+class RedcapSnapshotStore(object):
+    """
+    Base class for raw REDCap export snapshot storage. Objects
+    are compressed snapshot bytes addressed by their content
+    hash; index entries map a (source, export) name to the
+    content hash of its latest snapshot. Stores evict the
+    least recently used objects once their total size exceeds
+    max_bytes.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+
+    def get_index(self, name: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def set_index(self, name: str, entry: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def get_object(self, content_hash: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def put_object(self, content_hash: str, data: bytes) -> None:
+        raise NotImplementedError
+
+
+class RedcapDiskSnapshotStore(RedcapSnapshotStore):
+    """
+    Stores snapshots as files under path:
+        {path}/index/{name}.json
+        {path}/objects/{content_hash}
+    Writes go through a temporary file and os.replace so that
+    concurrent readers (threads or worker processes) never see
+    partial snapshots. Object access times are refreshed on
+    read and drive eviction.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024) -> None:
+        super(RedcapDiskSnapshotStore, self).__init__(max_bytes)
+        self.path = path
+        self.index_path = os.path.join(path, "index")
+        self.objects_path = os.path.join(path, "objects")
+        os.makedirs(self.index_path, exist_ok=True)
+        os.makedirs(self.objects_path, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def get_index(self, name: str) -> Optional[Dict[str, Any]]:
+        filepath = os.path.join(self.index_path, f"{name}.json")
+        try:
+            with open(filepath, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def set_index(self, name: str, entry: Dict[str, Any]) -> None:
+        self._write(
+            os.path.join(self.index_path, f"{name}.json"),
+            json.dumps(entry).encode("utf-8"),
+        )
+
+    def get_object(self, content_hash: str) -> Optional[bytes]:
+        filepath = os.path.join(self.objects_path, content_hash)
+        try:
+            with open(filepath, "rb") as file:
+                data = file.read()
+            os.utime(filepath)
+            return data
+        except FileNotFoundError:
+            return None
+
+    def put_object(self, content_hash: str, data: bytes) -> None:
+        filepath = os.path.join(self.objects_path, content_hash)
+        if os.path.exists(filepath):
+            os.utime(filepath)
+        else:
+            self._write(filepath, data)
+        self._evict()
+
+    def _write(self, filepath: str, data: bytes) -> None:
+        temp_filepath = f"{filepath}.{uuid.uuid4().hex}.tmp"
+        with open(temp_filepath, "wb") as file:
+            file.write(data)
+        os.replace(temp_filepath, filepath)
+
+    def _evict(self) -> None:
+        with self._lock:
+            objects = []
+            for entry in os.scandir(self.objects_path):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    objects.append((stat.st_mtime, stat.st_size, entry.path))
+            total_bytes = sum(size for _, size, _ in objects)
+            for _, size, filepath in sorted(objects):
+                if total_bytes <= self.max_bytes:
+                    break
+                try:
+                    os.remove(filepath)
+                except FileNotFoundError:
+                    pass
+                total_bytes -= size
+
+
+class RedcapRedisSnapshotStore(RedcapSnapshotStore):
+    """
+    Stores snapshots in Redis so they are shared by every API
+    host. Object sizes and last access times are tracked in
+    a hash and a sorted set under the same key prefix. Index
+    entries expire index_ttl seconds after they were last
+    written, so entries of retired sources and exports do not
+    accumulate; an expired entry only costs a refetch.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_bytes: int = 256 * 1024 * 1024,
+        prefix: str = "redcap-etl-snapshot",
+        index_ttl: int = 7 * 24 * 60 * 60,
+    ) -> None:
+        super(RedcapRedisSnapshotStore, self).__init__(max_bytes)
+        self.client = client
+        self.prefix = prefix
+        self.index_ttl = index_ttl
+        self._sizes_key = f"{prefix}:sizes"
+        self._access_key = f"{prefix}:access"
+
+    def get_index(self, name: str) -> Optional[Dict[str, Any]]:
+        entry = self.client.get(f"{self.prefix}:index:{name}")
+        return json.loads(entry) if entry is not None else None
+
+    def set_index(self, name: str, entry: Dict[str, Any]) -> None:
+        self.client.set(
+            f"{self.prefix}:index:{name}", json.dumps(entry), ex=self.index_ttl
+        )
+
+    def get_object(self, content_hash: str) -> Optional[bytes]:
+        data = self.client.get(f"{self.prefix}:object:{content_hash}")
+        if data is not None:
+            self.client.zadd(self._access_key, {content_hash: time.time()})
+        return data
+
+    def put_object(self, content_hash: str, data: bytes) -> None:
+        pipeline = self.client.pipeline()
+        pipeline.set(f"{self.prefix}:object:{content_hash}", data)
+        pipeline.hset(self._sizes_key, content_hash, len(data))
+        pipeline.zadd(self._access_key, {content_hash: time.time()})
+        pipeline.execute()
+        self._evict()
+
+    def _evict(self) -> None:
+        sizes = {
+            (key.decode() if isinstance(key, bytes) else key): int(size)
+            for key, size in self.client.hgetall(self._sizes_key).items()
+        }
+        total_bytes = sum(sizes.values())
+        if total_bytes <= self.max_bytes:
+            return
+        for content_hash in self.client.zrange(self._access_key, 0, -1):
+            if total_bytes <= self.max_bytes:
+                break
+            if isinstance(content_hash, bytes):
+                content_hash = content_hash.decode()
+            pipeline = self.client.pipeline()
+            pipeline.delete(f"{self.prefix}:object:{content_hash}")
+            pipeline.hdel(self._sizes_key, content_hash)
+            pipeline.zrem(self._access_key, content_hash)
+            pipeline.execute()
+            total_bytes -= sizes.get(content_hash, 0)
+
+
+def get_snapshot_store(store_config: Dict[str, Any]) -> RedcapSnapshotStore:
+    """
+    Builds a snapshot store from the "source_cache" entry of an
+    ETL config, e.g. {"store": "disk", "path": ".cache/redcap-etl"}
+    or {"store": "redis", "url": "redis://localhost:6379/0"}.
+    """
+    store_kwdargs = {
+        key: value
+        for key, value in store_config.items()
+        if key in ["max_bytes", "prefix", "index_ttl"]
+    }
+    if store_config["store"] == "disk":
+        store_kwdargs.pop("prefix", None)
+        store_kwdargs.pop("index_ttl", None)
+        return RedcapDiskSnapshotStore(store_config["path"], **store_kwdargs)
+    elif store_config["store"] == "redis":
+        client = redis.Redis.from_url(store_config["url"])
+        return RedcapRedisSnapshotStore(client, **store_kwdargs)
+    else:
+        raise ValueError(f"Unknown REDCap snapshot store {store_config['store']}")
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
@@ -0,0 +1,83 @@
+# Library Modules
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+# Third Party Modules
+import pandas as pd
+
+
+class RedcapSource(object):
+    """
+    Base class for the places a RedcapTransform can read
+    REDCap project metadata and reports from. Subclasses
+    return the metadata as the list of field dictionaries
+    produced by the REDCap metadata API and each report as
+    a pd.DataFrame of str values.
+    """
+
+    name: str = "base"
+
+    # Whether has_changed_since Answers for the Whole Project, Whatever
+    # report_config (e.g. a Project Log Check), so One Answer Covers Every Export
+    project_wide_changes: bool = False
+
+    @property
+    def source_id(self) -> str:
+        """
+        Returns a str identifying the project this source reads
+        from. Used to namespace cached snapshots; must not
+        contain credentials.
+        """
+        raise NotImplementedError
+
+    def get_metadata(self) -> List[Dict[str, Any]]:
+        """
+        Returns the REDCap project metadata.
+        """
+        raise NotImplementedError
+
+    def get_report(self, report_config: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Returns a pd.DataFrame instance containing the report
+        described by report_config (an entry of the "reports"
+        list in the ETL config).
+        """
+        raise NotImplementedError
+
+    def prepare_fetch(self, report_configs: List[Dict[str, Any]]) -> None:
+        """
+        Called once before the metadata and the reports described
+        by report_configs are read for one run. Does nothing by
+        default.
+        """
+        return None
+
+    def has_changed_since(
+        self, since: datetime, report_config: Optional[Dict[str, Any]] = None
+    ) -> Optional[bool]:
+        """
+        Returns whether the report described by report_config
+        (or the project metadata if report_config is None) may
+        have changed since the timezone-aware datetime since.
+        Returns None when the source cannot tell, in which case
+        callers should assume it has changed.
+        """
+        return None
+
+    def get_changed_records(self, since: datetime) -> Optional[List[str]]:
+        """
+        Returns the ids of the records created or modified
+        since the timezone-aware datetime since. Returns None
+        when the source cannot tell, or when records were
+        deleted or the project design changed since, in which
+        case callers should reprocess every record. Reports are
+        still read in full; callers only limit their own
+        processing to the changed records.
+        """
+        return None
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
@@ -1,3 +1,26 @@
+from .redcap_transform import RedcapTransform
+from .redcap_debug_snapshots import (
+    RedcapDebugSnapshotWriter,
+    get_debug_snapshot_writer,
+)
+from .redcap_metadata_annotations import (
+    RedcapMetadataAnnotations,
+    RedcapMetadataAnnotationCache,
+    redcap_metadata_annotations,
+)
+from .redcap_transform_memo import RedcapTransformMemo, redcap_transform_memo
+from .redcap_transform_state import (
+    RedcapTransformState,
+    RedcapTransformStateStore,
+    redcap_transform_states,
+)
 from .redcap_live_transform import RedcapLiveTransform
-from .redcap_release_transform import RedcapReleaseTransform
+from .redcap_release_transform import (
+    RedcapReleaseTransform,
+    get_release_source,
+)
 from .module_transform import ModuleTransform
+from .dimension_cube import DimensionCube
+from .module_aggregation_planner import ModuleAggregationPlanner
+from .module_transform_plan import ModuleTransformPlan, compile_module_transform
+from .module_transform_pool import ModuleTransformPool
@@ -0,0 +1,123 @@
+# Library Modules
+from typing import Any, Dict, List, Sequence
+import logging
+
+# Third-Party Modules
+import numpy as np
+import pandas as pd
+
+
+class DimensionCube(object):
+    """
+    Counts of the measure columns of a frame over every
+    combination of the dimension columns, held as arrays:
+    one row of dimension codes per observed cell and the
+    non-null count of each measure in that cell. Codes follow
+    the sorted order of each dimension's values; rows with a
+    missing dimension value keep the code -1.
+
+    A count aggregation grouped by any subset of the
+    dimensions is answered by rolling up the cells, which
+    gives the same frame as grouping the source rows (same
+    groups, order and counts) at the cost of the cells only.
+    """
+
+    def __init__(
+        self, df: pd.DataFrame, dimensions: List[str], measures: List[str]
+    ) -> None:
+        self.logger = logging.getLogger("DimensionCube")
+        self.source = df
+        self.dimensions: List[str] = []
+        self.uniques: Dict[str, pd.Index] = {}
+        self.measures = [measure for measure in measures if measure in df.columns]
+
+        codes = []
+        for dimension in dimensions:
+            if dimension not in df.columns or dimension in self.measures:
+                self.logger.warning(f"Skipping cube dimension {dimension}")
+                continue
+            try:
+                dimension_codes, uniques = pd.factorize(df[dimension], sort=True)
+            except TypeError:
+                # Unorderable values can not reproduce groupby's sorting
+                self.logger.warning(f"Skipping unorderable cube dimension {dimension}")
+                continue
+            self.dimensions.append(dimension)
+            self.uniques[dimension] = pd.Index(uniques)
+            codes.append(dimension_codes)
+
+        # Aggregate Source Rows into Cells
+        cells = pd.DataFrame(
+            {dimension: code for dimension, code in zip(self.dimensions, codes)},
+            index=df.index,
+        )
+        for measure in self.measures:
+            cells[measure] = df[measure].notna().to_numpy(dtype=np.int64)
+        if len(self.dimensions) > 0:
+            cells = cells.groupby(self.dimensions, as_index=False, sort=False).sum()
+        self.codes: np.ndarray = cells[self.dimensions].to_numpy(dtype=np.int64)
+        self.counts: np.ndarray = cells[self.measures].to_numpy(dtype=np.int64)
+
+    def can_rollup(
+        self, df: pd.DataFrame, fields: Sequence[str], method: Any
+    ) -> bool:
+        """
+        Whether a groupby method (a MethodPlan) over df[fields]
+        can be answered by the cube
+        """
+        groups = method.groups
+        values = [field for field in fields if field not in groups]
+        return (
+            df is self.source
+            and method.func == "count"
+            and len(set(groups)) == len(groups)
+            and all(group in self.dimensions for group in groups)
+            and all(value in self.measures for value in values)
+            and all(group in fields for group in groups)
+            # Cell keys of the roll-up must fit in int64
+            and np.prod(
+                [float(len(self.uniques[group])) for group in groups], dtype=float
+            )
+            < 2**62
+        )
+
+    def rollup(self, fields: Sequence[str], groups: Sequence[str]) -> pd.DataFrame:
+        """
+        Counts of the non-group fields by groups, equivalent to
+        df[fields].groupby(groups, as_index=False).count()
+        """
+        values = [field for field in fields if field not in groups]
+        indices = [self.dimensions.index(group) for group in groups]
+        sizes = tuple(len(self.uniques[group]) for group in groups)
+
+        codes = self.codes[:, indices]
+        observed = (codes >= 0).all(axis=1)
+        codes, counts = codes[observed], self.counts[observed]
+
+        # Cell Keys in Lexicographic Order of the Group Values
+        if len(codes) > 0:
+            keys = np.ravel_multi_index(tuple(codes.T), sizes)
+            cells, inverse = np.unique(keys, return_inverse=True)
+            group_codes = np.unravel_index(cells, sizes)
+        else:
+            cells, inverse = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+            group_codes = tuple(np.empty(0, dtype=np.int64) for group in groups)
+
+        rollup = pd.DataFrame(
+            {
+                group: self.uniques[group].take(group_codes[i])
+                for i, group in enumerate(groups)
+            }
+        )
+        for value in values:
+            measure_counts = counts[:, self.measures.index(value)]
+            rollup[value] = np.bincount(
+                inverse, weights=measure_counts, minlength=len(cells)
+            ).astype(np.int64)
+        return rollup
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
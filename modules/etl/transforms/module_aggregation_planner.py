@@ -0,0 +1,115 @@
+# Library Modules
+from typing import Any, Dict, List, Optional, Set, Tuple
+import threading
+
+# Third-Party Modules
+import pandas as pd
+
+from .dimension_cube import DimensionCube
+from .module_transform_plan import MethodPlan
+
+
+class ModuleAggregationPlanner(object):
+    """
+    Shares group-by results between the ModuleTransforms that
+    render one dashboard. Transforms are registered with add()
+    before they run; the first groupby method of every
+    registered transform is grouped by (groups, func), and each
+    distinct grouping is computed once over df with the union
+    of the value fields its transforms need. A transform's
+    aggregate is then selected from the shared result, and any
+    further methods are applied to that small frame.
+
+    Only column-wise aggregations are shared, so selecting a
+    transform's columns from a shared result is identical to
+    aggregating its own subset of df. When a DimensionCube of
+    df is given, counts over its dimensions are rolled up from
+    the cube instead of grouping df at all.
+    """
+
+    shared_funcs: List[str] = ["count", "nunique"]
+
+    def __init__(
+        self, df: pd.DataFrame, cube: Optional[DimensionCube] = None
+    ) -> None:
+        self.df = df
+        self.cube = cube
+        self.groupings: Dict[Tuple[Tuple[str, ...], str], Set[str]] = {}
+        self.results: Dict[Tuple[Tuple[str, ...], str], pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def add(self, module_transform: Any) -> None:
+        """
+        Registers the groupings of a ModuleTransform's transforms
+        """
+        for transform in module_transform.transforms:
+            methods, fields = transform.methods, transform.fields
+            if len(methods) < 1 or methods[0].func not in self.shared_funcs:
+                continue
+            if not all(field in self.df.columns for field in fields):
+                continue
+            if self.cube is not None and self.cube.can_rollup(
+                self.df, fields, methods[0]
+            ):
+                continue
+            grouping = (methods[0].groups, methods[0].func)
+            self.groupings.setdefault(grouping, set()).update(fields)
+
+    def aggregate(
+        self,
+        df: pd.DataFrame,
+        fields: Tuple[str, ...],
+        methods: Tuple[MethodPlan, ...],
+    ) -> pd.DataFrame:
+        """
+        Aggregates df[fields] by each method in turn, reading the
+        first method from the shared results when it was planned
+        """
+        grouping = (methods[0].groups, methods[0].func)
+        if self.cube is not None and self.cube.can_rollup(df, fields, methods[0]):
+            temp = self.cube.rollup(fields, methods[0].groups)
+            methods = methods[1:]
+        elif (
+            df is self.df
+            and grouping in self.groupings
+            and set(fields) <= self.groupings[grouping]
+        ):
+            groups = list(grouping[0])
+            shared = self._get_result(grouping)
+            temp = shared[
+                groups
+                + [
+                    column
+                    for column in shared.columns
+                    if column in fields and column not in groups
+                ]
+            ]
+            methods = methods[1:]
+        else:
+            temp = df[list(fields)]
+        for method in methods:
+            grouped = temp.groupby(list(method.groups), as_index=False, observed=True)
+            temp = getattr(grouped, method.func)()
+        return temp
+
+    def _get_result(self, grouping: Tuple[Tuple[str, ...], str]) -> pd.DataFrame:
+        """
+        Internal method. Computes a shared grouping on first use.
+        """
+        with self._lock:
+            if grouping not in self.results:
+                groups, func = grouping
+                columns = list(groups) + sorted(
+                    self.groupings[grouping].difference(groups)
+                )
+                grouped = self.df[columns].groupby(
+                    list(groups), as_index=False, observed=True
+                )
+                self.results[grouping] = getattr(grouped, func)()
+            return self.results[grouping]
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
@@ -1,18 +1,26 @@
 # Library Modules
 from typing import Any, Callable, Union, List, Dict, Tuple
 from datetime import datetime
-import logging, re, copy
-import modules.etl.vtypes as vtypes
+import logging, re
 
 # Third-Party Modules
+import numpy as np
 import pandas as pd
 
+from .module_transform_plan import (
+    AccessorPlan,
+    ModuleTransformPlan,
+    TransformPlan,
+    compile_module_transform,
+)
+
 
 class ModuleTransform(object):
     def __init__(
         self,
         config: Dict[str, Any],
         logging_config: Dict[str, str] = {},
+        aggregations: Any = None,
     ) -> None:
         #
         # Logging
@@ -40,126 +48,118 @@ class ModuleTransform(object):
         self.valid: bool = True
         self.transformed: Any
 
+        # Shared Group-By Results (ModuleAggregationPlanner), if Batched
+        self.aggregations = aggregations
+
         #
         # Visualization Variables
         #
 
+        # Compiled Transform Plans (Validated Once per Config)
+        self.plan: ModuleTransformPlan = compile_module_transform(config)
+
         # Flag Indicating Whether to Use Strict Typing on Vtype Mapping
-        self.strict = config["strict"] if "strict" in config else True
-
-        self.key = config["key"] if "key" in config else None
-
-        self.transforms: List[Dict[str, Any]] = copy.deepcopy(config["transforms"])
-
-        if type(self.transforms) != list:
-            self.valid = False
-            raise ValueError(
-                f"ModuleTransform argument transforms in config must be a list or dict type"
-            )
-        elif len(self.transforms) < 1:
-            self.valid = False
-            raise ValueError(
-                f"ModuleTransform instantiation missing transforms in config argument"
-            )
-        else:
-            # Transform attribute is there and has one of the correct types (list, dict)
-            pass
+        self.strict = self.plan.strict
 
-        # Normalize Transforms to List Type, Check Validity, and Warn on Missing Attributes
-        for indexed_transform in enumerate(self.transforms):
-            self.valid = True if self._transformIsValid(indexed_transform) else False
-        if self.strict and not self.valid:
-            raise ValueError(
-                f"{self.key}:Missing properties in transforms argument, see log at {self.logging_config['filename']} for details"
-            )
+        self.key = self.plan.key
+
+        self.transforms: Tuple[TransformPlan, ...] = self.plan.transforms
 
         self.logger.info(f"{self.key}:Initialized")
 
         return
 
-    def _transformIsValid(self, indexed_transform: Tuple[int, Dict[str, Any]]) -> bool:
+    def _setValueTypes(
+        self, transform: TransformPlan, df: pd.DataFrame
+    ) -> List[Dict[str, Any]]:
         """
-        Transform validator
+        Column-wise type setting method. For each accessor,
+        the accessor field column is remapped, and values
+        that are not the missing value are cast as the type
+        defined for the property in the vtype. Returns the
+        typed records, each prefixed with the transform name.
+
+        Accessor remaps are called once per column with the
+        aggregated frame ("record"), the column ("value"), and
+        the transform name, key and accessors, and return a
+        column or a scalar.
         """
-        index, transform = indexed_transform
-        valid = True
-        if "name" not in transform:
-            self.logger.error(
-                f"{self.key}:Transform at index {index} in transforms list missing name property"
-            )
-            valid = False
-        if "vtype" not in transform:
-            self.logger.error(
-                f"{self.key}:Transform at index {index} in transforms list missing vtype property"
-            )
-            valid = False
-        if "methods" not in transform:
-            self.logger.error(
-                f"{self.key}:Transform at index {index} in transforms list missing methods property"
-            )
-            valid = False
-        if "accessors" not in transform:
-            self.logger.error(
-                f"{self.key}:Transform at index {index} in transforms list missing accessors property"
-            )
-            valid = False
-        return valid
-
-    def _setValueType(
-        self,
-        vtype: Any,
-        name: str,
-        record: Dict[str, Any],
-        key: str,
-        accessors: Dict[str, Dict[str, Any]],
-    ) -> Any:
+        keys: List[str] = ["name"]
+        columns: List[List[Any]] = [[transform.name] * len(df)]
+        for accessor in transform.accessors:
+            values: Any = df[accessor.field]
+            if accessor.remap is not None:
+                values = accessor.remap(
+                    {
+                        "name": transform.name,
+                        "record": df,
+                        "value": values,
+                        "key": accessor.key,
+                        "accessors": transform.accessor_configs,
+                    }
+                )
+                if not isinstance(values, pd.Series):
+                    values = pd.Series(values, index=df.index, dtype=object)
+            cast = (values != accessor.missing_value).to_numpy(dtype=bool)
+            keys.append(accessor.key)
+            columns.append(self._castColumn(values.to_numpy(), cast, accessor))
+
+        return [dict(zip(keys, row)) for row in zip(*columns)]
+
+    def _castColumn(
+        self, values: np.ndarray, cast: np.ndarray, accessor: AccessorPlan
+    ) -> List[Any]:
+        """
+        Casts the values selected by the cast mask as ptype,
+        leaving the other (missing) values untouched. Returns
+        a list of native Python values.
         """
-        Element-wise type setting method. If value of
-        element is not the missing value, we cast the
-        value as the type defined for property in the
-        vtype.
+        ptype = accessor.ptype
+        values = values.astype(object)
+        if not cast.any():
+            return values.tolist()
+        try:
+            if accessor.numpy_type is not None:
+                cast_values = values[cast].astype(accessor.numpy_type)
+            else:
+                cast_values = pd.Series(
+                    [ptype(value) for value in values[cast]], dtype=object
+                ).to_numpy()
+        except (RuntimeError, TypeError) as error:
+            self.logger.warning(f"Unable to cast values to {ptype}")
+            if self.strict:
+                raise error
+
+            # Keep Values That Can Not Be Cast
+            def castValue(value: Any) -> Any:
+                try:
+                    return ptype(value)
+                except (RuntimeError, TypeError):
+                    return value
+
+            cast_values = pd.Series(
+                [castValue(value) for value in values[cast]], dtype=object
+            ).to_numpy()
+
+        values[cast] = cast_values.astype(object)
+        return values.tolist()
+
+    def _aggregate(
+        self, df: pd.DataFrame, transform: TransformPlan
+    ) -> pd.DataFrame:
+        """
+        Subsets df to the accessor fields and applies each
+        groupby method in turn. When the transform belongs to
+        a ModuleAggregationPlanner batch, the first method is
+        read from the batch's shared group-by results.
         """
-        accessor = accessors[key]
-        for pname, _ptype in vtype.props:
-            if pname == key:
-                # Accessor Typing
-                ptype = _ptype if "astype" not in accessor else accessor["astype"]
-                if ptype != _ptype:
-                    self.logger.warning(
-                        f"Accessor `{pname}` with type `{ptype}` conflicts with VType definition requiring {_ptype}"
-                    )
-                    if self.strict:
-                        raise ValueError(
-                            f"Accessor `{pname}` with type `{ptype}` conflicts with VType definition requiring {_ptype}"
-                        )
-                # Accessor Name
-                pvalue: Any = record[accessor["field"]]
-                if "remap" in accessor and accessor["remap"] is not None:
-                    pvalue = accessor["remap"](
-                        {
-                            "name": name,
-                            "record": record,
-                            "value": pvalue,
-                            "key": key,
-                            "accessors": accessors,
-                        }
-                    )
-                if pvalue != accessor["missing_value"]:
-                    try:
-                        pvalue = ptype(pvalue)
-                    except (RuntimeError, TypeError) as error:
-                        if self.strict:
-                            self.logger.warning(
-                                f"Unable to cast value {record[key]} to {ptype}"
-                            )
-                            raise error
-                        else:
-                            self.logger.warning(
-                                f"Unable to cast value {record[key]} to {ptype}"
-                            )
-                            continue
-
-        return pvalue
+        if self.aggregations is not None:
+            return self.aggregations.aggregate(df, transform.fields, transform.methods)
+        temp = df[list(transform.fields)]
+        for method in transform.methods:
+            grouped = temp.groupby(list(method.groups), as_index=False, observed=True)
+            temp = getattr(grouped, method.func)()
+        return temp
 
     def simpleTransform(self, df: pd.DataFrame) -> object:
         """
@@ -175,38 +175,20 @@ class ModuleTransform(object):
         visualization module.
         """
         self.transformed = []
-        transform: Dict[str, Any] = (
-            self.transforms.pop()
-        )  # simple transforms have only one transform object
-        name, vtype, methods, accessors = (
-            transform["name"],
-            getattr(vtypes, transform["vtype"])(),
-            transform["methods"],
-            transform["accessors"],
-        )
-        if vtype.isvalid(df, accessors):
-            temp = df[
-                list(set(accessor["field"] for key, accessor in accessors.items()))
-            ]
-            for method in methods:
-                groups, value, func = method["groups"], method["value"], method["func"]
-                grouped = temp.groupby(groups, as_index=False)
-                temp = getattr(grouped, func)()
-            transformed = temp
-
-            for record in transformed.to_dict("records"):
-                record = {
-                    key: self._setValueType(vtype, name, record, key, accessors)
-                    for key, accessor in accessors.items()
-                }
-                record = {"name": name} | record
-                self.transformed.append(record)
+        transform: TransformPlan = self.transforms[
+            -1
+        ]  # simple transforms have only one transform object
+        validation_errors = transform.validate(df.columns)
+        if len(validation_errors) == 0:
+            transformed = self._aggregate(df, transform)
+
+            self.transformed.extend(self._setValueTypes(transform, transformed))
 
         else:
-            for error in vtype.validation_errors:
+            for error in validation_errors:
                 self.logger.warning(f"{error}")
 
-        if len(vtype.validation_errors) == 0:
+        if len(validation_errors) == 0:
             self.logger.info(f"{self.key}:Complete - simpleTransform")
 
         return self
@@ -229,39 +211,17 @@ class ModuleTransform(object):
         self.transformed = []
 
         for transform in self.transforms:
-            name, vtype, methods, accessors = (
-                transform["name"],
-                getattr(vtypes, transform["vtype"])(),
-                transform["methods"],
-                transform["accessors"],
-            )
-            if vtype.isvalid(df, accessors):
-                temp = df[
-                    list(set(accessor["field"] for key, accessor in accessors.items()))
-                ]
-                for method in methods:
-                    groups, value, func = (
-                        method["groups"],
-                        method["value"],
-                        method["func"],
-                    )
-                    grouped = temp.groupby(groups, as_index=False)
-                    temp = getattr(grouped, func)()
-                transformed = temp
-
-                for record in transformed.to_dict("records"):
-                    record = {
-                        key: self._setValueType(vtype, name, record, key, accessors)
-                        for key, accessor in accessors.items()
-                    }
-                    record = {"name": name} | record
-                    self.transformed.append(record)
+            validation_errors = transform.validate(df.columns)
+            if len(validation_errors) == 0:
+                transformed = self._aggregate(df, transform)
+
+                self.transformed.extend(self._setValueTypes(transform, transformed))
 
             else:
-                for error in vtype.validation_errors:
+                for error in validation_errors:
                     self.logger.warning(f"{error}")
 
-        if len(vtype.validation_errors) == 0:
+        if len(validation_errors) == 0:
             self.logger.info(f"{self.key}:Complete - compoundTransform")
 
         return self
@@ -283,41 +243,19 @@ class ModuleTransform(object):
         """
         self.transformed = {}
         for transform in self.transforms:
-            name, vtype, methods, accessors = (
-                transform["name"],
-                getattr(vtypes, transform["vtype"])(),
-                transform["methods"],
-                transform["accessors"],
-            )
-            if vtype.isvalid(df, accessors):
-                temp = df[
-                    list(set(accessor["field"] for key, accessor in accessors.items()))
-                ]
-                for method in methods:
-                    groups, value, func = (
-                        method["groups"],
-                        method["value"],
-                        method["func"],
-                    )
-                    grouped = temp.groupby(groups, as_index=False)
-                    temp = getattr(grouped, func)()
-                transformed = temp
-
-                subtransform = []
-                for record in transformed.to_dict("records"):
-                    record = {
-                        key: self._setValueType(vtype, name, record, key, accessors)
-                        for key, accessor in accessors.items()
-                    }
-                    record = {"name": name} | record
-                    subtransform.append(record)
-                self.transformed[name] = subtransform
+            validation_errors = transform.validate(df.columns)
+            if len(validation_errors) == 0:
+                transformed = self._aggregate(df, transform)
+
+                self.transformed[transform.name] = self._setValueTypes(
+                    transform, transformed
+                )
 
             else:
-                for error in vtype.validation_errors:
+                for error in validation_errors:
                     self.logger.warning(f"{error}")
 
-        if len(vtype.validation_errors) == 0:
+        if len(validation_errors) == 0:
             self.logger.info(f"{self.key}:Complete - mixedTransform")
 
         return self
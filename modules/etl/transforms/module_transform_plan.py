@@ -0,0 +1,223 @@
+# Library Modules
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from dataclasses import dataclass
+from types import MappingProxyType
+import logging, threading
+import modules.etl.vtypes as vtypes
+
+# Third-Party Modules
+import numpy as np
+
+# Vectorized Casts of the Builtin Accessor Types
+numpy_types: Dict[Any, Any] = {str: str, int: np.int64, float: np.float64}
+
+
+@dataclass(frozen=True)
+class MethodPlan:
+    """
+    One groupby step: df.groupby(groups)[...].func()
+    """
+
+    groups: Tuple[str, ...]
+    value: str
+    func: str
+
+
+@dataclass(frozen=True)
+class AccessorPlan:
+    """
+    Resolved accessor of a vtype property: the source field,
+    the cast type (and its numpy dtype, for builtin types), the
+    missing value left uncast and the optional remap.
+    """
+
+    key: str
+    field: str
+    ptype: Any
+    numpy_type: Any
+    missing_value: Any
+    remap: Optional[Callable]
+
+
+@dataclass(frozen=True)
+class TransformPlan:
+    """
+    Compiled transform of a module config, with its vtype class
+    resolved, the fields its groupby steps read and the
+    accessors in output order.
+    """
+
+    name: str
+    vtype: Any
+    vtype_name: str
+    methods: Tuple[MethodPlan, ...]
+    fields: Tuple[str, ...]
+    accessors: Tuple[AccessorPlan, ...]
+    accessor_configs: Mapping[str, Mapping[str, Any]]
+    # (property, accessor field or None if the accessor is missing)
+    prop_fields: Tuple[Tuple[str, Optional[str]], ...]
+
+    def validate(self, columns: Any) -> List[str]:
+        """
+        Returns the vtype validation errors of running this
+        transform on a frame with the given columns, matching
+        SimpleVType.isvalid
+        """
+        for pname, field in self.prop_fields:
+            if field is None:
+                return [
+                    f"VType {self.vtype_name.title()} accessors argument is missing required property, {pname}"
+                ]
+            if field not in columns:
+                return [
+                    f"VType {self.vtype_name.title()} pd.DataFrame argument (df) is missing column defined in accessors argument, {field}"
+                ]
+        return []
+
+
+@dataclass(frozen=True)
+class ModuleTransformPlan:
+    """
+    Compiled, read-only form of a module transform config
+    """
+
+    key: Optional[str]
+    strict: bool
+    transforms: Tuple[TransformPlan, ...]
+
+
+_plans: Dict[int, Tuple[Mapping[str, Any], ModuleTransformPlan]] = {}
+_plans_lock = threading.Lock()
+
+
+def compile_module_transform(config: Mapping[str, Any]) -> ModuleTransformPlan:
+    """
+    Returns the compiled plan of a module transform config,
+    compiling and validating it on first use. Plans are
+    memoized per config object, so configs must not be
+    modified after their first use.
+    """
+    with _plans_lock:
+        if id(config) in _plans and _plans[id(config)][0] is config:
+            return _plans[id(config)][1]
+    plan = _compile(config)
+    with _plans_lock:
+        # Keep a reference to the config so its id is never reused
+        _plans[id(config)] = (config, plan)
+    return plan
+
+
+def _compile(config: Mapping[str, Any]) -> ModuleTransformPlan:
+    logger = logging.getLogger("VizModTransform")
+    strict = config["strict"] if "strict" in config else True
+    key = config["key"] if "key" in config else None
+    transforms = config["transforms"]
+
+    if type(transforms) != list:
+        raise ValueError(
+            f"ModuleTransform argument transforms in config must be a list or dict type"
+        )
+    elif len(transforms) < 1:
+        raise ValueError(
+            f"ModuleTransform instantiation missing transforms in config argument"
+        )
+
+    # Check Validity and Warn on Missing Attributes
+    valid = True
+    for index, transform in enumerate(transforms):
+        for attribute in ["name", "vtype", "methods", "accessors"]:
+            if attribute not in transform:
+                logger.error(
+                    f"{key}:Transform at index {index} in transforms list missing {attribute} property"
+                )
+                valid = False
+    if strict and not valid:
+        logging_filename = (
+            config["logging_config"]["filename"]
+            if "logging_config" in config
+            else "REDCapETL.log"
+        )
+        raise ValueError(
+            f"{key}:Missing properties in transforms argument, see log at {logging_filename} for details"
+        )
+
+    return ModuleTransformPlan(
+        key=key,
+        strict=strict,
+        transforms=tuple(
+            _compile_transform(transform, strict, logger)
+            for transform in transforms
+            if all(
+                attribute in transform
+                for attribute in ["name", "vtype", "methods", "accessors"]
+            )
+        ),
+    )
+
+
+def _compile_transform(
+    transform: Mapping[str, Any], strict: bool, logger: logging.Logger
+) -> TransformPlan:
+    vtype = getattr(vtypes, transform["vtype"])
+    vtype_instance = vtype()
+    props = vtype_instance.props
+    ptypes = dict(props)
+    accessors = transform["accessors"]
+
+    accessor_plans = []
+    for key, accessor in accessors.items():
+        # Accessor Typing
+        _ptype = ptypes[key]
+        ptype = _ptype if "astype" not in accessor else accessor["astype"]
+        if ptype != _ptype:
+            logger.warning(
+                f"Accessor `{key}` with type `{ptype}` conflicts with VType definition requiring {_ptype}"
+            )
+            if strict:
+                raise ValueError(
+                    f"Accessor `{key}` with type `{ptype}` conflicts with VType definition requiring {_ptype}"
+                )
+        accessor_plans.append(
+            AccessorPlan(
+                key=key,
+                field=accessor["field"],
+                ptype=ptype,
+                numpy_type=numpy_types[ptype] if ptype in numpy_types else None,
+                missing_value=accessor["missing_value"],
+                remap=accessor["remap"] if "remap" in accessor else None,
+            )
+        )
+
+    return TransformPlan(
+        name=transform["name"],
+        vtype=vtype,
+        vtype_name=vtype_instance.name,
+        methods=tuple(
+            MethodPlan(
+                groups=tuple(method["groups"]),
+                value=method["value"],
+                func=method["func"],
+            )
+            for method in transform["methods"]
+        ),
+        fields=tuple(
+            dict.fromkeys(accessor["field"] for accessor in accessors.values())
+        ),
+        accessors=tuple(accessor_plans),
+        accessor_configs=MappingProxyType(
+            {
+                key: MappingProxyType(dict(accessor))
+                for key, accessor in accessors.items()
+            }
+        ),
+        prop_fields=tuple(
+            (pname, accessors[pname]["field"] if pname in accessors else None)
+            for pname, ptype in props
+        ),
+    )
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
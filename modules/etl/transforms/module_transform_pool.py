@@ -0,0 +1,151 @@
+# Library Modules
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+import importlib, pickle, threading
+
+# Third-Party Modules
+import pandas as pd
+
+from .dimension_cube import DimensionCube
+from .module_aggregation_planner import ModuleAggregationPlanner
+from .module_transform import ModuleTransform
+
+# Frame (and Cube) Last Loaded by This Worker Process, by Shared Memory Name
+_worker_frame: Dict[str, Tuple[pd.DataFrame, Optional[DimensionCube]]] = {}
+
+
+def _load_frame(
+    shm_name: str, size: int
+) -> Tuple[pd.DataFrame, Optional[DimensionCube]]:
+    """
+    Worker side. Unpickles the shared frame once per worker
+    process and keeps it for the following tasks of the batch.
+    """
+    if shm_name not in _worker_frame:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            frame = pickle.loads(shm.buf[:size])
+        finally:
+            shm.close()
+        _worker_frame.clear()
+        _worker_frame[shm_name] = frame
+    return _worker_frame[shm_name]
+
+
+def _run_module(
+    shm_name: str, size: int, configs_path: str, module_id: str
+) -> Any:
+    """
+    Worker side. Runs one module transform on the shared frame.
+    Module configs are looked up by id in the worker, as their
+    accessor remaps can not be pickled.
+    """
+    df, cube = _load_frame(shm_name, size)
+    module_name, attribute = configs_path.split(":")
+    configs = getattr(importlib.import_module(module_name), attribute)
+    transform, module_config = configs[module_id]
+    planner = ModuleAggregationPlanner(df, cube)
+    module_transform = ModuleTransform(module_config, aggregations=planner)
+    planner.add(module_transform)
+    return getattr(module_transform, transform)(df).transformed
+
+
+class ModuleTransformPool(object):
+    """
+    Runs module transforms in a pool of worker processes. The
+    merged frame (and its dimension cube) is pickled once into
+    a shared memory block per batch; tasks only carry the block
+    name and a module id, and each worker unpickles the frame
+    once per batch. Workers are spawned, not forked, since the
+    API serves requests from threads.
+
+    With processes set to None or below 2, modules run on the
+    calling thread with shared group-bys instead.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        configs_path: str = "modules.etl.config:moduleTransformConfigs",
+    ) -> None:
+        self.processes = processes
+        self.configs_path = configs_path
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=get_context("spawn")
+                )
+            return self._executor
+
+    def run(
+        self,
+        module_ids: List[str],
+        df: pd.DataFrame,
+        cube: Optional[DimensionCube] = None,
+    ) -> Dict[str, Any]:
+        """
+        Returns the transformed output of each module by id
+        """
+        if self.processes is None or self.processes < 2 or len(module_ids) < 2:
+            return self._run_local(module_ids, df, cube)
+
+        payload = pickle.dumps((df, cube), protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(payload)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            shm.buf[:size] = payload
+            del payload
+            executor = self._get_executor()
+            futures = {
+                module_id: executor.submit(
+                    _run_module, shm.name, size, self.configs_path, module_id
+                )
+                for module_id in module_ids
+            }
+            return {
+                module_id: future.result() for module_id, future in futures.items()
+            }
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _run_local(
+        self,
+        module_ids: List[str],
+        df: pd.DataFrame,
+        cube: Optional[DimensionCube],
+    ) -> Dict[str, Any]:
+        module_name, attribute = self.configs_path.split(":")
+        configs = getattr(importlib.import_module(module_name), attribute)
+
+        # Plan the Group-Bys of All Modules
+        planner = ModuleAggregationPlanner(df, cube)
+        module_transforms = {}
+        for module_id in module_ids:
+            transform, module_config = configs[module_id]
+            module_transform = ModuleTransform(module_config, aggregations=planner)
+            planner.add(module_transform)
+            module_transforms[module_id] = (transform, module_transform)
+
+        return {
+            module_id: getattr(module_transform, transform)(df).transformed
+            for module_id, (transform, module_transform) in module_transforms.items()
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
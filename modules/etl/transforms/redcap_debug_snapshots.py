@@ -0,0 +1,131 @@
+# Library Modules
+from typing import Any, Dict, Optional, Tuple
+from datetime import datetime, timezone
+import logging, os, queue, threading, uuid
+
+# Third Party Modules
+import pandas as pd
+
+
+class RedcapDebugSnapshotWriter(object):
+    """
+    Writes gzip-compressed CSV snapshots of REDCap frames for
+    debugging, on a background thread, as
+        {path}/{name}-{UTC timestamp}.csv.gz
+    Frames are copied when submitted and written later, so the
+    ETL never waits on the disk. Snapshots are dropped (with a
+    warning) while max_queue frames are waiting. After each
+    write, the oldest snapshots are removed until at most
+    max_files remain and they take at most max_bytes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_files: int = 100,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_queue: int = 16,
+    ) -> None:
+        self.path = path
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger("RedcapTransform")
+        self._queue: "queue.Queue[Tuple[str, pd.DataFrame]]" = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, df: pd.DataFrame) -> bool:
+        """
+        Queues a copy of df to be written under name. Returns
+        False if the snapshot was dropped.
+        """
+        self._start()
+        try:
+            self._queue.put_nowait((name, df.copy()))
+        except queue.Full:
+            self.logger.warning(f"Debug snapshot queue full, dropping {name}")
+            return False
+        return True
+
+    def flush(self) -> None:
+        """Waits until every queued snapshot is written"""
+        self._queue.join()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="redcap-debug-snapshots", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            name, df = self._queue.get()
+            try:
+                self._write(name, df)
+                self._apply_retention()
+            except Exception as error:
+                self.logger.warning(f"Unable to write debug snapshot {name}: {error}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, name: str, df: pd.DataFrame) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        filepath = os.path.join(self.path, f"{name}-{timestamp}.csv.gz")
+        temp_filepath = f"{filepath}.{uuid.uuid4().hex}.tmp"
+        df.to_csv(temp_filepath, compression="gzip")
+        os.replace(temp_filepath, filepath)
+
+    def _apply_retention(self) -> None:
+        snapshots = []
+        for entry in os.scandir(self.path):
+            if entry.is_file() and entry.name.endswith(".csv.gz"):
+                stat = entry.stat()
+                snapshots.append((stat.st_mtime, stat.st_size, entry.path))
+        snapshots.sort(reverse=True)
+        kept_bytes = 0
+        for index, (_, size, filepath) in enumerate(snapshots):
+            kept_bytes += size
+            if index < self.max_files and kept_bytes <= self.max_bytes:
+                continue
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass
+
+
+# One Writer (and Thread) per Snapshot Directory
+_writers: Dict[str, RedcapDebugSnapshotWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_debug_snapshot_writer(
+    snapshot_config: Dict[str, Any]
+) -> RedcapDebugSnapshotWriter:
+    """
+    Returns the writer of the "debug_snapshots" entry of an
+    ETL config, e.g. {"path": ".cache/redcap-debug",
+    "max_files": 100, "max_bytes": 256 * 1024 * 1024}. Writers
+    are shared by every config with the same path; the limits
+    of the first config using a path apply.
+    """
+    path = snapshot_config["path"]
+    with _writers_lock:
+        if path not in _writers:
+            _writers[path] = RedcapDebugSnapshotWriter(
+                path,
+                **{
+                    key: value
+                    for key, value in snapshot_config.items()
+                    if key in ["max_files", "max_bytes", "max_queue"]
+                },
+            )
+        return _writers[path]
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
@@ -0,0 +1,185 @@
+# Library Modules
+from typing import Any, Dict, Iterable, List, Optional
+from collections import OrderedDict
+import gzip, hashlib, json, logging, re, threading
+
+from modules.etl.sources import RedcapSnapshotStore
+
+# REDCap Internal Variable Metadata
+internal_annotations: List[Dict[str, Any]] = [
+    {"name": "redcap_data_access_group", "type": "text", "options": {}},
+    {"name": "redcap_repeat_instrument", "type": "text", "options": {}},
+    {"name": "redcap_repeat_instance", "type": "number", "options": {}},
+]
+
+# Field Types by Annotation
+complex_types = {"dropdown", "radio", "checkbox"}
+binary_types = {"yesno"}
+text_types = {"text"}
+skip_types = {"file", "calc", "descriptive", "notes"}
+
+# Choice Code and Label Parser
+option_rgx = re.compile(r"^[0-9\.]{1,17}")
+
+
+def parse_metadata(metadata: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Parses the annotated fields of a REDCap project metadata
+    export into {field_name: {"type": ..., "options": ...}},
+    with the choice strings of dropdown, radio and checkbox
+    fields parsed into options maps. Fields of other types are
+    left out. The result is JSON serializable.
+    """
+    fields: Dict[str, Dict[str, Any]] = {}
+    for field in metadata:
+        field_type = field["field_type"]
+        options: Dict[str, Any] = {}
+        if field_type in complex_types:
+            for option in field["select_choices_or_calculations"].split("|"):
+                k, v = (
+                    option.split(",")[0],
+                    (",".join(option.split(",")[1:])).strip(),
+                )
+                options[str(_parse_choice(k))] = _parse_choice(v)
+        elif field_type in binary_types:
+            options = {"1": "Yes", "0": "No"}
+        elif field_type not in text_types and field_type not in skip_types:
+            continue
+        fields[field["field_name"]] = {"type": field_type, "options": options}
+    return fields
+
+
+def _parse_choice(value: str) -> Any:
+    """
+    Numeric choice codes and labels are read as int; labels
+    that only start with a number are kept as str
+    """
+    if re.match(option_rgx, value):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    return str(value)
+
+
+class RedcapMetadataAnnotations(object):
+    """
+    Compiled annotations of one REDCap project metadata export.
+    Holds the annotation of every field, with the none_map of
+    the ETL merged into the options of fields with choices, so
+    that annotating a report is a lookup of its columns. The
+    annotations are shared by every report using the same
+    metadata and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        metadata_hash: str,
+        fields: Dict[str, Dict[str, Any]],
+        none_map: Dict[Any, Any],
+    ) -> None:
+        self.metadata_hash = metadata_hash
+        self.annotations: Dict[str, Dict[str, Any]] = {}
+        for name, field in fields.items():
+            field_type, options = field["type"], field["options"]
+            self.annotations[name] = {
+                "name": name,
+                "type": field_type,
+                "options": (
+                    options | none_map
+                    if field_type in complex_types or field_type in binary_types
+                    else {}
+                ),
+            }
+        self.field_names: List[str] = sorted(self.annotations)
+
+    def for_columns(self, columns: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Returns the annotations of the REDCap internal variables
+        followed by those of the given columns, by field name
+        """
+        columns = set(columns)
+        return internal_annotations + [
+            self.annotations[name] for name in self.field_names if name in columns
+        ]
+
+
+class RedcapMetadataAnnotationCache(object):
+    """
+    LRU cache of compiled metadata annotations keyed by the
+    hash of the metadata export (and the none_map they are
+    compiled with). With a RedcapSnapshotStore, the parsed
+    fields are also stored there under the metadata hash, so
+    other worker processes and hosts skip the parsing too.
+    """
+
+    def __init__(self, maxsize: int = 16) -> None:
+        self.maxsize = maxsize
+        self.logger = logging.getLogger("RedcapTransform")
+        self._annotations: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        metadata: List[Dict[str, Any]],
+        none_map: Dict[Any, Any],
+        store: Optional[RedcapSnapshotStore] = None,
+    ) -> RedcapMetadataAnnotations:
+        metadata_hash = hashlib.sha256(
+            json.dumps(metadata, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        key = (metadata_hash, repr(list(none_map.items())))
+        with self._lock:
+            if key in self._annotations:
+                self._annotations.move_to_end(key)
+                return self._annotations[key]
+
+        fields = self._get_fields(metadata, metadata_hash, store)
+        annotations = RedcapMetadataAnnotations(metadata_hash, fields, none_map)
+        with self._lock:
+            self._annotations[key] = annotations
+            self._annotations.move_to_end(key)
+            while len(self._annotations) > self.maxsize:
+                self._annotations.popitem(last=False)
+        return annotations
+
+    def clear(self) -> None:
+        with self._lock:
+            self._annotations.clear()
+
+    def _get_fields(
+        self,
+        metadata: List[Dict[str, Any]],
+        metadata_hash: str,
+        store: Optional[RedcapSnapshotStore],
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Internal method. Reads the parsed fields from the store,
+        or parses the metadata and stores them.
+        """
+        object_key = f"annotations-{metadata_hash}"
+        if store is not None:
+            data = store.get_object(object_key)
+            if data is not None:
+                return json.loads(gzip.decompress(data).decode("utf-8"))
+
+        fields = parse_metadata(metadata)
+        if store is not None:
+            try:
+                store.put_object(
+                    object_key,
+                    gzip.compress(json.dumps(fields).encode("utf-8"), mtime=0),
+                )
+            except Exception as error:
+                self.logger.warning(f"Unable to store metadata annotations: {error}")
+        return fields
+
+
+# Shared by Every RedcapTransform of This Process
+redcap_metadata_annotations = RedcapMetadataAnnotationCache()
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
@@ -0,0 +1,1503 @@
+# Library Modules
+from typing import Any, Callable, Union, List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import re, os, csv, json, hashlib, logging
+
+# Third Party Modules
+import pandas as pd
+import numpy as np
+
+from modules.etl.sources import RedcapSource, RedcapCachedSource, get_snapshot_store
+
+from .dimension_cube import DimensionCube
+from .redcap_debug_snapshots import get_debug_snapshot_writer
+from .redcap_metadata_annotations import redcap_metadata_annotations
+from .redcap_transform_memo import fingerprint, redcap_transform_memo
+from .redcap_transform_state import RedcapTransformState, redcap_transform_states
+
+
+class RedcapTransform(object):
+    """
+    REDCap ETL engine. Reads the project metadata and the
+    configured reports from a RedcapSource, applies each
+    report's transform stack, merges the reports and then
+    applies the post-merge transforms.
+    """
+
+    def __init__(self, config: dict, source: RedcapSource) -> None:
+
+        #
+        # Config
+        #
+
+        # Get CWD
+        self.cwd = os.getcwd()
+
+        # REDCap Data Source
+        self.source = source
+
+        # Raw Export Snapshot Cache (Default: None, No Caching)
+        self.source_cache_config = (
+            config["source_cache"] if "source_cache" in config else None
+        )
+        if self.source_cache_config is not None:
+            self.source = RedcapCachedSource(
+                source, get_snapshot_store(self.source_cache_config)
+            )
+
+        # Shared Metadata Annotation Store (Default: None, In-Process Only)
+        self.annotation_cache_config = (
+            config["annotation_cache"] if "annotation_cache" in config else None
+        )
+        self.annotation_store = (
+            get_snapshot_store(self.annotation_cache_config)
+            if self.annotation_cache_config is not None
+            else None
+        )
+
+        # Debug Snapshots of Raw Reports (Default: None, No Snapshots)
+        self.debug_snapshots_config = (
+            config["debug_snapshots"] if "debug_snapshots" in config else None
+        )
+        self.debug_snapshot_writer = (
+            get_debug_snapshot_writer(self.debug_snapshots_config)
+            if self.debug_snapshots_config is not None
+            else None
+        )
+
+        # Data Config
+        self.index_columns = (
+            config["index_columns"] if "index_columns" in config else ["record_id"]
+        )
+
+        # REDCap Reports Config
+        self.reports_configs = config["reports"] if "reports" in config else []
+
+        # Report Merging
+        self.post_transform_merge = (
+            config["post_transform_merge"]
+            if "post_transform_merge" in config
+            else ([], [])
+        )
+
+        # Merged Columns (Default: None, Every Report Column)
+        self.merged_columns = (
+            frozenset(config["merged_columns"]) if "merged_columns" in config else None
+        )
+
+        # Post Merge Transforms
+        self.post_merge_transforms = (
+            config["post_merge_transforms"] if "post_merge_transforms" in config else []
+        )
+
+        # Column Value Separator
+        self.multivalue_separator = (
+            config["multivalue_separator"] if "multivalue_separator" in config else "|"
+        )
+
+        # CSV Float Format (Default: "%.2f")
+        self.csv_float_format = (
+            config["csv_float_format"] if "csv_float_format" in config else "%.2f"
+        )
+
+        # Maximum Concurrent Source Requests (Default: 4)
+        self.max_concurrent_requests = (
+            config["max_concurrent_requests"]
+            if "max_concurrent_requests" in config
+            else 4
+        )
+
+        self.missing_value_generic = (
+            config["missing_value_generic"]
+            if "missing_value_generic" in config
+            else "Value Unavailable"
+        )
+
+        # Transform Stage Memoization (Default: False, No Memoization)
+        self.memoize_transforms = (
+            config["memoize_transforms"] if "memoize_transforms" in config else False
+        )
+
+        # Stages Cached When Memoizing: Every Nth and the Last (Default: 3)
+        self.memoize_stage_interval = max(
+            1,
+            (
+                config["memoize_stage_interval"]
+                if "memoize_stage_interval" in config
+                else 3
+            ),
+        )
+
+        # Incremental Runs (Default: False, Transform Every Record)
+        # - Only the Transform Stage Is Incremental: the REDCap Report
+        #   Export API Has No Record Filter, So Any Change Still
+        #   Re-Exports Every Report in Full
+        self.incremental = config["incremental"] if "incremental" in config else False
+
+        # Categorical Option Columns (Default: False, str Columns)
+        self.categorical_columns = (
+            config["categorical_columns"] if "categorical_columns" in config else False
+        )
+
+        # Dimension Cube of the Merged Data (Default: None, No Cube)
+        self.cube_config = config["cube"] if "cube" in config else None
+        self.cube: Union[DimensionCube, None] = None
+
+        # Logging Config
+        self.logging_config = (
+            config["logging_config"]
+            if "logging_config" in config
+            else {
+                "encoding": "utf-8",
+                "filename": "REDCapETL.log",
+                "level": logging.INFO,
+            }
+        )
+
+        # Configure Logging
+        logging.basicConfig(**self.logging_config)
+        self.logger = logging.getLogger("RedcapTransform")
+        self.logger.info(f"REDCap {source.name.title()} Transform")
+
+        #
+        # REDCap Parsing Variables
+        #
+
+        # General Parsing Variables
+        self.none_values = [
+            np.nan,
+            pd.NaT,
+            None,
+            "nan",
+            "NaN",
+            "-",
+            "",
+            self.missing_value_generic,
+        ]
+        self.none_map = {key: self.missing_value_generic for key in self.none_values}
+        self.survey_instrument_map = {
+            "2": "Complete",
+            "1": "Unverified",
+            "0": "Incomplete",
+            "": self.missing_value_generic,
+        }
+
+        self.logger.info(f"Initialized")
+
+        #
+        # Setup Reports & Apply Transforms
+        #
+
+        # Previous Run, if Incremental
+        fetched_at = datetime.now(timezone.utc)
+        state_key = self._get_state_key()
+        state = redcap_transform_states.get(state_key) if self.incremental else None
+        changed_records = (
+            self.source.get_changed_records(state.fetched_at)
+            if state is not None
+            else None
+        )
+        if state is not None and changed_records is not None:
+            self.logger.info(
+                f"{len(changed_records)} REDCap records changed since {state.fetched_at.isoformat()}"
+            )
+
+        # Load REDCap Project Metadata & Reports (in Full Unless Nothing Changed)
+        if changed_records is not None and len(changed_records) == 0:
+            self.metadata, fetched_reports = state.metadata, state.reports
+        else:
+            self.logger.info(
+                f"Retrieving {self.source.name.title()} REDCap project data and reports"
+            )
+            self.metadata, fetched_reports = self._fetch_source_data()
+
+        # Compiled Metadata Annotations (Parsed Once per Metadata Export)
+        self.annotations = redcap_metadata_annotations.get(
+            self.metadata, self.none_map, self.annotation_store
+        )
+
+        # Fingerprints of the Inputs Shared by Every Report
+        self.settings_fingerprint: Union[str, None] = None
+        self.metadata_fingerprint: Union[str, None] = None
+        if self.memoize_transforms:
+            self.settings_fingerprint = fingerprint(
+                self.index_columns,
+                self.multivalue_separator,
+                self.missing_value_generic,
+                self.categorical_columns,
+            )
+            self.metadata_fingerprint = self.annotations.metadata_hash
+
+        # Get & Structure Report
+        self.reports = {}
+        for report_config in self.reports_configs:
+            # Get Report
+            report_key = report_config["key"]
+            report_kwdargs = report_config["kwdargs"]
+            report_transforms = report_config["transforms"]
+            report = fetched_reports[report_key]
+            if self.debug_snapshot_writer is not None:
+                self.debug_snapshot_writer.submit(
+                    f"etl-redcap-export-{self.source.name}-{report_kwdargs['report_id']}",
+                    report,
+                )
+            annotation = self._get_redcap_type_metadata(report)
+            if self.categorical_columns:
+                report = self._categorize_columns(report, annotation)
+            # Structure Reports
+            self.reports[report_key] = {
+                "id": report_kwdargs["report_id"],
+                "df": report,
+                "transforms": report_transforms,
+                "transformed": None,
+                "annotation": annotation,
+                "fingerprint": None,
+            }
+
+        # Transform, Merge & Splice Changed Records, or All Records
+        merged = None
+        if changed_records is not None and len(changed_records) == 0:
+            for report_key, report_object in self.reports.items():
+                report_object["transformed"] = state.transformed[report_key]
+            merged = state.merged
+        elif changed_records is not None:
+            merged = self._splice_changed_records(
+                state, changed_records, self._transform_reports(changed_records)
+            )
+            if merged is None:
+                self.logger.info(
+                    f"Changed REDCap records can not be spliced, transforming all records"
+                )
+        self.merged = merged if merged is not None else self._transform_reports()
+
+        # Keep This Run for the Next Incremental Run
+        if self.incremental:
+            redcap_transform_states.set(
+                state_key,
+                RedcapTransformState(
+                    fetched_at=fetched_at,
+                    metadata=self.metadata,
+                    reports={
+                        report_key: report_object["df"]
+                        for report_key, report_object in self.reports.items()
+                    },
+                    transformed={
+                        report_key: report_object["transformed"]
+                        for report_key, report_object in self.reports.items()
+                    },
+                    merged=self.merged,
+                ),
+            )
+
+        # Precompute Dimension Counts for Module Transforms
+        if self.cube_config is not None:
+            self.logger.info(f"Building REDCap dimension cube")
+            self.cube = DimensionCube(
+                self.merged,
+                self.cube_config["dimensions"],
+                self.cube_config["measures"],
+            )
+
+        self.logger.info(f"REDCap transforms complete")
+
+        return
+
+    #
+    # Getters
+    #
+
+    def get_report_id(self, report_key: str) -> str:
+        """
+        Returns a str instance of the REDCap report ID.
+        """
+        return self.reports[report_key]["id"]
+
+    def get_report_df(self, report_key: str) -> pd.DataFrame:
+        """
+        Returns a pd.DataFrame instance containing the report.
+        """
+        return self.reports[report_key]["df"]
+
+    def get_report_transformed_df(self, report_key: str) -> pd.DataFrame:
+        """
+        Returns a pd.DataFrame instance containing the report
+        with normalization transforms applied.
+        """
+        return self.reports[report_key]["transformed"]
+
+    def get_report_transforms(
+        self, report_key: str
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Returns a list of transforms that will be applied to
+        the report
+        """
+        return self.reports[report_key]["transforms"]
+
+    def get_report_annotations(self, report_key: str) -> List[Dict[str, Any]]:
+        """
+        Returns a list of annotations generated from the
+        REDCap metadata API call.
+        """
+        return self.reports[report_key]["annotations"]
+
+    #
+    # Source Retrieval
+    #
+
+    def _fetch_source_data(
+        self,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, pd.DataFrame]]:
+        """
+        Retrieves the project metadata and every configured
+        report from the source at the same time, using up to
+        self.max_concurrent_requests worker threads. Returns
+        the metadata and a dictionary of reports by report key.
+        Reports are always exported in full, also in incremental
+        runs: REDCap report exports can not be limited to the
+        changed records (export_records could be, but would not
+        apply the report's filters), so incremental runs only
+        save the transform work of unchanged records.
+        """
+        self.source.prepare_fetch(self.reports_configs)
+        max_workers = max(1, self.max_concurrent_requests)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            metadata_future = executor.submit(self.source.get_metadata)
+            report_futures = {
+                report_config["key"]: executor.submit(
+                    self.source.get_report, report_config
+                )
+                for report_config in self.reports_configs
+            }
+            metadata = metadata_future.result()
+            reports = {
+                report_key: report_future.result()
+                for report_key, report_future in report_futures.items()
+            }
+
+        return metadata, reports
+
+    #
+    # Report Merging
+    #
+
+    def _merge_reports(
+        self,
+        index_columns: List[str],
+        merge_steps: List[Tuple[str, Dict[str, Any]]],
+    ) -> pd.DataFrame:
+        """
+        Performs N - 1 merge transforms on N reports. Inner
+        merges on the index columns of reports with one row per
+        index are performed as a single join, otherwise the
+        reports are merged one after another. With
+        merged_columns, only those columns (and the index
+        columns) are kept.
+        """
+
+        df_receiving_report = self._join_reports(index_columns, merge_steps)
+        if df_receiving_report is not None:
+            return df_receiving_report
+
+        receiving_report_key, _ = merge_steps[0]
+        df_receiving_report = self.reports[receiving_report_key]["transformed"][
+            index_columns
+        ]
+
+        if len(merge_steps) > 0:
+            for providing_report_key, merge_kwdargs in merge_steps:
+                df_providing_report = self.reports[providing_report_key]["transformed"]
+                df_receiving_report = df_receiving_report.merge(
+                    df_providing_report, **merge_kwdargs
+                )
+        else:
+            self.logger.warn(
+                f"Unable to Merge – No merge steps provided, returning receiving_report pd.DataFrame."
+            )
+
+        if self.merged_columns is not None:
+            df_receiving_report = df_receiving_report[
+                [
+                    column
+                    for column in df_receiving_report.columns
+                    if column in index_columns or column in self.merged_columns
+                ]
+            ]
+
+        return df_receiving_report
+
+    def _join_reports(
+        self,
+        index_columns: List[str],
+        merge_steps: List[Tuple[str, Dict[str, Any]]],
+    ) -> Union[pd.DataFrame, None]:
+        """
+        Internal method. Joins the reports of inner merge steps
+        on the index columns in one pass: each report is indexed
+        once, the index values found in every report are kept in
+        the receiving report's order, and each report's rows and
+        (kept) columns are taken in a single step. Overlapping
+        columns are suffixed as merge would. Returns None if a
+        step is not an inner merge on the index columns, or if
+        a report has repeated index values.
+        """
+        steps: List[Tuple[pd.DataFrame, pd.Index, List[int], List[str]]] = []
+        names = set(index_columns)
+        for step, (report_key, merge_kwdargs) in enumerate(merge_steps):
+            if len(set(merge_kwdargs) - {"on", "how", "suffixes"}) > 0:
+                return None
+            on = merge_kwdargs["on"] if "on" in merge_kwdargs else None
+            how = merge_kwdargs["how"] if "how" in merge_kwdargs else "inner"
+            suffixes = (
+                merge_kwdargs["suffixes"]
+                if "suffixes" in merge_kwdargs
+                else ("_x", "_y")
+            )
+            on = [on] if isinstance(on, str) else on
+            if how != "inner" or on is None or list(on) != list(index_columns):
+                return None
+
+            # Index Columns of Differing Types Are Left to merge
+            df = self.reports[report_key]["transformed"]
+            if len(steps) > 0 and any(
+                df[column].dtype != steps[0][0][column].dtype
+                for column in index_columns
+            ):
+                return None
+            index = (
+                pd.Index(df[index_columns[0]])
+                if len(index_columns) == 1
+                else pd.MultiIndex.from_frame(df[index_columns])
+            )
+            if not index.is_unique:
+                return None
+
+            # Name Columns as the Chained Merges Would
+            positions, columns = [], []
+            for position, column in enumerate(df.columns):
+                if column in index_columns:
+                    if step == 0:
+                        positions.append(position)
+                        columns.append(column)
+                    continue
+                name = column
+                if column in names:
+                    if suffixes[0] is not None or suffixes[1] is None:
+                        return None
+                    name = f"{column}{suffixes[1]}"
+                    if name in names:
+                        return None
+                positions.append(position)
+                columns.append(name)
+            names.update(columns)
+            steps.append((df, index, positions, columns))
+
+        if len(steps) == 0:
+            return None
+
+        # Index Values Found in Every Report, in Receiving Report Order
+        receiving_index = steps[0][1]
+        found = np.ones(len(receiving_index), dtype=bool)
+        for _, index, _, _ in steps[1:]:
+            found &= index.get_indexer(receiving_index) >= 0
+        joined_index = receiving_index[found]
+
+        frames = []
+        for df, index, positions, columns in steps:
+            if self.merged_columns is not None:
+                kept = [
+                    i
+                    for i, column in enumerate(columns)
+                    if column in index_columns or column in self.merged_columns
+                ]
+                positions = [positions[i] for i in kept]
+                columns = [columns[i] for i in kept]
+            frame = df.iloc[index.get_indexer(joined_index), positions]
+            frame.columns = columns
+            frame.index = pd.RangeIndex(len(joined_index))
+            frames.append(frame)
+
+        return pd.concat(frames, axis=1, copy=False)
+
+    #
+    # Incremental Runs
+    #
+
+    def _get_state_key(self) -> str:
+        """
+        Internal method. Identifies the source and report
+        selection of this run among the stored run states.
+        """
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    self.source.source_id,
+                    [
+                        [
+                            report_config["key"],
+                            report_config["kwdargs"]["report_id"],
+                            report_config["filename"],
+                        ]
+                        for report_config in self.reports_configs
+                    ],
+                    (
+                        sorted(self.merged_columns)
+                        if self.merged_columns is not None
+                        else None
+                    ),
+                ]
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def _splice_changed_records(
+        self,
+        state: RedcapTransformState,
+        records: List[str],
+        merged: pd.DataFrame,
+    ) -> Union[pd.DataFrame, None]:
+        """
+        Internal method. Replaces the rows of the changed
+        records in the previous run's transformed reports and
+        merged pd.DataFrame with their newly transformed rows,
+        and returns the spliced merged pd.DataFrame. Report,
+        merge and post-merge transforms apply to each record's
+        rows independently, so the result matches transforming
+        every record, unless the changed rows produce different
+        columns (e.g. a repeat instrument none of them has), in
+        which case None is returned.
+        """
+        index_column = self.index_columns[0]
+        for report_key, report_object in self.reports.items():
+            if list(report_object["transformed"].columns) != list(
+                state.transformed[report_key].columns
+            ):
+                return None
+        if list(merged.columns) != list(state.merged.columns):
+            return None
+
+        for report_key, report_object in self.reports.items():
+            report_object["transformed"] = self._splice_records(
+                state.transformed[report_key],
+                report_object["transformed"],
+                records,
+                report_object["df"][index_column],
+            )
+
+        # Merged Rows Follow the Receiving Report
+        receiving_report_key, _ = self.post_transform_merge[1][0]
+        return self._splice_records(
+            state.merged,
+            merged,
+            records,
+            self.reports[receiving_report_key]["transformed"][index_column],
+        )
+
+    def _splice_records(
+        self,
+        previous: pd.DataFrame,
+        changed: pd.DataFrame,
+        records: List[str],
+        order: pd.Series,
+    ) -> pd.DataFrame:
+        """
+        Internal utility function. Drops the rows of records
+        from previous, appends changed and orders the rows by
+        the first position of their record in order. Rows of
+        the same record keep their relative order.
+        """
+        index_column = self.index_columns[0]
+        kept = previous[~previous[index_column].isin(records)]
+
+        # Categorical Columns Need Matching Categories to Concatenate
+        for column in kept.columns:
+            if isinstance(kept[column].dtype, pd.CategoricalDtype) and isinstance(
+                changed[column].dtype, pd.CategoricalDtype
+            ):
+                try:
+                    categories = sorted(
+                        set(kept[column].cat.categories)
+                        | set(changed[column].cat.categories)
+                    )
+                except TypeError:
+                    continue
+                kept = kept.assign(
+                    **{column: kept[column].cat.set_categories(categories)}
+                )
+                changed = changed.assign(
+                    **{column: changed[column].cat.set_categories(categories)}
+                )
+
+        spliced = pd.concat([kept, changed], ignore_index=True)
+        positions = pd.Index(pd.unique(order)).get_indexer(spliced[index_column])
+        positions[positions < 0] = len(order)
+        return spliced.iloc[np.argsort(positions, kind="stable")].reset_index(
+            drop=True
+        )
+
+    #
+    # Transform Applicator
+    #
+
+    # Transforms & Merges Reports
+    def _transform_reports(
+        self, records: Union[List[str], None] = None
+    ) -> pd.DataFrame:
+        """
+        Internal method that applies the report transforms,
+        merges the reports and applies the post-merge
+        transforms. With records, only the rows of those
+        records (by the first index column) are transformed.
+        Returns the merged pd.DataFrame.
+        """
+        # Apply Pre-Merge Report Transforms
+        self.logger.info(f"Applying REDCap report transforms")
+        for report_key, report_object in self.reports.items():
+            self._apply_report_transforms(report_key, records)
+
+        # Merge Reports
+        self.logger.info(f"Merging REDCap reports")
+        index_columns, merge_steps = self.post_transform_merge
+        merged, merge_key = None, None
+        if self.memoize_transforms:
+            merge_key = fingerprint(
+                "merge",
+                [
+                    report_object["fingerprint"]
+                    for report_object in self.reports.values()
+                ],
+                index_columns,
+                merge_steps,
+                self.merged_columns,
+            )
+            merged = redcap_transform_memo.get(merge_key)
+        if merged is None:
+            merged = self._merge_reports(index_columns, merge_steps)
+            if self.memoize_transforms:
+                redcap_transform_memo.set(merge_key, merged)
+
+        # Apply Post-Merge Transforms
+        self.logger.info(f"Applying REDCap report post-merge transforms")
+        merged, _ = self._apply_transform_stack(
+            merged, self.post_merge_transforms, merge_key
+        )
+
+        return merged
+
+    # Applies Declared Transforms to Reports
+    def _apply_report_transforms(
+        self, report_key: str, records: Union[List[str], None] = None
+    ) -> None:
+        """
+        Interal method that applies the transforms to each
+        report as an idempotent transform stack.
+        """
+        report = self.reports[report_key]
+        annotation = report["annotation"]
+        df = report["df"]
+        if records is not None:
+            index_column = self.index_columns[0]
+            df = df[df[index_column].isin(records)].copy()
+        input_key = (
+            fingerprint(
+                "report", self.settings_fingerprint, self.metadata_fingerprint, df
+            )
+            if self.memoize_transforms
+            else None
+        )
+        report["transformed"], report["fingerprint"] = self._apply_transform_stack(
+            df, report["transforms"], input_key, annotation
+        )
+
+        return
+
+    def _apply_transform_stack(
+        self,
+        df: pd.DataFrame,
+        transforms: List[Tuple[str, Dict[str, Any]]],
+        input_key: Union[str, None],
+        annotation: Union[List[Dict[str, Any]], None] = None,
+    ) -> Tuple[pd.DataFrame, Union[str, None]]:
+        """
+        Internal method that applies transforms to df in turn.
+        When memoizing, stage outputs are cached under the
+        fingerprint of the input and of the transforms up to
+        them, so only the stages after the deepest cached one
+        run: changing one transform reruns the stages from the
+        last cached stage before it. As each cached frame is a
+        copy, only every memoize_stage_interval-th stage and the
+        last stage are cached. Returns the output and the
+        fingerprint of the last stage.
+        """
+        stage_keys: List[str] = []
+        if self.memoize_transforms:
+            stage_key = input_key
+            for transform_name, transform_kwdargs in transforms:
+                stage_key = fingerprint(stage_key, transform_name, transform_kwdargs)
+                stage_keys.append(stage_key)
+
+        # Resume After the Deepest Cached Stage
+        start = 0
+        for index in reversed(range(len(stage_keys))):
+            if self._is_memoized_stage(index, len(stage_keys)):
+                cached = redcap_transform_memo.get(stage_keys[index])
+                if cached is not None:
+                    df, start = cached, index + 1
+                    break
+
+        for index in range(start, len(transforms)):
+            transform_name, transform_kwdargs = transforms[index]
+            if annotation is not None:
+                transform_kwdargs = transform_kwdargs | {"annotation": annotation}
+            df = self.apply_transform(df, transform_name, transform_kwdargs)
+            if len(stage_keys) > 0 and self._is_memoized_stage(index, len(stage_keys)):
+                redcap_transform_memo.set(stage_keys[index], df)
+
+        return df, stage_keys[-1] if len(stage_keys) > 0 else input_key
+
+    def _is_memoized_stage(self, index: int, stage_count: int) -> bool:
+        """
+        Internal method. Whether the output of the stage at index
+        (of stage_count stages) is cached when memoizing.
+        """
+        return (
+            index == stage_count - 1 or (index + 1) % self.memoize_stage_interval == 0
+        )
+
+    def apply_transform(
+        self,
+        df: pd.DataFrame,
+        transform_name: str,
+        transform_kwdargs: Dict[str, Any] = {},
+    ) -> pd.DataFrame:
+        return getattr(self, f"_{transform_name}")(df, **transform_kwdargs)
+
+    #
+    # Transforms - Columns
+    #
+
+    #
+    # Drop Columns
+    #
+
+    def _drop_columns(
+        self,
+        df: pd.DataFrame,
+        columns: List[str] = [],
+        annotation: List[Dict[str, Any]] = [],
+    ) -> pd.DataFrame:
+        columns = self._resolve_columns_with_dataframe(df=df, columns=columns, default_columns=[])
+        df = df.drop(columns=columns)
+        return df
+
+    def drop_columns(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """
+        Drop columns from pd.DataFrame.
+        """
+        return self._drop_columns(df=df, columns=columns)
+
+    #
+    # Keep Columns
+    #
+
+    def _keep_columns(
+        self,
+        df: pd.DataFrame,
+        columns: List[str] = [],
+        annotation: List[Dict[str, Any]] = [],
+    ) -> pd.DataFrame:
+        columns = list(
+            set(df.columns)
+            - set(self._resolve_columns_with_dataframe(df=df, columns=columns, default_columns=df.columns))
+        )
+        df = df.drop(columns=columns)
+        return df
+
+    def keep_columns(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """
+        Keep only selected columns in pd.DataFrame.
+        """
+        return self._keep_columns(df=df, columns=columns)
+
+    #
+    # Transform - Append Column Prefix
+    #
+
+    def _append_column_suffix(
+        self,
+        df: pd.DataFrame,
+        columns: List[str] = [],
+        suffix: str = "",
+        separator: str = "",
+        annotation: List[Dict[str, Any]] = [],
+    ) -> pd.DataFrame:
+        columns = self._resolve_columns_with_dataframe(df=df, columns=columns, default_columns=[])
+        df[columns] = df[columns].rename(
+            mapper=lambda name: f"{name}{separator}{suffix}"
+        )
+        return df
+
+    def append_column_suffix(
+        self,
+        df: pd.DataFrame,
+        columns: List[str] = [],
+        suffix: str = "",
+        separator: str = "",
+    ) -> pd.DataFrame:
+        """
+        Append a suffix to columns of pd.DataFrame. Note: If no
+        columns parameter is provided, the suffix is applied every
+        column. If no suffix is provided, the column names remain
+        unchanged. A separator argument allows for the expansion
+        of column names by one or more characters, e.g. "_" for
+        snakecase.
+        """
+        return self._append_column_suffix(
+            df=df, columns=columns, suffix=suffix, separator=separator
+        )
+
+    #
+    # Transform - Prepend Column Prefix
+    #
+
+    def _prepend_column_prefix(
+        self,
+        df: pd.DataFrame,
+        columns: List[str] = [],
+        prefix: str = "",
+        separator: str = "",
+        annotation: List[Dict[str, Any]] = [],
+    ) -> pd.DataFrame:
+        columns = self._resolve_columns_with_dataframe(df=df, columns=columns, default_columns=[])
+        df[columns] = df[columns].rename(
+            mapper=lambda name: f"{prefix}{separator}{name}"
+        )
+        return df
+
+    def prepend_column_prefix(
+        self,
+        df: pd.DataFrame,
+        columns: List[str] = [],
+        prefix: str = "",
+        separator: str = "",
+    ) -> pd.DataFrame:
+        """
+        Append a prefix to columns of pd.DataFrame. Note: If no
+        columns parameter is provided, the prefix is applied every
+        column. If no prefix is provided, the column names remain
+        unchanged. A separator argument allows for the expansion
+        of column names by one or more characters, e.g. "_" for
+        snakecase.
+        """
+        return self._prepend_column_prefix(
+            df=df, columns=columns, prefix=prefix, separator=separator
+        )
+
+    #
+    # Transforms - Remap Values by Columns
+    #
+
+    def _remap_values_by_columns(
+        self,
+        df: pd.DataFrame,
+        columns: List[str],
+        value_map: Dict[str, Any] = {},
+        annotation: List[Dict[str, Any]] = [],
+    ) -> pd.DataFrame:
+        # Resolve Mappable Fields and Available Value Maps
+        columns = self._resolve_columns_with_dataframe(df=df, columns=columns, default_columns=[])
+
+        mappable_fields: List[Dict[str, Any]]
+        if len(value_map) > 0:
+            mappable_fields = [
+                {"name": column, "options": value_map} for column in columns
+            ]
+        else:
+            mappable_fields = [
+                field
+                for field in annotation
+                if len(field["options"]) > 0 and field["name"] in columns
+            ]
+
+        for mappable_field in mappable_fields:
+            column, value_map = mappable_field["name"], mappable_field["options"]
+            df[column] = self._remap_series(df[column], value_map)
+
+        return df
+
+    def _remap_series(self, series: pd.Series, value_map: Dict[str, Any]) -> pd.Series:
+        """
+        Internal utility function. Remaps a column in bulk.
+        Values are factorized so each distinct (possibly
+        multi-valued) string is split, mapped, and re-joined
+        with self.multivalue_separator only once, and the
+        results are then broadcast back to every row by code.
+        Categorical columns are remapped by category.
+        """
+
+        def remap(value: str) -> str:
+            subvalues = [
+                subvalue.strip() for subvalue in value.split(",") if len(subvalue) > 0
+            ]
+            return self.multivalue_separator.join(
+                [value_map[subvalue] for subvalue in subvalues if subvalue in value_map]
+            )
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return self._recode_categorical(series, lambda value: remap(str(value)))
+
+        codes, uniques = pd.factorize(series.astype(str), use_na_sentinel=False)
+        remapped = np.empty(len(uniques), dtype=object)
+        for j, value in enumerate(uniques):
+            remapped[j] = remap(value)
+        return pd.Series(remapped[codes], index=series.index, name=series.name)
+
+    def remap_values_by_columns(
+        self,
+        df: pd.DataFrame,
+        columns: List[str],
+        value_map: Dict[str, Any] = {},
+    ) -> pd.DataFrame:
+        """
+        Remap values by column using a list of annotations.
+        Each annotation is a dictionary containing a the
+        following keys: "name", "type", and "options". Key
+        to this method are then "name" and "options" entries.
+        The value of the "name" corresponds to the
+        pd.DataFrame column name. The value of the"options"
+        entry is a value_map object generated from the
+        REDCapo metadata API request:
+
+        annotation = {
+            "name": field["field_name"],
+            "type": field["field_type"],
+            "options": field["field_options"]
+        }
+
+        If multiple values are found in the field, they will
+        be mapped with a separator. The default separator is
+        a pipe (i.e. "|").
+
+        Returns a transformed pd.DataFrame
+        """
+        return self._remap_values_by_columns(
+            df=df, columns=columns, value_map=value_map
+        )
+
+    #
+    # Transform - Values By Column
+    #
+
+    def _transform_values_by_column(
+        self,
+        df: pd.DataFrame,
+        column: str,
+        new_column_name: str,
+        transform: Callable,
+        missing_value: Any,
+        annotation: List[Dict[str, Any]] = [],
+    ) -> pd.DataFrame:
+        values = df.loc[df[column] != missing_value, column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+        df[new_column_name] = values.apply(transform)
+        df[new_column_name] = df[new_column_name].fillna(missing_value)
+        return df
+
+    def transform_values_by_column(
+        self,
+        df: pd.DataFrame,
+        column: str,
+        new_column_name: str,
+        transform: Callable,
+        missing_value: Any,
+    ) -> pd.DataFrame:
+        """
+        Replace 0-length values or values with keys in
+        self.none_map with self.missing_value_generic.
+        """
+        return self._transform_values_by_column(
+            df=df,
+            column=column,
+            new_column_name=new_column_name,
+            transform=transform,
+            missing_value=missing_value,
+        )
+
+    #
+    # Transform - New Columns From Date Column
+    #
+
+    def _new_columns_from_date_column(
+        self,
+        df: pd.DataFrame,
+        column: str,
+        new_column_names: Dict[str, str],
+        missing_value: Any,
+        date_format: str = "%Y-%m-%d",
+        annotation: List[Dict[str, Any]] = [],
+    ) -> pd.DataFrame:
+        values = df.loc[df[column] != missing_value, column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+        dates = pd.to_datetime(values, format=date_format)
+        isocalendar = dates.dt.isocalendar()
+        derived = {
+            "date": dates,
+            "week": isocalendar["week"].astype(np.int64),
+            "year": isocalendar["year"].astype(np.int64),
+        }
+        for part, new_column_name in new_column_names.items():
+            df[new_column_name] = derived[part]
+            df[new_column_name] = df[new_column_name].fillna(missing_value)
+        return df
+
+    def new_columns_from_date_column(
+        self,
+        df: pd.DataFrame,
+        column: str,
+        new_column_names: Dict[str, str],
+        missing_value: Any,
+        date_format: str = "%Y-%m-%d",
+    ) -> pd.DataFrame:
+        """
+        Parses the dates of column once and adds a column for
+        each requested part: "date", "week" (ISO 8601 week) or
+        "year" (ISO 8601 year), e.g. {"week": "visitweek"}.
+        Rows with missing_value get missing_value.
+        """
+        return self._new_columns_from_date_column(
+            df=df,
+            column=column,
+            new_column_names=new_column_names,
+            missing_value=missing_value,
+            date_format=date_format,
+        )
+
+    #
+    # Transform - Map Missing Values By Columns
+    #
+
+    def _map_missing_values_by_columns(
+        self,
+        df: pd.DataFrame,
+        columns: List[str],
+        missing_value: Any = None,
+        annotation: List[Dict[str, Any]] = [],
+    ) -> pd.DataFrame:
+        columns = self._resolve_columns_with_dataframe(df=df, columns=columns, default_columns=[])
+        missing_value = (
+            missing_value if missing_value is not None else self.missing_value_generic
+        )
+        if len(columns) == 0:
+            return df
+
+        # Recode Categorical Columns by Category
+        none_keys = [key for key in self.none_map.keys() if isinstance(key, str)]
+        categorical_columns = [
+            column
+            for column in columns
+            if isinstance(df[column].dtype, pd.CategoricalDtype)
+        ]
+        for column in categorical_columns:
+            df[column] = self._recode_categorical(
+                df[column],
+                lambda value: (
+                    missing_value if pd.isna(value) or value in none_keys else value
+                ),
+            )
+        columns = [column for column in columns if column not in categorical_columns]
+        if len(columns) == 0:
+            return df
+
+        # Build One Missing Value Mask for the Column Block
+        missing = df[columns].isin(none_keys)
+        for column in columns:
+            if df[column].dtype == object or pd.api.types.is_datetime64_any_dtype(
+                df[column]
+            ):
+                missing[column] |= df[column].isna()
+
+        for column in columns:
+            if missing[column].any():
+                df.loc[missing[column], column] = missing_value
+
+        return df
+
+    def map_missing_values_by_columns(
+        self, df: pd.DataFrame, columns: List[str], missing_value: Any
+    ) -> pd.DataFrame:
+        """
+        Replace 0-length values or values with keys in
+        self.none_map with self.missing_value_generic.
+        """
+        return self._map_missing_values_by_columns(
+            df=df, columns=columns, missing_value=missing_value
+        )
+
+    #
+    # Transforms - Rows
+    #
+
+    #
+    # Drop Rows
+    #
+
+    def _drop_rows(
+        self,
+        df: pd.DataFrame,
+        columns: List[str] = [],
+        condition: Callable = lambda column: column == "",
+        annotation: List[Dict[str, Any]] = [],
+    ) -> pd.DataFrame:
+        columns = self._resolve_columns_with_dataframe(df=df, columns=columns, default_columns=[])
+        df = df[~df[columns].apply(lambda column: column.apply(condition)).any(axis=1)]
+        return df
+
+    def drop_rows(
+        self,
+        df: pd.DataFrame,
+        columns: List[str],
+        condition: Callable = lambda column: column == "",
+    ) -> pd.DataFrame:
+        """
+        Drop rows from pd.DataFrame.
+        """
+        return self._drop_rows(df=df, columns=columns)
+
+    #
+    # Transforms - Aggregation
+    #
+
+    # ...
+
+    #
+    # Transforms - Aggregate Repeat Instruments by Index
+    #
+
+    def _aggregate_repeat_instrument_by_index(
+        self,
+        df: pd.DataFrame,
+        aggregator: str = "max",
+        dtype: Callable = float,
+        annotation: List[Dict[str, Any]] = [],
+    ) -> pd.DataFrame:
+        new_columns = [
+            column
+            for column in df["redcap_repeat_instrument"].unique()
+            if not pd.isna(column)
+        ]
+        pivot = pd.pivot_table(
+            df,
+            index=self.index_columns,
+            columns=["redcap_repeat_instrument"],
+            values="redcap_repeat_instance",
+            aggfunc=aggregator,
+            fill_value=self.missing_value_generic,
+        )
+        df = df.merge(pivot, how="outer", on=self.index_columns)
+        df = df.drop_duplicates(self.index_columns, keep="first")
+        for column in new_columns:
+            df[column] = df[column].astype(dtype)
+        return df
+
+    def aggregate_repeat_instrument_by_index(
+        self, df: pd.DataFrame, aggregator: str = "max", dtype: Callable = float
+    ) -> pd.DataFrame:
+        """
+        Pre-processing REDCap repeat_instrument so each instrument
+        has its own column and the value. The value is computed
+        using an aggregation function applied to the repeat_instance
+        field.
+        """
+        return self._aggregate_repeat_instrument_by_index(
+            df=df, aggregator=aggregator, dtype=dtype
+        )
+
+    #
+    # Generate New Columns
+    #
+
+    def _new_column_from_binary_columns_positive_class(
+        self,
+        df: pd.DataFrame,
+        column_name_map: dict,
+        new_column_name: str = "",
+        all_negative_value: str = "",
+        default_value: str | None = "Value Unavailable",
+        dtype: Callable = float,
+        annotation: List[Dict[str, Any]] = [],
+    ) -> pd.DataFrame:
+        new_column_name = (
+            new_column_name
+            if len(new_column_name) > 0
+            else "_".join(column_name_map.keys())
+        )
+        separator = self.multivalue_separator
+        rgx = f"\\{separator}$"
+        column_names, column_values = list(column_name_map), list(
+            column_name_map.values()
+        )
+
+        # Join the Labels of Each Distinct Combination of Positive Columns
+        positive = np.column_stack(
+            [(df[column_name] == "Yes").to_numpy() for column_name in column_names]
+        )
+        if positive.shape[1] < 63:
+            # Rows as Bit Codes, Factorized by Hashing
+            bits = np.arange(positive.shape[1], dtype=np.int64)
+            inverse, codes = pd.factorize(
+                positive.astype(np.int64) @ (np.int64(1) << bits)
+            )
+            combinations = (codes[:, None] >> bits) & 1 == 1
+        else:
+            combinations, inverse = np.unique(positive, axis=0, return_inverse=True)
+        labels = np.array(
+            [
+                re.sub(
+                    rgx,
+                    "",
+                    "".join(
+                        f"{column_value}{separator}"
+                        for column_value, is_positive in zip(
+                            column_values, combination
+                        )
+                        if is_positive
+                    ),
+                )
+                for combination in combinations
+            ],
+            dtype=object,
+        )
+        values = labels[inverse.reshape(-1)]
+
+        # Rows Without Positive Columns
+        none_positive = ~positive.any(axis=1)
+        has_default = np.column_stack(
+            [
+                (df[column_name] == default_value).to_numpy()
+                for column_name in column_names
+            ]
+        ).any(axis=1)
+        for mask, value in [
+            (none_positive & has_default, default_value),
+            (none_positive & ~has_default, all_negative_value),
+        ]:
+            values[mask] = re.sub(rgx, "", value) if isinstance(value, str) else value
+
+        df[new_column_name] = values
+
+        return df
+
+    def new_column_from_binary_columns_positive_class(
+        self,
+        df: pd.DataFrame,
+        column_name_map: dict,
+        new_column_name: str = "",
+        all_negative_value: str = "",
+        default_value: str | None = "Value Unavailable",
+        dtype: Callable = float,
+    ) -> pd.DataFrame:
+        """
+        Pre-processing REDCap repeat_instrument so each instrument
+        has its own column and the value. The value is computed
+        using an aggregation function applied to the repeat_instance
+        field.
+        """
+        return self._new_column_from_binary_columns_positive_class(
+            df=df,
+            column_name_map=column_name_map,
+            new_column_name=new_column_name,
+            all_negative_value=all_negative_value,
+            default_value=default_value,
+            dtype=dtype,
+        )
+
+    def _new_column_from_binary_columns_negative_class(
+        self,
+        df: pd.DataFrame,
+        column_name_map: dict,
+        new_column_name: str = "",
+        dtype: Callable = float,
+    ) -> pd.DataFrame:
+        new_column_name = (
+            new_column_name
+            if len(new_column_name) > 0
+            else "_".join(column_name_map.keys())
+        )
+        df[new_column_name] = df[list(column_name_map.keys())].idxmin(axis=1)
+        return df
+
+    def new_column_from_binary_columns_negative_class(
+        self,
+        df: pd.DataFrame,
+        column_name_map: dict,
+        new_column_name: str = "",
+        dtype: Callable = float,
+    ) -> pd.DataFrame:
+        """
+        Pre-processing REDCap repeat_instrument so each instrument
+        has its own column and the value. The value is computed
+        using an aggregation function applied to the repeat_instance
+        field.
+        """
+        return self._new_column_from_binary_columns_negative_class(
+            df=df,
+            column_name_map=column_name_map,
+            new_column_name=new_column_name,
+            dtype=dtype,
+        )
+
+    #
+    # Utilities
+    #
+
+    # Transform Prelude - Get Applicable Transform Columns
+    def _resolve_columns_with_dataframe(
+        self, df: pd.DataFrame, columns: List[str], default_columns: List[str]
+    ) -> List[str]:
+        """
+        Internal utility function. Uses set logic to ensure
+        requested columns are available within the target
+        pd.DataFrame.
+        """
+        available_columns, requested_columns = set(df.columns), set(columns)
+        resolved_columns = []
+
+        if len(requested_columns) == 0:
+            self.logger.warn(
+                f"Unexpected Transform – columns parameter has no values. Defaulting to all df.columns"
+            )
+            resolved_columns = default_columns
+        elif len(available_columns & requested_columns) == 0:
+            self.logger.warn(
+                f"Unexpected Transform – none of the requested columns were found in df.columns. Defaulting to all df.columns"
+            )
+            resolved_columns = default_columns
+        elif len(requested_columns - available_columns) > 0:
+            self.logger.warn(
+                f"Unexpected Transform – df.columns missing values present in columns parameter: {', '.join([*requested_columns - available_columns])}. Continuing with union."
+            )
+            resolved_columns = [*(available_columns & requested_columns)]
+        else:
+            resolved_columns = columns
+
+        return resolved_columns
+
+    # Categorical Option Columns
+    def _categorize_columns(
+        self, df: pd.DataFrame, annotation: List[Dict[str, Any]]
+    ) -> pd.DataFrame:
+        """
+        Internal utility function. Converts the str columns of
+        fields with options (radio, dropdown, checkbox and
+        yesno fields) to pd.Categorical, so that remaps apply
+        to categories and groupbys run on integer codes.
+        Categories are sorted, so groupbys keep the order of
+        the str columns.
+        """
+        for field in annotation:
+            column = field["name"]
+            if (
+                len(field["options"]) > 0
+                and column in df.columns
+                and df[column].dtype == object
+            ):
+                try:
+                    codes, uniques = pd.factorize(df[column], sort=True)
+                except TypeError:
+                    continue
+                df[column] = pd.Categorical.from_codes(codes, categories=uniques)
+        return df
+
+    def _recode_categorical(
+        self, series: pd.Series, recode: Callable[[Any], Any]
+    ) -> pd.Series:
+        """
+        Internal utility function. Maps each category of a
+        categorical column, and missing values (NaN), through
+        recode. Categories mapped to the same value are merged
+        and the new categories are sorted. Falls back to an
+        object column if the new values can not be sorted.
+        """
+        categories = series.cat.categories.tolist() + [np.nan]
+        recoded = pd.Series([recode(value) for value in categories], dtype=object)
+        # Missing Values (Code -1) Take the Recoded NaN, the Last Entry
+        series_codes = series.cat.codes.to_numpy()
+        try:
+            codes, uniques = pd.factorize(recoded, sort=True)
+        except TypeError:
+            return pd.Series(
+                recoded.to_numpy()[series_codes], index=series.index, name=series.name
+            )
+        return pd.Series(
+            pd.Categorical.from_codes(codes[series_codes], categories=uniques),
+            index=series.index,
+            name=series.name,
+        )
+
+    #  Extract REDCap Type Metadata
+    def _get_redcap_type_metadata(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Extracts REDCap field name, type, and options (the
+        metadata) for each column in the target pd.DataFrame,
+        from the project metadata annotations compiled once per
+        metadata export
+        """
+        return self.annotations.for_columns(df.columns)
+
+    #
+    # Exports
+    #
+
+    # Export Untransformed (Raw) Reports
+    def export_raw(
+        self, path: str = "", separator: str = "\t", filetype: str = ".tsv"
+    ) -> object:
+        for report_key, report_object in self.reports.items():
+            filename = f"{report_key}_raw{filetype}"
+            filepath = os.path.join(self.cwd, path, filename)
+            transformed = report_object["df"]
+            transformed.to_csv(
+                filepath,
+                sep=separator,
+                quoting=csv.QUOTE_NONNUMERIC,
+                float_format=self.csv_float_format,
+            )
+        return self
+
+    # Export Transformed Reports
+    def export_transformed(
+        self, path: str = "", separator: str = "\t", filetype: str = ".tsv"
+    ) -> object:
+        for report_key, report_object in self.reports.items():
+            filename = f"{report_key}_transformed{filetype}"
+            filepath = os.path.join(self.cwd, path, filename)
+            transformed = report_object["transformed"]
+            transformed.to_csv(
+                filepath,
+                sep=separator,
+                quoting=csv.QUOTE_NONNUMERIC,
+                float_format=self.csv_float_format,
+            )
+        return self
+
+    # Export Merged Transforms
+    def export_merged_transformed(
+        self, path: str = "", separator: str = "\t", filetype: str = ".tsv"
+    ) -> object:
+        filename = f"transformed-merged_redcap-extract{filetype}"
+        filepath = os.path.join(self.cwd, path, filename)
+        self.merged.to_csv(
+            filepath,
+            sep=separator,
+            quoting=csv.QUOTE_NONNUMERIC,
+            float_format=self.csv_float_format,
+        )
+        return self
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
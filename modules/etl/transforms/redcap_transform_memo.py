@@ -0,0 +1,122 @@
+# Library Modules
+from typing import Any, Mapping, Optional
+from collections import OrderedDict
+import hashlib, threading
+
+# Third Party Modules
+import pandas as pd
+
+
+def fingerprint(*values: Any) -> str:
+    """
+    Returns a sha256 hex digest of values. Frames are hashed
+    by their columns, dtypes, index and cell values; functions
+    by their code; containers by their contents. Digests are
+    stable within a process only.
+    """
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update(_fingerprint_value(value).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _fingerprint_value(value: Any) -> str:
+    if isinstance(value, pd.DataFrame):
+        digest = hashlib.sha256()
+        digest.update(repr(list(value.columns)).encode("utf-8"))
+        digest.update(repr([str(dtype) for dtype in value.dtypes]).encode("utf-8"))
+        digest.update(
+            pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes()
+        )
+        return f"df:{digest.hexdigest()}"
+    if hasattr(value, "__code__"):
+        closure = [cell.cell_contents for cell in value.__closure__ or ()]
+        return f"fn:{_fingerprint_code(value.__code__)}:{_fingerprint_value(closure)}"
+    if isinstance(value, Mapping):
+        items = sorted(
+            (repr(key), _fingerprint_value(item)) for key, item in value.items()
+        )
+        return f"map:{items}"
+    if isinstance(value, (list, tuple)):
+        return f"seq:{[_fingerprint_value(item) for item in value]}"
+    if isinstance(value, (set, frozenset)):
+        return f"set:{sorted(_fingerprint_value(item) for item in value)}"
+    return f"{type(value).__name__}:{value!r}"
+
+
+def _fingerprint_code(code: Any) -> str:
+    consts = [
+        _fingerprint_code(const) if hasattr(const, "co_code") else repr(const)
+        for const in code.co_consts
+    ]
+    return hashlib.sha256(
+        repr((code.co_code, consts, code.co_names, code.co_varnames)).encode("utf-8")
+    ).hexdigest()
+
+
+class RedcapTransformMemo(object):
+    """
+    In-process LRU cache of RedcapTransform stage outputs
+    (transformed reports, merged frames and annotations),
+    keyed by the fingerprint of each stage's inputs. Report
+    transforms modify frames in place, so frames are copied
+    in and out of the cache. Frames are evicted, least
+    recently used first, once their total size exceeds
+    max_bytes. Sizes include the str objects of object
+    columns, measured once when a frame is stored.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            value = self._entries[key]
+        return value.copy() if isinstance(value, pd.DataFrame) else value
+
+    def set(self, key: str, value: Any) -> None:
+        size = 0
+        if isinstance(value, pd.DataFrame):
+            value = value.copy()
+            size = int(value.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._entries.move_to_end(key)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(evicted_key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+
+# Shared by Every Memoizing RedcapTransform of This Process
+redcap_transform_memo = RedcapTransformMemo()
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
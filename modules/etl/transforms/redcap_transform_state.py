@@ -0,0 +1,69 @@
+# Library Modules
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+import threading
+
+# Third Party Modules
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class RedcapTransformState:
+    """
+    Output of one RedcapTransform run, kept for the next
+    incremental run: the metadata, each report's raw and
+    transformed frames, the merged frame (after post-merge
+    transforms) and the time the run started fetching.
+    """
+
+    fetched_at: datetime
+    metadata: List[Dict[str, Any]]
+    reports: Dict[str, pd.DataFrame]
+    transformed: Dict[str, pd.DataFrame]
+    merged: pd.DataFrame
+
+
+class RedcapTransformStateStore(object):
+    """
+    In-process LRU store of RedcapTransformStates, keyed by
+    source and report selection. States are replaced, never
+    modified, so readers can share them across threads.
+    """
+
+    def __init__(self, maxsize: int = 16) -> None:
+        self.maxsize = maxsize
+        self._states: "OrderedDict[str, RedcapTransformState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[RedcapTransformState]:
+        with self._lock:
+            if key not in self._states:
+                return None
+            self._states.move_to_end(key)
+            return self._states[key]
+
+    def set(self, key: str, state: RedcapTransformState) -> None:
+        with self._lock:
+            # Keep the Newest State if Runs Overlap
+            if key in self._states and self._states[key].fetched_at > state.fetched_at:
+                return
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.maxsize:
+                self._states.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+# Shared by Every Incremental RedcapTransform of This Process
+redcap_transform_states = RedcapTransformStateStore()
+
+
+if __name__ == "__main__":
+    pass
+else:
+    pass
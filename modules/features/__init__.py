@@ -0,0 +1,6 @@
+"""GrowthBook feature flags"""
+
+from .providers import FeatureProvider, FileFeatureProvider, GrowthBookApiProvider
+from .store import FeatureFlagStore
+
+feature_flags = FeatureFlagStore()
@@ -0,0 +1,54 @@
+"""Sources of GrowthBook feature definitions"""
+
+import json
+from typing import Any, Dict
+
+import requests
+
+
+class FeatureProvider:
+    """Loads the GrowthBook feature definitions, keyed by feature name"""
+
+    def load(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class GrowthBookApiProvider(FeatureProvider):
+    """
+    Fetches the features of an SDK connection from the GrowthBook
+    API (or CDN). Encrypted feature payloads are not supported.
+    """
+
+    def __init__(self, api_host: str, client_key: str, timeout: float = 5.0):
+        self.api_host = api_host.rstrip("/")
+        self.client_key = client_key
+        self.timeout = timeout
+
+    def load(self) -> Dict[str, Any]:
+        response = requests.get(
+            f"{self.api_host}/api/features/{self.client_key}", timeout=self.timeout
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if "features" not in payload:
+            raise ValueError("GrowthBook response has no features")
+        return payload["features"]
+
+
+class FileFeatureProvider(FeatureProvider):
+    """
+    Reads features from a local JSON file, either a GrowthBook API
+    payload ({"features": {...}}) or the features object itself,
+    e.g. {"signup": {"defaultValue": true}}. Used by tests and
+    offline runs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Dict[str, Any]:
+        with open(self.path, "r", encoding="utf-8") as file:
+            payload = json.load(file)
+        if "features" in payload and isinstance(payload["features"], dict):
+            return payload["features"]
+        return payload
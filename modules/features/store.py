@@ -0,0 +1,99 @@
+"""Process-wide GrowthBook feature flags, refreshed in the background"""
+
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+from growthbook import GrowthBook
+
+from .providers import FeatureProvider, FileFeatureProvider, GrowthBookApiProvider
+
+logger = logging.getLogger("FeatureFlags")
+
+
+class FeatureFlagStore:
+    """
+    Holds the GrowthBook features of the process. Features are
+    loaded once when the app starts and then reloaded every
+    FAIRHUB_GROWTHBOOK_REFRESH_INTERVAL seconds (default 60) on a
+    background thread, so requests evaluate flags in memory. A
+    failed reload keeps the last features that loaded.
+
+    Features come from FAIRHUB_GROWTHBOOK_FEATURES_FILE if set,
+    otherwise from the GrowthBook CDN with
+    FAIRHUB_GROWTHBOOK_CLIENT_KEY. Without either, no feature is
+    defined and every flag is off.
+    """
+
+    def __init__(self, provider: Optional[FeatureProvider] = None):
+        self.provider = provider
+        self.interval: float = 60
+        self.loaded_at: Optional[float] = None
+        self._features: Mapping[str, Any] = MappingProxyType({})
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def init_app(self, app: Any) -> None:
+        """Pick the provider, load the features and start refreshing them"""
+        features_file = app.config.get("FAIRHUB_GROWTHBOOK_FEATURES_FILE")
+        client_key = app.config.get("FAIRHUB_GROWTHBOOK_CLIENT_KEY")
+        if features_file:
+            self.provider = FileFeatureProvider(features_file)
+        elif client_key:
+            self.provider = GrowthBookApiProvider(
+                "https://cdn.growthbook.io", client_key
+            )
+        interval = app.config.get("FAIRHUB_GROWTHBOOK_REFRESH_INTERVAL")
+        if interval:
+            self.interval = float(interval)
+
+        self.refresh()
+        if self.provider is not None and not app.config.get("TESTING"):
+            self.start()
+
+    @property
+    def features(self) -> Mapping[str, Any]:
+        """The current (read-only) feature definitions"""
+        return self._features
+
+    def refresh(self) -> bool:
+        """
+        Reload the features from the provider. Returns False, and
+        keeps the current features, if they could not be loaded.
+        """
+        if self.provider is None:
+            return False
+        try:
+            features = self.provider.load()
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            logger.warning("Unable to load feature flags: %s", error)
+            return False
+        with self._lock:
+            self._features = MappingProxyType(dict(features))
+            self.loaded_at = time.time()
+        return True
+
+    def growthbook(self, attributes: Optional[Dict[str, Any]] = None) -> GrowthBook:
+        """A GrowthBook evaluating the current features, without network calls"""
+        return GrowthBook(attributes=attributes or {}, features=dict(self._features))
+
+    def start(self) -> None:
+        """Start the refresh thread if it is not already running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="feature-flags-refresh", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the refresh thread"""
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.refresh()
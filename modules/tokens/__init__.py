@@ -0,0 +1,5 @@
+"""Session token revocation"""
+
+from .revocation import TokenRevocationCache, expires_at
+
+token_revocations = TokenRevocationCache()
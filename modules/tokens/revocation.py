@@ -0,0 +1,158 @@
+"""Cached lookups of revoked (blacklisted) session tokens"""
+
+import datetime
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+import redis
+
+import model
+
+logger = logging.getLogger("TokenRevocation")
+
+# Hash field marking the revocations as loaded (not a token id)
+LOADED_FIELD = "-loaded-"
+
+
+def expires_at(exp: Any) -> float:
+    """
+    Timestamp of a token exp claim or TokenBlacklist.exp value
+    (epoch seconds, or an ISO 8601 date). Tokens live at most 180
+    minutes, which is assumed when exp can not be read.
+    """
+    if isinstance(exp, datetime.datetime):
+        return exp.timestamp()
+    try:
+        return float(exp)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.datetime.fromisoformat(str(exp)).timestamp()
+    except ValueError:
+        return time.time() + 180 * 60
+
+
+class TokenRevocationCache:
+    """
+    Answers whether a token id (jti) is in TokenBlacklist without
+    a database query on the common, non-revoked path.
+
+    With Redis (FAIRHUB_CACHE_TYPE is RedisCache), the unexpired
+    rows are copied into one hash, jti -> expiry, together with a
+    loaded marker, and kept current by TokenBlacklist writes. The
+    hash expires after loaded_ttl seconds and is then copied again,
+    dropping expired tokens. Redis evicts a hash as a whole, so the
+    marker is never present without the revocations loaded with it,
+    and a missing jti means the token is not revoked. Without Redis,
+    or if Redis fails, the table is queried.
+
+    Answers are kept in an in-process LRU: revocations until the
+    token expires, and non-revocations for negative_ttl seconds.
+    Without Redis, a valid token is therefore looked up in the
+    table once every negative_ttl seconds by each process.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        negative_ttl: float = 5,
+        loaded_ttl: int = 3600,
+        prefix: str = "fairhub-token-revoked",
+    ):
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self.loaded_ttl = loaded_ttl
+        self.prefix = prefix
+        self.client: Any = None
+        # jti -> (revoked, valid until)
+        self._entries: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Any) -> None:
+        """Share revocations through Redis when the app cache is a RedisCache"""
+        if app.config.get("FAIRHUB_CACHE_TYPE") == "RedisCache" and app.config.get(
+            "FAIRHUB_CACHE_URL"
+        ):
+            self.client = redis.Redis.from_url(app.config["FAIRHUB_CACHE_URL"])
+
+    def is_revoked(self, jti: str, exp: Any = None) -> bool:
+        """Whether the token jti (expiring at exp) is revoked"""
+        now = time.time()
+        with self._lock:
+            if jti in self._entries:
+                revoked, valid_until = self._entries[jti]
+                if valid_until > now:
+                    self._entries.move_to_end(jti)
+                    return revoked
+                del self._entries[jti]
+
+        revoked = self._lookup(jti)
+        if revoked:
+            self._remember(jti, True, expires_at(exp) if exp is not None else now)
+        else:
+            self._remember(jti, False, now + self.negative_ttl)
+        return revoked
+
+    def revoke(self, jti: str, exp: Any) -> None:
+        """Record a revocation until the token expires"""
+        valid_until = expires_at(exp)
+        self._remember(jti, True, valid_until)
+        if self.client is not None:
+            try:
+                self.client.hset(self.prefix, jti, valid_until)
+            except redis.RedisError as error:
+                logger.warning("Unable to share token revocation: %s", error)
+
+    def forget(self, jti: str) -> None:
+        """Drop a revocation (the TokenBlacklist row was deleted)"""
+        with self._lock:
+            self._entries.pop(jti, None)
+        if self.client is not None:
+            try:
+                self.client.hdel(self.prefix, jti)
+            except redis.RedisError as error:
+                logger.warning("Unable to share token revocation: %s", error)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, jti: str) -> bool:
+        if self.client is not None:
+            try:
+                loaded, valid_until = self.client.hmget(
+                    self.prefix, [LOADED_FIELD, jti]
+                )
+                if loaded is None:
+                    valid_until = self._load().get(jti)
+                return valid_until is not None and float(valid_until) > time.time()
+            except redis.RedisError as error:
+                logger.warning("Unable to read token revocations: %s", error)
+        return model.db.session.get(model.TokenBlacklist, jti) is not None
+
+    def _load(self) -> Dict[str, float]:
+        """Copy the unexpired TokenBlacklist rows to Redis in one transaction"""
+        now = time.time()
+        revocations = {}
+        for jti, exp in model.db.session.query(
+            model.TokenBlacklist.jti, model.TokenBlacklist.exp
+        ):
+            valid_until = expires_at(exp)
+            if valid_until > now:
+                revocations[jti] = valid_until
+
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.hset(self.prefix, mapping={**revocations, LOADED_FIELD: now})
+        pipeline.expire(self.prefix, self.loaded_ttl)
+        pipeline.execute()
+        return revocations
+
+    def _remember(self, jti: str, revoked: bool, valid_until: float) -> None:
+        with self._lock:
+            self._entries[jti] = (revoked, valid_until)
+            self._entries.move_to_end(jti)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
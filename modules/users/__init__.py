@@ -0,0 +1,6 @@
+"""Cached identities of signed-in users"""
+
+from .cache import UserPrincipalCache
+from .principal import UserPrincipal
+
+user_principals = UserPrincipalCache()
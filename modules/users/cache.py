@@ -0,0 +1,162 @@
+"""Cached lookups of user principals"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+import redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload
+
+import model
+
+from .principal import UserPrincipal
+
+logger = logging.getLogger("UserPrincipals")
+
+
+class UserPrincipalCache:
+    """
+    Loads the UserPrincipal of a user id without a database query
+    on most requests. Principals are kept in an in-process LRU for
+    ttl seconds and, with Redis (FAIRHUB_CACHE_TYPE is RedisCache),
+    shared as JSON for redis_ttl seconds. Writes to User and
+    UserDetails rows invalidate both, when flushed and again when
+    committed or rolled back (a request may cache the old row, or
+    the flushed one, in between), so other processes see a change after at most ttl seconds.
+    Without Redis, or if Redis fails, the user is loaded from the
+    database.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl: float = 30,
+        redis_ttl: int = 300,
+        prefix: str = "fairhub-user",
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+        self.prefix = prefix
+        self.client: Any = None
+        # user id -> (principal, valid until)
+        self._entries: "OrderedDict[str, Tuple[UserPrincipal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    def init_app(self, app: Any) -> None:
+        """Share principals through Redis when the app cache is a RedisCache"""
+        if app.config.get("FAIRHUB_CACHE_TYPE") == "RedisCache" and app.config.get(
+            "FAIRHUB_CACHE_URL"
+        ):
+            self.client = redis.Redis.from_url(app.config["FAIRHUB_CACHE_URL"])
+
+    def get(self, user_id: str) -> Optional[UserPrincipal]:
+        """The principal of a user id, None if there is no such user"""
+        now = time.time()
+        with self._lock:
+            if user_id in self._entries:
+                principal, valid_until = self._entries[user_id]
+                if valid_until > now:
+                    self._entries.move_to_end(user_id)
+                    return principal
+                del self._entries[user_id]
+
+        principal, generation = self._read(user_id)
+        if principal is None:
+            principal = self._load(user_id)
+            if principal is None:
+                return None
+            self._write(principal, generation)
+        self._remember(principal, now + self.ttl)
+        return principal
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop the cached principal of a user (the user or its details changed)"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if self.client is not None:
+            try:
+                pipeline = self.client.pipeline()
+                pipeline.incr(self._generation_key(user_id))
+                # Outlives Entries Stored by Loads Started Before the Bump
+                pipeline.expire(self._generation_key(user_id), 2 * self.redis_ttl)
+                pipeline.delete(f"{self.prefix}:{user_id}")
+                pipeline.execute()
+            except redis.RedisError as error:
+                logger.warning("Unable to invalidate user principal: %s", error)
+
+    def invalidate_on_commit(self, session: Any, user_id: str) -> None:
+        """Invalidate a user now and again when session commits or rolls back"""
+        self.invalidate(user_id)
+        if session is not None:
+            session.info.setdefault(self.prefix, set()).add(user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _after_commit(self, session: Any) -> None:
+        for user_id in session.info.pop(self.prefix, ()):
+            self.invalidate(user_id)
+
+    def _after_rollback(self, session: Any) -> None:
+        for user_id in session.info.pop(self.prefix, ()):
+            self.invalidate(user_id)
+
+    def _load(self, user_id: str) -> Optional[UserPrincipal]:
+        user = (
+            model.User.query.options(joinedload(model.User.user_details))
+            .filter(model.User.id == user_id)
+            .one_or_none()
+        )
+        return UserPrincipal.from_user(user) if user is not None else None
+
+    def _read(self, user_id: str) -> Tuple[Optional[UserPrincipal], int]:
+        """
+        The shared principal of a user, if it is of the current
+        generation, and the current generation
+        """
+        if self.client is None:
+            return None, 0
+        try:
+            data, generation = self.client.mget(
+                [f"{self.prefix}:{user_id}", self._generation_key(user_id)]
+            )
+        except redis.RedisError as error:
+            logger.warning("Unable to read user principal: %s", error)
+            return None, 0
+        generation = int(generation) if generation is not None else 0
+        entry = json.loads(data) if data is not None else {}
+        if entry.get("generation") != generation or "principal" not in entry:
+            return None, generation
+        return UserPrincipal.from_data(entry["principal"]), generation
+
+    def _write(self, principal: UserPrincipal, generation: int) -> None:
+        if self.client is None:
+            return
+        try:
+            self.client.setex(
+                f"{self.prefix}:{principal.id}",
+                self.redis_ttl,
+                json.dumps(
+                    {"generation": generation, "principal": principal.to_data()}
+                ),
+            )
+        except redis.RedisError as error:
+            logger.warning("Unable to share user principal: %s", error)
+
+    def _generation_key(self, user_id: str) -> str:
+        return f"{self.prefix}:generation:{user_id}"
+
+    def _remember(self, principal: UserPrincipal, valid_until: float) -> None:
+        with self._lock:
+            self._entries[principal.id] = (principal, valid_until)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
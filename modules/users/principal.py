@@ -0,0 +1,79 @@
+"""Read-only identity of a signed-in user"""
+
+import dataclasses
+from typing import Any, Dict, Optional
+
+
+@dataclasses.dataclass(frozen=True)
+class UserPrincipal:
+    """
+    Snapshot of a User and its UserDetails, detached from the
+    database session. Handlers that only read the current user
+    use it instead of the ORM objects; handlers that change the
+    user load the User itself.
+    """
+
+    id: str
+    email_address: str
+    username: str
+    details_id: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    institution: Optional[str] = None
+    orcid: Optional[str] = None
+    location: Optional[str] = None
+    timezone: Optional[str] = None
+    profile_image: Optional[str] = None
+
+    @staticmethod
+    def from_user(user: Any) -> "UserPrincipal":
+        details = user.user_details
+        return UserPrincipal(
+            id=user.id,
+            email_address=user.email_address,
+            username=user.username,
+            details_id=details.id if details else None,
+            first_name=details.first_name if details else None,
+            last_name=details.last_name if details else None,
+            institution=details.institution if details else None,
+            orcid=details.orcid if details else None,
+            location=details.location if details else None,
+            timezone=details.timezone if details else None,
+            profile_image=details.profile_image if details else None,
+        )
+
+    @staticmethod
+    def from_data(data: Dict[str, Any]) -> "UserPrincipal":
+        fields = {field.name for field in dataclasses.fields(UserPrincipal)}
+        return UserPrincipal(**{key: data[key] for key in data if key in fields})
+
+    def to_data(self) -> Dict[str, Any]:
+        return dataclasses.asdict(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same as User.to_dict"""
+        return {
+            "id": self.id,
+            "email_address": self.email_address,
+            "username": self.username,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+        }
+
+    def profile(self) -> Dict[str, Any]:
+        """User.to_dict updated with UserDetails.to_dict, as /user/profile returns"""
+        profile = self.to_dict()
+        if self.details_id is not None:
+            profile.update(
+                {
+                    "id": self.details_id,
+                    "first_name": self.first_name,
+                    "last_name": self.last_name,
+                    "institution": self.institution,
+                    "orcid": self.orcid,
+                    "location": self.location,
+                    "timezone": self.timezone,
+                    "profile_image": self.profile_image,
+                }
+            )
+        return profile
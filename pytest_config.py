@@ -29,4 +29,7 @@ class TestConfig:
     FAIRHUB_CACHE_URL = get_env("FAIRHUB_CACHE_URL")
     FAIRHUB_CACHE_TYPE = get_env("FAIRHUB_CACHE_TYPE")
 
+    FAIRHUB_GROWTHBOOK_CLIENT_KEY = get_env("FAIRHUB_GROWTHBOOK_CLIENT_KEY")
+    FAIRHUB_GROWTHBOOK_FEATURES_FILE = get_env("FAIRHUB_GROWTHBOOK_FEATURES_FILE")
+
     TESTING = True
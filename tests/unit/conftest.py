@@ -0,0 +1,24 @@
+"""Fixtures for unit tests that need a database but not Postgres."""
+
+import pytest
+from flask import Flask
+
+from model.db import db
+
+# Tables without Postgres-only column types
+SQLITE_TABLES = ["user", "user_details", "study_contributor", "token_blacklist"]
+
+
+# pylint: disable=redefined-outer-name
+@pytest.fixture()
+def sqlite_app():
+    """An app context backed by an in-memory SQLite database."""
+    app = Flask("unit-tests")
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.metadata.create_all(
+            db.engine, tables=[db.metadata.tables[name] for name in SQLITE_TABLES]
+        )
+        yield app
+        db.session.remove()
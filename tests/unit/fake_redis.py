@@ -0,0 +1,135 @@
+"""In-memory stand-in for the parts of redis.Redis used by the caches"""
+
+import time
+
+
+class FakeRedis:
+    """Keys, expiries, hashes and sorted sets of a single Redis database"""
+
+    def __init__(self):
+        self.values = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= time.time():
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.values
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode("utf-8")
+
+    def get(self, key):
+        return self.values[key] if self._alive(key) else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.values[key] = self._encode(value)
+        self.expires.pop(key, None)
+        if ex is not None:
+            self.expires[key] = time.time() + ex
+        if px is not None:
+            self.expires[key] = time.time() + px / 1000
+        return True
+
+    def setex(self, key, seconds, value):
+        return self.set(key, value, ex=seconds)
+
+    def incr(self, key):
+        value = int(self.get(key) or 0) + 1
+        self.values[key] = self._encode(value)
+        return value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+
+    def eval(self, script, numkeys, key, owner):  # pylint: disable=unused-argument
+        """Only the lock release script: delete key if it holds owner"""
+        if self.get(key) == self._encode(owner):
+            self.delete(key)
+            return 1
+        return 0
+
+    def exists(self, key):
+        return int(self._alive(key))
+
+    def ttl(self, key):
+        if not self._alive(key):
+            return -2
+        if key not in self.expires:
+            return -1
+        return int(self.expires[key] - time.time())
+
+    def expire(self, key, seconds):
+        if not self._alive(key):
+            return 0
+        self.expires[key] = time.time() + seconds
+        return 1
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        self._alive(key)
+        fields = self.values.setdefault(key, {})
+        for name, item in [*(mapping or {}).items(), (field, value)]:
+            if name is not None:
+                fields[self._encode(name)] = self._encode(item)
+
+    def hget(self, key, field):
+        return self.hgetall(key).get(self._encode(field))
+
+    def hmget(self, key, fields):
+        return [self.hget(key, field) for field in fields]
+
+    def hgetall(self, key):
+        return dict(self.values[key]) if self._alive(key) else {}
+
+    def hdel(self, key, field):
+        if self._alive(key):
+            self.values[key].pop(self._encode(field), None)
+
+    def zadd(self, key, mapping):
+        scores = self.values.setdefault(key, {})
+        for member, score in mapping.items():
+            scores[self._encode(member)] = score
+
+    def zrange(self, key, start, end):
+        members = sorted(self.values.get(key, {}).items(), key=lambda item: item[1])
+        members = [member for member, _ in members]
+        return members[start:] if end == -1 else members[start : end + 1]
+
+    def zrem(self, key, member):
+        self.values.get(key, {}).pop(self._encode(member), None)
+
+    def pipeline(self, transaction=True):  # pylint: disable=unused-argument
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands until execute, like a redis-py pipeline"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        results = [
+            getattr(self.client, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+        self.commands = []
+        return results
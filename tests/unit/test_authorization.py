@@ -0,0 +1,164 @@
+"""Tests for the per-request study permissions of the current user"""
+import pytest
+from flask import g
+
+import model
+from core.authorization import ROLE_PERMISSIONS, get_authorization_context
+
+# Role lists of is_granted before permissions were loaded once per request
+LEGACY_ROLE_PERMISSIONS = {
+    "owner": [
+        "owner",
+        "view",
+        "permission",
+        "delete_contributor",
+        "invite_contributor",
+        "add_study",
+        "update_study",
+        "delete_study",
+        "add_dataset",
+        "update_dataset",
+        "delete_dataset",
+        "version",
+        "publish_version",
+        "delete_version",
+        "participant",
+        "study_metadata",
+        "dataset_metadata",
+        "add_redcap",
+        "update_redcap",
+        "delete_redcap",
+        "add_dashboard",
+        "update_dashboard",
+        "delete_dashboard",
+        "make_owner",
+    ],
+    "admin": [
+        "admin",
+        "view",
+        "permission",
+        "delete_contributor",
+        "invite_contributor",
+        "add_study",
+        "update_study",
+        "add_dataset",
+        "update_dataset",
+        "delete_dataset",
+        "version",
+        "publish_version",
+        "delete_version",
+        "participant",
+        "study_metadata",
+        "dataset_metadata",
+        "add_redcap",
+        "update_redcap",
+        "delete_redcap",
+        "add_dashboard",
+        "update_dashboard",
+        "delete_delete",
+    ],
+    "editor": [
+        "editor",
+        "view",
+        "add_study",
+        "update_study",
+        "add_dataset",
+        "update_dataset",
+        "delete_dataset",
+        "participant",
+        "study_metadata",
+        "version",
+        "dataset_metadata",
+        "update_dashboard",
+    ],
+    "viewer": ["viewer", "view"],
+}
+
+PERMISSIONS = sorted(
+    {p for permissions in LEGACY_ROLE_PERMISSIONS.values() for p in permissions}
+    | {"unknown"}
+)
+
+
+@pytest.fixture()
+def contributor(sqlite_app):
+    """A user contributing to one study in each role"""
+    user = model.User("Testingyeshello11!")
+    user.email_address = "test@fairhub.io"
+    user.username = "test@fairhub.io"
+    model.db.session.add(user)
+    model.db.session.commit()
+    for role in LEGACY_ROLE_PERMISSIONS:
+        model.db.session.execute(
+            model.StudyContributor.__table__.insert().values(
+                user_id=user.id, study_id=f"study-{role}", permission=role, created_at=0
+            )
+        )
+    model.db.session.commit()
+    with sqlite_app.test_request_context():
+        g.user = user
+        yield user
+
+
+def test_role_permissions_match_the_legacy_role_lists():
+    """
+    GIVEN the role permission sets
+    WHEN they are compared with the role lists is_granted used to build
+    THEN they grant exactly the same permissions
+    """
+    assert {
+        role: sorted(permissions) for role, permissions in ROLE_PERMISSIONS.items()
+    } == {
+        role: sorted(permissions)
+        for role, permissions in LEGACY_ROLE_PERMISSIONS.items()
+    }
+
+
+def test_authorization_context_matches_legacy_is_granted(contributor):
+    """
+    GIVEN a user contributing to a study in each role
+    WHEN every permission is checked in every study, and in another one
+    THEN the results match the legacy checks, from one membership query
+    """
+    context = get_authorization_context()
+    studies = [*(f"study-{role}" for role in LEGACY_ROLE_PERMISSIONS), "other"]
+    for study_id in studies:
+        role = study_id.removeprefix("study-")
+        for permission in PERMISSIONS:
+            expected = permission in LEGACY_ROLE_PERMISSIONS.get(role, [])
+            assert context.is_granted(permission, study_id) is expected
+
+    assert get_authorization_context() is context
+    assert sorted(context.study_ids()) == sorted(studies[:-1])
+    assert context.role(None) is None
+
+
+def test_authorization_context_reloads_after_contributor_changes(contributor):
+    """
+    GIVEN a loaded authorization context
+    WHEN a contributor's role is changed and flushed
+    THEN later checks use the new role
+    """
+    context = get_authorization_context()
+    assert not context.is_granted("permission", "study-viewer")
+
+    viewer = model.StudyContributor.query.filter_by(
+        user_id=contributor.id, study_id="study-viewer"
+    ).one()
+    viewer.permission = "admin"
+    model.db.session.flush()
+
+    assert context.is_granted("permission", "study-viewer")
+    assert context.role("study-viewer") == "admin"
+
+
+def test_authorization_context_of_anonymous_requests(sqlite_app):
+    """
+    GIVEN a request without a signed-in user
+    WHEN permissions are checked
+    THEN nothing is granted
+    """
+    with sqlite_app.test_request_context():
+        g.user = None
+        assert not get_authorization_context().is_granted("view", "study-owner")
+        assert get_authorization_context().study_ids() == []
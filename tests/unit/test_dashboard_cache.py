@@ -0,0 +1,171 @@
+"""Tests for the materialized dashboard cache and build locks"""
+import threading
+import time
+
+import pytest
+from cachelib import SimpleCache
+
+from modules.dashboard import (
+    DashboardCache,
+    DashboardCacheStats,
+    DashboardBuildPending,
+    DashboardLock,
+    DashboardRefreshWorker,
+    DashboardResultStore,
+)
+from tests.unit.fake_redis import FakeRedis
+
+
+class RecordingWorker:
+    """A refresh worker recording requests and building on demand"""
+
+    def __init__(self, results):
+        self.results = results
+        self.requested = []
+        self.built = []
+        self.deleted = False
+
+    def request_refresh(self, study_id, dashboard_id, public=False):
+        self.requested.append((study_id, dashboard_id, public))
+
+    def refresh_dashboard(
+        self, study_id, dashboard_id, public=False, wait_timeout=None
+    ):  # pylint: disable=unused-argument
+        if self.deleted:
+            return None
+        self.built.append((study_id, dashboard_id, public))
+        return self.results.put(
+            study_id, dashboard_id, {"id": dashboard_id, "updated_on": 1}, public
+        )
+
+
+def make_cache(max_age=None):
+    results = DashboardResultStore(SimpleCache())
+    worker = RecordingWorker(results)
+    cache = DashboardCache(results, worker, DashboardLock(), DashboardCacheStats())
+    cache.max_age = max_age
+    return cache, worker
+
+
+def test_dashboard_cache_builds_once_then_hits():
+    """
+    GIVEN an empty dashboard cache
+    WHEN a dashboard is read twice
+    THEN it is built on the first read only and served from the cache
+    """
+    cache, worker = make_cache()
+
+    first = cache.get("study", "dashboard", 1)
+    second = cache.get("study", "dashboard", 1)
+
+    assert worker.built == [("study", "dashboard", False)]
+    assert second == first
+    assert worker.requested == []
+    stats = cache.get_stats("study", "dashboard")
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+
+
+def test_dashboard_cache_serves_stale_results_and_queues_a_refresh():
+    """
+    GIVEN a built dashboard
+    WHEN it is read after max_age, or after its config was updated
+    THEN the stored result is served and a background refresh is queued
+    """
+    cache, worker = make_cache(max_age=60)
+    built = cache.get("study", "dashboard", 1)
+    built["built_at"] = time.time() - 120
+    cache.results.cache.set(cache.results.key("study", "dashboard"), built)
+
+    assert cache.get("study", "dashboard", 1) == built
+    assert cache.get("study", "dashboard", 2) == built
+    assert worker.built == [("study", "dashboard", False)]
+    assert worker.requested == [("study", "dashboard", False)] * 2
+    assert cache.get_stats("study", "dashboard")["stale_hits"] == 2
+
+
+def test_dashboard_cache_returns_none_for_deleted_dashboards():
+    """
+    GIVEN a dashboard that was deleted before its first build
+    WHEN it is read
+    THEN the cache returns None
+    """
+    cache, worker = make_cache()
+    worker.deleted = True
+
+    assert cache.get("study", "dashboard", 1) is None
+
+
+def test_dashboard_lock_is_exclusive_across_hosts():
+    """
+    GIVEN two API hosts sharing a Redis build lock
+    WHEN one host holds the lock of a dashboard
+    THEN the other can not take it until it is released
+    """
+    client = FakeRedis()
+    first_host = DashboardLock(client, poll_interval=0.01)
+    second_host = DashboardLock(client, poll_interval=0.01)
+
+    with first_host.hold("dashboard") as acquired:
+        assert acquired
+        with second_host.hold("dashboard", blocking=False) as contended:
+            assert not contended
+        with second_host.hold("dashboard", wait_timeout=0.05) as contended:
+            assert not contended
+        with second_host.hold("other-dashboard", blocking=False) as other:
+            assert other
+
+    with second_host.hold("dashboard", blocking=False) as acquired:
+        assert acquired
+
+
+def test_dashboard_lock_waiters_run_after_the_holder():
+    """
+    GIVEN a thread holding a dashboard build lock
+    WHEN other threads wait on the same lock
+    THEN each of them runs only after the previous holder released it
+    """
+    lock = DashboardLock()
+    events = []
+
+    def build(name):
+        with lock.hold("dashboard") as acquired:
+            assert acquired
+            events.append(f"{name} start")
+            time.sleep(0.02)
+            events.append(f"{name} end")
+
+    threads = [threading.Thread(target=build, args=(n,)) for n in "abc"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(events) == 6
+    for index in range(0, 6, 2):
+        assert events[index].endswith("start")
+        assert events[index + 1] == events[index].replace("start", "end")
+
+
+def test_waiting_past_the_build_lock_timeout_does_not_build(monkeypatch):
+    """
+    GIVEN a first build of a dashboard holding the build lock on another host
+    WHEN a request waits for it past the wait timeout, with nothing stored
+    THEN the request raises DashboardBuildPending and builds nothing
+    """
+    client = FakeRedis()
+    results = DashboardResultStore(SimpleCache())
+    worker = DashboardRefreshWorker(
+        results, DashboardLock(client, poll_interval=0.01), DashboardCacheStats()
+    )
+    cache = DashboardCache(results, worker, worker.lock, worker.stats)
+    cache.build_wait = 0.05
+    builds = []
+    monkeypatch.setattr(worker, "_build", lambda *args: builds.append(args))
+
+    with DashboardLock(client).hold(results.key("study", "dashboard")) as held:
+        assert held
+        with pytest.raises(DashboardBuildPending):
+            cache.get("study", "dashboard", 1)
+        assert worker.refresh_dashboard("study", "dashboard", wait=False) is None
+
+    assert builds == []
@@ -0,0 +1,53 @@
+"""Tests for the process-wide GrowthBook feature flags"""
+import json
+
+from modules.features import FeatureFlagStore, FileFeatureProvider
+
+
+def test_feature_flags_evaluate_file_features_in_memory(tmp_path):
+    """
+    GIVEN a features file in the GrowthBook API payload format
+    WHEN the store loads it
+    THEN GrowthBooks built from the store evaluate its flags
+    """
+    path = tmp_path / "features.json"
+    path.write_text(json.dumps({"features": {"signup": {"defaultValue": True}}}))
+    store = FeatureFlagStore(FileFeatureProvider(str(path)))
+
+    assert store.refresh()
+    assert store.growthbook().is_on("signup")
+    assert not store.growthbook().is_on("undefined")
+
+
+def test_failed_refresh_keeps_the_last_features(tmp_path):
+    """
+    GIVEN a store that loaded features
+    WHEN a reload fails, then succeeds
+    THEN the last loaded features are kept, then replaced
+    """
+    path = tmp_path / "features.json"
+    path.write_text(json.dumps({"signup": {"defaultValue": True}}))
+    store = FeatureFlagStore(FileFeatureProvider(str(path)))
+    assert store.refresh()
+    loaded_at = store.loaded_at
+
+    path.write_text("{not json")
+    assert not store.refresh()
+    assert store.loaded_at == loaded_at
+    assert store.growthbook().is_on("signup")
+
+    path.write_text(json.dumps({"signup": {"defaultValue": False}}))
+    assert store.refresh()
+    assert not store.growthbook().is_on("signup")
+
+
+def test_feature_flags_without_a_provider_are_off():
+    """
+    GIVEN a store with neither a features file nor a client key
+    WHEN flags are evaluated
+    THEN every flag is off
+    """
+    store = FeatureFlagStore()
+    assert not store.refresh()
+    assert dict(store.features) == {}
+    assert not store.growthbook().is_on("signup")
@@ -0,0 +1,39 @@
+"""Tests for the process pool running dashboard module transforms"""
+import pandas as pd
+
+from modules.etl.transforms import ModuleTransformPool
+
+module_ids = ["sex-recruitment", "sex-recruitment-by-site", "race-recruitment"]
+
+
+def make_frame():
+    """A merged REDCap frame with the columns of the recruitment modules"""
+    return pd.DataFrame(
+        {
+            "record_id": [str(i) for i in range(1, 13)],
+            "siteid": ["UW", "UCSD", "UAB"] * 4,
+            "scrsex": ["Male", "Female", "Female", "Male"] * 3,
+            "race": ["Asian", "White", "Black"] * 4,
+            "visitdate": ["2023-01", "2023-02"] * 6,
+        }
+    )
+
+
+def test_pool_matches_in_process_transforms():
+    """
+    GIVEN a merged frame and three module ids
+    WHEN the modules run in two worker processes
+    THEN each output equals the one computed in-process
+    """
+    local = ModuleTransformPool().run(module_ids, make_frame())
+    pool = ModuleTransformPool(processes=2)
+    try:
+        pooled = pool.run(module_ids, make_frame())
+        assert pool.run(module_ids[:2], make_frame()) == {
+            module_id: local[module_id] for module_id in module_ids[:2]
+        }
+    finally:
+        pool.shutdown()
+
+    assert sorted(pooled) == sorted(module_ids)
+    assert pooled == local
@@ -0,0 +1,128 @@
+"""Tests for the release source and its published columnar snapshots"""
+import datetime
+import io
+
+import pandas as pd
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+
+from modules.etl.sources import RedcapReleaseSource
+
+report_config = {
+    "key": "participant-list",
+    "filepath": "AI-READI/REDCap",
+    "filename": "Redcap_data_report_247884.csv",
+}
+
+
+class FakeDownload(io.BytesIO):
+    """The downloaded blob, readable as a stream, whole, or into a file"""
+
+    def readall(self):
+        return self.getvalue()
+
+    def readinto(self, stream):  # pylint: disable=arguments-renamed
+        stream.write(self.getvalue())
+
+
+class FakeBlobClient:
+    """A blob of the fake container"""
+
+    def __init__(self, blobs, path):
+        self.blobs = blobs
+        self.path = path
+
+    def upload_blob(self, data, overwrite=False):
+        assert overwrite or self.path not in self.blobs
+        version = self.blobs.get(self.path, (None, 0))[1] + 1
+        self.blobs[self.path] = (bytes(data), version)
+
+    def download_blob(self):
+        return FakeDownload(self._get()[0])
+
+    def get_blob_properties(self):
+        return type(
+            "BlobProperties",
+            (),
+            {
+                "etag": f'"{self._get()[1]}"',
+                "last_modified": datetime.datetime.now(datetime.timezone.utc),
+            },
+        )
+
+    def _get(self):
+        if self.path not in self.blobs:
+            raise ResourceNotFoundError(self.path)
+        return self.blobs[self.path]
+
+
+class FakeBlobServiceClient:
+    """One blob container, shared by every client"""
+
+    blobs = {}
+
+    @classmethod
+    def from_connection_string(cls, connection_string):  # pylint: disable=W0613
+        return cls()
+
+    def get_container_client(self, container_name):  # pylint: disable=W0613
+        return self
+
+    def get_blob_client(self, path):
+        return FakeBlobClient(self.blobs, path)
+
+
+@pytest.fixture()
+def blobs(monkeypatch):
+    """The release container, holding one CSV report"""
+    monkeypatch.setattr(FakeBlobServiceClient, "blobs", {})
+    monkeypatch.setattr(
+        "modules.etl.sources.redcap_release_source.BlobServiceClient",
+        FakeBlobServiceClient,
+    )
+    FakeBlobServiceClient.blobs["AI-READI/REDCap/Redcap_data_report_247884.csv"] = (
+        b"record_id,siteid,scrsex\n1,UW,1\n2,,2\n3,UCSD,\n",
+        1,
+    )
+    return FakeBlobServiceClient.blobs
+
+
+def make_source(tmp_path, snapshot_format):
+    return RedcapReleaseSource(
+        "connection",
+        "container",
+        {"filepath": "AI-READI/REDCap", "filename": "metadata.json"},
+        snapshot_format=snapshot_format,
+        cache_path=str(tmp_path),
+    )
+
+
+def test_published_snapshots_read_back_as_the_csv_reports(blobs, tmp_path):
+    """
+    GIVEN a release CSV report
+    WHEN its Arrow snapshot is published and the report is read
+    THEN it is read from the snapshot and equals the CSV report
+    """
+    csv_report = make_source(tmp_path, "csv").get_report(report_config)
+    source = make_source(tmp_path, "arrow")
+    source.publish_report_snapshots([report_config])
+
+    assert "AI-READI/REDCap/Redcap_data_report_247884.arrow" in blobs
+    del blobs["AI-READI/REDCap/Redcap_data_report_247884.csv"]
+    report = source.get_report(report_config)
+
+    pd.testing.assert_frame_equal(report, csv_report)
+    assert pd.isna(report["siteid"][1]) and pd.isna(report["scrsex"][2])
+    assert len(list(tmp_path.glob("*.arrow"))) == 1
+
+
+def test_reports_without_a_snapshot_are_read_from_csv(blobs, tmp_path):
+    """
+    GIVEN a release CSV report with no published snapshot
+    WHEN it is read from a source expecting Arrow snapshots
+    THEN the CSV report is read
+    """
+    report = make_source(tmp_path, "arrow").get_report(report_config)
+
+    assert list(report["record_id"]) == ["1", "2", "3"]
+    assert list(blobs) == ["AI-READI/REDCap/Redcap_data_report_247884.csv"]
@@ -0,0 +1,231 @@
+"""Tests for the REDCap export snapshot stores and the cached source"""
+import gzip
+import os
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from modules.etl.sources import (
+    RedcapCachedSource,
+    RedcapDiskSnapshotStore,
+    RedcapRedisSnapshotStore,
+    RedcapSource,
+)
+from tests.unit.fake_redis import FakeRedis
+
+
+class CountingSource(RedcapSource):
+    """A source counting its exports, with a settable change flag"""
+
+    name = "counting"
+
+    def __init__(self):
+        self.changed = False
+        self.changed_records = None
+        self.checks = 0
+        self.exports = 0
+        self.report = pd.DataFrame(
+            {"record_id": ["1", "2", "3"], "siteid": ["UW", "", None]}
+        )
+
+    @property
+    def source_id(self):
+        return "counting-source"
+
+    def get_metadata(self):
+        self.exports += 1
+        return [{"field_name": "record_id"}]
+
+    def get_report(self, report_config):
+        self.exports += 1
+        return self.report.copy()
+
+    def has_changed_since(self, since, report_config=None):
+        self.checks += 1
+        return self.changed
+
+    def get_changed_records(self, since):
+        return self.changed_records
+
+
+class ProjectLogSource(CountingSource):
+    """A source whose change checks read one log for the whole project"""
+
+    project_wide_changes = True
+
+
+report_config = {"key": "participant-list", "kwdargs": {"report_id": "1"}}
+report_configs = [
+    {"key": key, "kwdargs": {"report_id": str(report_id)}}
+    for report_id, key in enumerate(["participant-list", "participant-values", "x"])
+]
+
+
+def fetch(cached):
+    """Read the metadata and reports the way a transform run does"""
+    cached.prepare_fetch(report_configs)
+    cached.get_metadata()
+    for config in report_configs:
+        cached.get_report(config)
+
+
+def test_disk_snapshot_store_evicts_least_recently_used(tmp_path):
+    """
+    GIVEN a disk snapshot store holding at most 250 bytes
+    WHEN three 100 byte objects are stored, the first read in between
+    THEN the least recently used object is evicted
+    """
+    store = RedcapDiskSnapshotStore(str(tmp_path), max_bytes=250)
+    store.put_object("a", b"a" * 100)
+    store.put_object("b", b"b" * 100)
+    past = time.time() - 60
+    os.utime(os.path.join(store.objects_path, "b"), (past, past))
+    assert store.get_object("a") is not None
+    store.put_object("c", b"c" * 100)
+
+    assert store.get_object("b") is None
+    assert store.get_object("a") == b"a" * 100
+    assert store.get_object("c") == b"c" * 100
+
+
+def test_redis_snapshot_store_evicts_least_recently_used():
+    """
+    GIVEN a Redis snapshot store holding at most 250 bytes
+    WHEN three 100 byte objects are stored, the first read in between
+    THEN the least recently used object is evicted and untracked
+    """
+    client = FakeRedis()
+    store = RedcapRedisSnapshotStore(client, max_bytes=250, prefix="test")
+    store.put_object("a", b"a" * 100)
+    store.put_object("b", b"b" * 100)
+    client.zadd(store._access_key, {"b": 1})  # pylint: disable=protected-access
+    assert store.get_object("a") is not None
+    store.put_object("c", b"c" * 100)
+
+    assert store.get_object("b") is None
+    assert store.get_object("a") == b"a" * 100
+    # pylint: disable-next=protected-access
+    assert b"b" not in client.hgetall(store._sizes_key)
+
+
+def test_cached_source_hits_until_the_source_changes(tmp_path):
+    """
+    GIVEN a cached source over a disk snapshot store
+    WHEN a report and the metadata are read twice, then after a change
+    THEN the second reads come from the snapshots and equal the exports
+    """
+    source = CountingSource()
+    cached = RedcapCachedSource(source, RedcapDiskSnapshotStore(str(tmp_path)))
+
+    first = cached.get_report(report_config)
+    metadata = cached.get_metadata()
+    assert source.exports == 2
+
+    second = cached.get_report(report_config)
+    assert cached.get_metadata() == metadata
+    assert source.exports == 2
+    pd.testing.assert_frame_equal(second, first)
+    assert pd.isna(second["siteid"][2])
+
+    source.changed = True
+    cached.get_report(report_config)
+    assert source.exports == 3
+
+
+def test_cached_source_refetches_unreadable_snapshots():
+    """
+    GIVEN a cached report whose shared snapshot was overwritten
+    WHEN the report is read again
+    THEN the bytes are not decoded as a report and it is refetched
+    """
+    source = CountingSource()
+    client = FakeRedis()
+    cached = RedcapCachedSource(source, RedcapRedisSnapshotStore(client))
+    cached.get_report(report_config)
+
+    for key in list(client.values):
+        if ":object:" in key:
+            client.set(key, gzip.compress(b"\x80\x04not a snapshot"))
+
+    report = cached.get_report(report_config)
+    assert source.exports == 2
+    pd.testing.assert_frame_equal(report, source.report)
+
+
+def test_cached_source_stores_reports_as_json_without_pyarrow(tmp_path, monkeypatch):
+    """
+    GIVEN a cached source on a host without pyarrow
+    WHEN a report is read twice
+    THEN the second read comes from a JSON snapshot equal to the export
+    """
+    monkeypatch.setattr(
+        "modules.etl.sources.redcap_cached_source.columnar_available", lambda: False
+    )
+    source = CountingSource()
+    cached = RedcapCachedSource(source, RedcapDiskSnapshotStore(str(tmp_path)))
+
+    first = cached.get_report(report_config)
+    second = cached.get_report(report_config)
+
+    assert source.exports == 1
+    pd.testing.assert_frame_equal(second, first)
+    assert second["siteid"][1] == "" and pd.isna(second["siteid"][2])
+
+
+def test_project_wide_changes_are_checked_once_per_run(tmp_path):
+    """
+    GIVEN cached exports of a source checking one project log
+    WHEN later runs read the metadata and three reports
+    THEN the log is checked once per run, or not at all when the
+         run already found no changed records
+    """
+    source = ProjectLogSource()
+    store = RedcapDiskSnapshotStore(str(tmp_path))
+    fetch(RedcapCachedSource(source, store))
+    assert (source.exports, source.checks) == (4, 0)
+
+    fetch(RedcapCachedSource(source, store))
+    assert (source.exports, source.checks) == (4, 1)
+
+    cached = RedcapCachedSource(source, store)
+    source.changed_records = []
+    assert cached.get_changed_records(datetime.now(timezone.utc)) == []
+    assert cached.get_changed_records(datetime(2000, 1, 1, tzinfo=timezone.utc)) == []
+    fetch(cached)
+    assert (source.exports, source.checks) == (4, 1)
+
+    source.changed = True
+    fetch(RedcapCachedSource(source, store))
+    assert (source.exports, source.checks) == (8, 2)
+
+
+def test_per_export_changes_are_checked_for_each_export(tmp_path):
+    """
+    GIVEN cached exports of a source checking each export on its own
+    WHEN a later run reads the metadata and three reports
+    THEN each export is checked
+    """
+    source = CountingSource()
+    store = RedcapDiskSnapshotStore(str(tmp_path))
+    fetch(RedcapCachedSource(source, store))
+    fetch(RedcapCachedSource(source, store))
+
+    assert (source.exports, source.checks) == (4, 4)
+
+
+def test_redis_snapshot_index_entries_expire():
+    """
+    GIVEN a Redis snapshot store
+    WHEN an export is cached
+    THEN its index entry expires, unlike the tracked object
+    """
+    client = FakeRedis()
+    cached = RedcapCachedSource(
+        CountingSource(), RedcapRedisSnapshotStore(client, index_ttl=60)
+    )
+    cached.get_report(report_config)
+
+    ttls = {key.split(":")[1]: client.ttl(key) for key in list(client.values)}
+    assert 0 < ttls["index"] <= 60
+    assert ttls["object"] == -1
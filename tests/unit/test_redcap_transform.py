@@ -0,0 +1,463 @@
+"""Tests for incremental and memoized REDCap transform runs, and vectorized transforms"""
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.etl import RedcapSource, RedcapTransform, redcap_transform_states
+from modules.etl.transforms.redcap_transform_memo import (
+    RedcapTransformMemo,
+    redcap_transform_memo,
+)
+
+metadata = [
+    {"field_name": "record_id", "field_type": "text"},
+    {
+        "field_name": "siteid",
+        "field_type": "radio",
+        "select_choices_or_calculations": "1, UW|2, UCSD|3, UAB",
+    },
+    {"field_name": "age", "field_type": "text"},
+    {
+        "field_name": "visit",
+        "field_type": "dropdown",
+        "select_choices_or_calculations": "1, Baseline|2, Follow-up",
+    },
+]
+
+
+def make_reports(siteids=None, deleted=(), added=()):
+    """Two reports of five records, with optional changes"""
+    siteids = siteids or {}
+    records = [r for r in ["1", "2", "3", "4", "5", *added] if r not in deleted]
+    participants = pd.DataFrame(
+        {
+            "record_id": records,
+            "siteid": [siteids.get(r, str(int(r) % 3 + 1)) for r in records],
+            "age": [str(40 + int(r)) if r != "3" else "" for r in records],
+        },
+        dtype=str,
+    )
+    visits = pd.DataFrame(
+        {
+            "record_id": records,
+            "visit": ["1" if int(r) % 2 else "2" for r in records],
+        },
+        dtype=str,
+    )
+    return {"participants": participants, "visits": visits}
+
+
+class ReportSource(RedcapSource):
+    """A source serving in-memory reports and a settable list of changes"""
+
+    name = "test"
+
+    def __init__(self, reports, changed_records=None):
+        self.reports = reports
+        self.changed_records = changed_records
+        self.report_exports = 0
+
+    @property
+    def source_id(self):
+        return "report-source"
+
+    def get_metadata(self):
+        return metadata
+
+    def get_report(self, report_config):
+        self.report_exports += 1
+        return self.reports[report_config["key"]].copy()
+
+    def get_changed_records(self, since):
+        return self.changed_records
+
+
+def make_config(**settings):
+    columns = {"participants": ["siteid", "age"], "visits": ["visit"]}
+    return {
+        "index_columns": ["record_id"],
+        "reports": [
+            {
+                "key": key,
+                "filename": f"{key}.csv",
+                "kwdargs": {"report_id": key},
+                "transforms": [
+                    ("remap_values_by_columns", {"columns": columns[key]}),
+                    ("map_missing_values_by_columns", {"columns": columns[key]}),
+                ],
+            }
+            for key in ["participants", "visits"]
+        ],
+        "post_transform_merge": (
+            ["record_id"],
+            [
+                ("participants", {"on": ["record_id"], "how": "inner"}),
+                ("visits", {"on": ["record_id"], "how": "inner"}),
+            ],
+        ),
+        "post_merge_transforms": [],
+        "logging_config": {"level": logging.WARNING},
+        **settings,
+    }
+
+
+@pytest.fixture(autouse=True)
+def _clear_transform_caches():
+    redcap_transform_states.clear()
+    redcap_transform_memo.clear()
+    yield
+    redcap_transform_states.clear()
+    redcap_transform_memo.clear()
+
+
+def test_incremental_run_matches_a_full_run():
+    """
+    GIVEN a previous incremental run
+    WHEN two records change and one is added
+    THEN splicing their rows produces the same frames as a full run
+    """
+    config = make_config(incremental=True)
+    RedcapTransform(config, ReportSource(make_reports()))
+
+    reports = make_reports(siteids={"2": "1", "4": ""}, added=["6"])
+    incremental = RedcapTransform(config, ReportSource(reports, ["2", "4", "6"]))
+    redcap_transform_states.clear()
+    full = RedcapTransform(make_config(), ReportSource(reports))
+
+    pd.testing.assert_frame_equal(incremental.merged, full.merged)
+    for report_key in full.reports:
+        pd.testing.assert_frame_equal(
+            incremental.get_report_transformed_df(report_key),
+            full.get_report_transformed_df(report_key),
+        )
+    assert incremental.merged.set_index("record_id").loc["2", "siteid"] == "UW"
+
+
+def test_incremental_run_without_changes_reuses_the_previous_run():
+    """
+    GIVEN a previous incremental run
+    WHEN no record changed
+    THEN no report is exported and the previous result is served
+    """
+    config = make_config(incremental=True)
+    previous = RedcapTransform(config, ReportSource(make_reports()))
+    source = ReportSource(make_reports(), [])
+
+    unchanged = RedcapTransform(config, source)
+
+    assert source.report_exports == 0
+    pd.testing.assert_frame_equal(unchanged.merged, previous.merged)
+
+
+@pytest.mark.filterwarnings("error::pandas.errors.SettingWithCopyWarning")
+def test_incremental_run_leaves_raw_reports_untouched():
+    """
+    GIVEN an incremental run transforming changed records
+    WHEN its transforms write to the changed rows
+    THEN the raw report kept for the next run is not modified
+    """
+    config = make_config(incremental=True)
+    RedcapTransform(config, ReportSource(make_reports()))
+    reports = make_reports(siteids={"2": "3"})
+
+    incremental = RedcapTransform(config, ReportSource(reports, ["2"]))
+
+    raw = incremental.get_report_df("participants")
+    pd.testing.assert_frame_equal(raw, reports["participants"])
+
+
+def test_memoized_run_skips_unchanged_stacks(monkeypatch):
+    """
+    GIVEN a memoized run
+    WHEN the same reports are transformed again, then a changed report
+    THEN only the stacks whose input changed run, with the same output
+    """
+    applied = []
+    apply_transform = RedcapTransform.apply_transform
+
+    def counting_apply_transform(self, df, transform_name, transform_kwdargs={}):
+        applied.append(transform_name)
+        return apply_transform(self, df, transform_name, transform_kwdargs)
+
+    monkeypatch.setattr(RedcapTransform, "apply_transform", counting_apply_transform)
+    config = make_config(memoize_transforms=True)
+    first = RedcapTransform(config, ReportSource(make_reports()))
+    assert len(applied) == 4
+
+    applied.clear()
+    again = RedcapTransform(config, ReportSource(make_reports()))
+    assert applied == []
+    pd.testing.assert_frame_equal(again.merged, first.merged)
+
+    applied.clear()
+    reports = make_reports(siteids={"1": "1"})
+    changed = RedcapTransform(config, ReportSource(reports))
+    assert len(applied) == 2
+    unmemoized = RedcapTransform(make_config(), ReportSource(reports))
+    pd.testing.assert_frame_equal(changed.merged, unmemoized.merged)
+
+
+def test_memoized_run_resumes_after_the_deepest_cached_stage(monkeypatch):
+    """
+    GIVEN a memoized run caching every third stage of a six stage stack
+    WHEN the fifth transform of the stack is changed
+    THEN only the stages after the third run, with the same output
+    """
+    applied = []
+    apply_transform = RedcapTransform.apply_transform
+
+    def counting_apply_transform(self, df, transform_name, transform_kwdargs={}):
+        applied.append(transform_kwdargs.get("columns"))
+        return apply_transform(self, df, transform_name, transform_kwdargs)
+
+    def make_stack_config(fifth_column, **settings):
+        config = make_config(**settings)
+        config["reports"][0]["transforms"] += [
+            ("drop_columns", {"columns": [column]})
+            for column in ["x3", "x4", fifth_column, "x6"]
+        ]
+        return config
+
+    monkeypatch.setattr(RedcapTransform, "apply_transform", counting_apply_transform)
+    config = make_stack_config("x5", memoize_transforms=True)
+    RedcapTransform(config, ReportSource(make_reports()))
+    assert len(applied) == 8
+    # Third and Sixth Participants Stages, Last Visits Stage, Merged Frame
+    assert len(redcap_transform_memo) == 2 + 1 + 1
+
+    applied.clear()
+    config = make_stack_config("age", memoize_transforms=True)
+    changed = RedcapTransform(config, ReportSource(make_reports()))
+    assert applied == [["x4"], ["age"], ["x6"]]
+    assert "age" not in changed.merged.columns
+    unmemoized = RedcapTransform(make_stack_config("age"), ReportSource(make_reports()))
+    pd.testing.assert_frame_equal(changed.merged, unmemoized.merged)
+
+
+def test_memo_counts_str_cells_and_evicts_least_recently_used():
+    """
+    GIVEN a memo holding frames of str values
+    WHEN frames are stored past its byte budget
+    THEN sizes include the str objects and the oldest frames are evicted
+    """
+    frame = pd.DataFrame({"siteid": ["UCSD" * 25] * 1000})
+    shallow = int(frame.memory_usage(index=True, deep=False).sum())
+    deep = int(frame.memory_usage(index=True, deep=True).sum())
+    memo = RedcapTransformMemo(max_bytes=2 * deep)
+
+    memo.set("a", frame)
+    assert memo.total_bytes == deep > 10 * shallow
+    memo.set("b", frame)
+    assert memo.get("a") is not None
+    memo.set("c", frame)
+
+    assert len(memo) == 2
+    assert memo.get("b") is None
+    assert memo.total_bytes == 2 * deep
+
+
+def test_memo_isolates_cached_frames():
+    """
+    GIVEN a frame stored in the memo
+    WHEN the stored frame and a retrieved copy are modified
+    THEN the cached frame is unchanged
+    """
+    memo = RedcapTransformMemo()
+    frame = pd.DataFrame({"siteid": ["UW", "UCSD"]})
+    memo.set("a", frame)
+
+    frame.loc[0, "siteid"] = "UAB"
+    memo.get("a").loc[1, "siteid"] = "UAB"
+
+    assert memo.get("a")["siteid"].tolist() == ["UW", "UCSD"]
+
+
+#
+# Vectorized Transforms Against the Per-Cell Loops They Replaced
+#
+
+value_map = {"1": "UW", "2": "UCSD", "3": "UAB"}
+missing_value = "Value Unavailable"
+
+
+def make_transform():
+    return RedcapTransform(make_config(), ReportSource(make_reports()))
+
+
+def loop_remap_values(df, column, value_map, separator="|"):
+    """Per-cell remap_values_by_columns loop"""
+    for i, value in enumerate(df[column]):
+        subvalues = [
+            subvalue.strip() for subvalue in str(value).split(",") if len(subvalue) > 0
+        ]
+        df.loc[i, column] = separator.join(
+            [value_map[subvalue] for subvalue in subvalues if subvalue in value_map]
+        )
+    return df
+
+
+def loop_map_missing_values(df, columns, none_map, missing_value):
+    """Per-cell map_missing_values_by_columns loop"""
+    for column in columns:
+        for i, value in enumerate(df[column]):
+            if (len(str(value)) == 0) or (value in none_map.keys()):
+                df.loc[i, column] = missing_value
+    return df
+
+
+def loop_positive_class(
+    df, column_name_map, new_column_name, all_negative_value, default_value, separator="|"
+):
+    """String concatenating new_column_from_binary_columns_positive_class"""
+    df[new_column_name] = ""
+    for column_name, column_value in column_name_map.items():
+        df.loc[df[column_name] == "Yes", new_column_name] += f"{column_value}{separator}"
+    for column_name, column_value in column_name_map.items():
+        df.loc[
+            (df[column_name] == default_value) & (df[new_column_name] == ""),
+            new_column_name,
+        ] = default_value
+    df.loc[df[new_column_name] == "", new_column_name] = all_negative_value
+    df[new_column_name] = df[new_column_name].str.replace(
+        f"\\{separator}$", "", regex=True
+    )
+    return df
+
+
+@pytest.mark.parametrize("dtype", [object, "category"])
+def test_remap_values_matches_the_per_cell_loop(dtype):
+    """
+    GIVEN single, multi-valued, unknown, empty and NaN option values
+    WHEN they are remapped as object or categorical columns
+    THEN the values are identical to the per-cell loop
+    """
+    values = ["1", "2", "1,2", "2, 1", ",1,", "1,4", "4", "", "nan", np.nan, "3"]
+    df = pd.DataFrame({"siteid": values * 3}, dtype=object)
+
+    remapped = make_transform()._remap_values_by_columns(
+        df.astype({"siteid": dtype}), columns=["siteid"], value_map=value_map
+    )
+    expected = loop_remap_values(df.copy(), "siteid", value_map)
+
+    pd.testing.assert_series_equal(
+        remapped["siteid"].astype(object), expected["siteid"]
+    )
+    if dtype == object:
+        pd.testing.assert_frame_equal(remapped, expected)
+    else:
+        assert isinstance(remapped["siteid"].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.parametrize("dtype", [object, "category"])
+def test_map_missing_values_matches_the_per_cell_loop(dtype):
+    """
+    GIVEN none values, NaN, None and present values in str columns,
+    and NaN in a float column
+    WHEN missing values are mapped as object or categorical columns
+    THEN the values are identical to the per-cell loop
+    """
+    values = ["UW", "", "nan", "NaN", "-", np.nan, None, missing_value, "UCSD"]
+    df = pd.DataFrame(
+        {
+            "siteid": values,
+            "visit": list(reversed(values)),
+            "age": [41.0, np.nan, 43.0] * 3,
+        }
+    )
+    columns = ["siteid", "visit", "age"]
+    transform = make_transform()
+
+    mapped = transform._map_missing_values_by_columns(
+        df.astype({"siteid": dtype, "visit": dtype}), columns=columns
+    )
+    expected = loop_map_missing_values(
+        df.copy(), columns, transform.none_map, missing_value
+    )
+
+    for column in columns:
+        pd.testing.assert_series_equal(
+            mapped[column].astype(object), expected[column].astype(object)
+        )
+    if dtype == object:
+        pd.testing.assert_frame_equal(mapped, expected)
+
+
+@pytest.mark.parametrize("dtype", [object, "category"])
+def test_positive_class_column_matches_string_concatenation(dtype):
+    """
+    GIVEN binary columns with single and multiple positive rows,
+    all negative rows and rows with only default values
+    WHEN the positive class column is built from object or categorical columns
+    THEN it is identical to concatenating the labels row by row
+    """
+    df = pd.DataFrame(
+        {
+            "a": ["Yes", "No", "Yes", "No", missing_value, "No", "Yes", missing_value],
+            "b": ["Yes", "No", "No", missing_value, "No", "No", "Yes", missing_value],
+            "c": ["No", "Yes", "Yes", "No", "No", "No", "Yes", missing_value],
+        },
+        dtype=object,
+    ).astype(dtype)
+    column_name_map = {"a": "Type A", "b": "Type B", "c": "Type C"}
+    kwdargs = {
+        "column_name_map": column_name_map,
+        "new_column_name": "types",
+        "all_negative_value": "None|",
+        "default_value": missing_value,
+    }
+
+    built = make_transform()._new_column_from_binary_columns_positive_class(
+        df.copy(), **kwdargs
+    )
+    expected = loop_positive_class(df.copy(), **kwdargs)
+
+    pd.testing.assert_frame_equal(built, expected)
+    assert built["types"].tolist()[:4] == [
+        "Type A|Type B",
+        "Type C",
+        "Type A|Type C",
+        missing_value,
+    ]
+    assert built["types"].tolist()[5] == "None"
+
+
+@pytest.mark.parametrize("dtype", [object, "category"])
+def test_date_columns_match_per_row_strptime(dtype):
+    """
+    GIVEN dates in ISO week 53 and week 1 across year ends, and missing values
+    WHEN the date, week and year columns are derived from object or
+    categorical columns
+    THEN they are identical to parsing each row with datetime.strptime
+    """
+    dates = ["2020-12-31", "2021-01-03", "2021-01-04", missing_value, "2015-12-28"]
+    df = pd.DataFrame({"dricmpdat": dates * 2}, dtype=object).astype(dtype)
+    new_column_names = {"week": "visitweek", "year": "visityear", "date": "visitdate"}
+    transform = make_transform()
+
+    derived = transform._new_columns_from_date_column(
+        df.copy(),
+        column="dricmpdat",
+        new_column_names=new_column_names,
+        missing_value=missing_value,
+    )
+    expected = df.copy()
+    parts = {
+        "week": lambda x: datetime.strptime(x, "%Y-%m-%d").isocalendar().week,
+        "year": lambda x: datetime.strptime(x, "%Y-%m-%d").isocalendar().year,
+        "date": lambda x: datetime.strptime(x, "%Y-%m-%d"),
+    }
+    for part, new_column_name in new_column_names.items():
+        expected = transform._transform_values_by_column(
+            expected,
+            column="dricmpdat",
+            new_column_name=new_column_name,
+            transform=parts[part],
+            missing_value=missing_value,
+        )
+
+    pd.testing.assert_frame_equal(derived, expected)
+    assert derived["visitweek"].tolist()[:3] == [53, 53, 1]
+    assert derived["visityear"].tolist()[:3] == [2020, 2020, 2021]
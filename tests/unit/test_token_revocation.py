@@ -0,0 +1,100 @@
+"""Tests for the cached lookups of revoked session tokens"""
+import time
+
+import pytest
+
+import model
+from modules.tokens import TokenRevocationCache
+from tests.unit.fake_redis import FakeRedis
+
+USER_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def blacklist(jti, exp):
+    """Blacklist a token through the ORM, firing the write listeners"""
+    token = model.TokenBlacklist.from_data({"jti": jti, "exp": exp})
+    token.user_id = USER_ID
+    model.db.session.add(token)
+    model.db.session.commit()
+
+
+def insert_row(jti, exp):
+    """Insert a blacklist row without the write listeners, as another app would"""
+    model.db.session.execute(
+        model.TokenBlacklist.__table__.insert().values(
+            jti=jti, exp=str(exp), user_id=USER_ID
+        )
+    )
+    model.db.session.commit()
+
+
+@pytest.fixture()
+def revocations(sqlite_app, monkeypatch):  # pylint: disable=unused-argument
+    """The revocation cache kept current by TokenBlacklist writes"""
+    cache = TokenRevocationCache(negative_ttl=0)
+    monkeypatch.setattr("model.token_blacklist.token_revocations", cache)
+    return cache
+
+
+def test_blacklist_writes_update_the_cache(revocations):
+    """
+    GIVEN a token found not revoked, and cached as such
+    WHEN its TokenBlacklist row is written, then deleted
+    THEN the cache answers revoked, then not revoked, at once
+    """
+    revocations.negative_ttl = 60
+    exp = time.time() + 600
+    assert not revocations.is_revoked("a", exp)
+
+    blacklist("a", str(exp))
+    assert revocations.is_revoked("a", exp)
+
+    model.db.session.delete(model.db.session.get(model.TokenBlacklist, "a"))
+    model.db.session.commit()
+    assert not revocations.is_revoked("a", exp)
+
+
+def test_revocations_are_shared_through_redis(revocations):
+    """
+    GIVEN two processes sharing revocations through Redis
+    WHEN one of them blacklists a token
+    THEN the other finds it revoked without querying the table
+    """
+    client = FakeRedis()
+    revocations.client = client
+    other = TokenRevocationCache(negative_ttl=0)
+    other.client = client
+    exp = time.time() + 600
+    assert not other.is_revoked("a", exp)
+
+    blacklist("a", str(exp))
+    model.db.session.execute(model.TokenBlacklist.__table__.delete())
+    model.db.session.commit()
+
+    assert other.is_revoked("a", exp)
+    assert client.ttl(revocations.prefix) > 0
+
+
+def test_evicted_revocations_are_reloaded_from_the_table(revocations):
+    """
+    GIVEN revocations loaded into Redis
+    WHEN Redis evicts them, or they reach loaded_ttl
+    THEN they are loaded again, without the expired tokens
+    """
+    client = FakeRedis()
+    revocations.client = client
+    insert_row("a", time.time() + 600)
+    insert_row("b", time.time() + 600)
+    assert revocations.is_revoked("a")
+
+    client.delete(revocations.prefix)
+    assert revocations.is_revoked("b")
+    assert client.hget(revocations.prefix, "a") is not None
+
+    insert_row("expired", time.time() - 1)
+    insert_row("c", time.time() + 600)
+    assert not revocations.is_revoked("c")
+    client.expires[revocations.prefix] = time.time()
+    assert revocations.is_revoked("c")
+    assert not revocations.is_revoked("expired")
+    assert client.hget(revocations.prefix, "expired") is None
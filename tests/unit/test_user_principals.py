@@ -0,0 +1,81 @@
+"""Tests for the cached identities of signed-in users"""
+import pytest
+
+import model
+from modules.users import UserPrincipalCache, user_principals
+from tests.unit.fake_redis import FakeRedis
+
+
+@pytest.fixture()
+def user(sqlite_app, monkeypatch):  # pylint: disable=unused-argument
+    """A user with details, and empty principal caches sharing a Redis"""
+    monkeypatch.setattr(user_principals, "client", FakeRedis())
+    user_principals.clear()
+    user = model.User.from_data(
+        {"email_address": "test@fairhub.io", "password": "Testingyeshello11!"}
+    )
+    user.user_details.first_name = "Ada"
+    model.db.session.add(user)
+    model.db.session.commit()
+    yield user
+    user_principals.clear()
+
+
+def test_user_details_flush_invalidates_the_principal(user):
+    """
+    GIVEN a cached principal
+    WHEN the user's details are changed and flushed, then rolled back
+    THEN the principal is reloaded each time
+    """
+    assert user_principals.get(user.id).first_name == "Ada"
+
+    user.user_details.first_name = "Grace"
+    model.db.session.flush()
+    assert user_principals.get(user.id).first_name == "Grace"
+
+    model.db.session.rollback()
+    assert user_principals.get(user.id).first_name == "Ada"
+
+
+def test_user_commit_invalidates_the_shared_principal(user):
+    """
+    GIVEN a principal cached in Redis and in another process
+    WHEN the user's username is changed and committed
+    THEN the other process reloads it once its own entry expires
+    """
+    other = UserPrincipalCache(ttl=0)
+    other.client = user_principals.client
+    assert other.get(user.id).username == "test@fairhub.io"
+    assert user_principals.client.exists(f"{other.prefix}:{user.id}")
+
+    user.username = "ada"
+    model.db.session.commit()
+
+    assert not user_principals.client.exists(f"{other.prefix}:{user.id}")
+    assert other.get(user.id).username == "ada"
+    assert user_principals.get(user.id).username == "ada"
+
+
+def test_principal_loaded_before_a_commit_is_not_shared_after_it(user):
+    """
+    GIVEN a process loading a principal from the database
+    WHEN the user is changed and committed before it stores the old row
+    THEN other processes do not serve the old principal from Redis
+    """
+    loading = UserPrincipalCache(ttl=0)
+    loading.client = user_principals.client
+    load = loading._load  # pylint: disable=protected-access
+
+    def load_then_commit_a_change(user_id):
+        principal = load(user_id)
+        user.username = "ada"
+        model.db.session.commit()
+        return principal
+
+    loading._load = load_then_commit_a_change  # pylint: disable=protected-access
+    assert loading.get(user.id).username == "test@fairhub.io"
+    assert user_principals.client.exists(f"{loading.prefix}:{user.id}")
+
+    other = UserPrincipalCache(ttl=0)
+    other.client = user_principals.client
+    assert other.get(user.id).username == "ada"